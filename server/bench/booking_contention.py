@@ -0,0 +1,71 @@
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+
+#예약 동시성 벤치마크
+#하나의 예약날짜에 여러 스레드가 동시에 예약을 시도하고 처리량과 초과 예약 수(반드시 0)를 보고한다
+#server 디렉터리에서 실행: python -m bench.booking_contention --threads 32 --capacity 20
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Hammer one class date with concurrent bookings.')
+  parser.add_argument('--threads', type=int, default=32)
+  parser.add_argument('--capacity', type=int, default=20)
+  parser.add_argument('--attempts', type=int, default=3, help='booking attempts per thread (double clicks)')
+  args = parser.parse_args(argv)
+
+  from bench.endpoints import prepare, auth_header
+  app, pool, fx = prepare()
+  students = fx.student_ids[:args.threads]
+  headers = {student_id: auth_header(app, student_id) for student_id in students}
+
+  db = sqlite3.connect(pool.path, isolation_level=None)
+  class_date_id = db.execute(
+    "INSERT INTO class_dates (class_id, class_date, capacity) VALUES (1, '2030-01-01 10:00:00', ?)",
+    (args.capacity,)).lastrowid
+
+  outcomes = {'admitted': 0, 'full': 0, 'duplicate': 0, 'error': 0}
+  lock = threading.Lock()
+  barrier = threading.Barrier(len(students))
+
+  def worker(student_id):
+    client = app.test_client()
+    barrier.wait()
+    for _ in range(args.attempts):
+      payload = client.post('/api/class/booking', headers=headers[student_id],
+                            json={'classId': 1, 'classDateId': class_date_id}).get_json()
+      if payload.get('status') == 'success':
+        outcome = 'admitted'
+      elif payload.get('message') == '예약 가능한 자리가 없습니다.':
+        outcome = 'full'
+      elif payload.get('message') == '이미 예약된 수업입니다.':
+        outcome = 'duplicate'
+      else:
+        outcome = 'error'
+      with lock:
+        outcomes[outcome] += 1
+
+  threads = [threading.Thread(target=worker, args=(student_id,)) for student_id in students]
+  started = time.perf_counter()
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  elapsed = time.perf_counter() - started
+
+  active = db.execute(
+    "SELECT COUNT(*) FROM class_booking WHERE class_date_id = ? AND status <> 'cancelled'", (class_date_id,)).fetchone()[0]
+  counter = db.execute("SELECT booked_count FROM class_dates WHERE id = ?", (class_date_id,)).fetchone()[0]
+  overbooked = max(0, active - args.capacity)
+  requests = len(students) * args.attempts
+
+  print(f"threads: {len(students)}  capacity: {args.capacity}  requests: {requests}")
+  print(f"throughput: {requests / elapsed:.0f} req/s  outcomes: {outcomes}")
+  print(f"active bookings: {active}  booked_count: {counter}  overbooked: {overbooked}")
+  return 1 if overbooked or counter != active or outcomes['error'] else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
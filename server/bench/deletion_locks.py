@@ -0,0 +1,86 @@
+import argparse
+import contextlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+#대형 강사 계정 삭제가 예약 요청에 주는 영향 측정
+#강사 한 명에게 카탈로그의 1/4 을 몰아준 뒤 계정을 삭제하는 동안, 다른 스레드에서 예약/취소를 반복하며 지연 시간을 잰다
+#비교: 청크 없이 테이블마다 한 문장으로 삭제(unbounded) vs control.deletion 의 청크 삭제(chunked, 백그라운드와 같은 대기 포함)
+#server 디렉터리에서 실행: python -m bench.deletion_locks --scale 16
+
+
+def percentile(values, pct):
+  if not values:
+    return 0.0
+  values = sorted(values)
+  return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def run(scale, chunk_size, pause):
+  from bench.endpoints import prepare, auth_header
+  from control import deletion
+  from db_model.mysql import conn_mysqldb
+
+  app, pool, fx = prepare(scale)
+  victim = 2
+  db = sqlite3.connect(pool.path, isolation_level=None)
+  db.execute("UPDATE class SET instructor_id = ? WHERE id % 4 = 0 AND id <> 1", (victim,))
+  db.close()
+
+  headers = auth_header(app, fx.student_id)
+  body = {'classId': 1, 'classDateId': fx.free_date_id}
+  latencies = []
+  done = threading.Event()
+
+  def booking_loop():
+    client = app.test_client()
+    devnull = open(os.devnull, 'w')
+    with contextlib.redirect_stdout(devnull):
+      while not done.is_set():
+        for method in ('POST', 'PATCH'):
+          t0 = time.perf_counter()
+          client.open('/api/class/booking', method=method, json=body, headers=headers)
+          latencies.append((time.perf_counter() - t0) * 1000)
+    devnull.close()
+
+  deletion.CHUNK_SIZE = chunk_size
+  thread = threading.Thread(target=booking_loop)
+  thread.start()
+  time.sleep(0.2)
+  baseline = len(latencies)
+  started = time.perf_counter()
+  conn, cur = conn_mysqldb(tuples=True)
+  try:
+    deleted = deletion.delete_user(conn, cur, victim, pause)
+  finally:
+    cur.close()
+    conn.close()
+  elapsed = (time.perf_counter() - started) * 1000
+  done.set()
+  thread.join()
+  during = latencies[baseline:]
+  return deleted, elapsed, during
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Booking latency while a large instructor account is deleted.')
+  parser.add_argument('--scale', type=int, default=16)
+  parser.add_argument('--chunk', type=int, default=500)
+  args = parser.parse_args(argv)
+
+  from control.deletion import CHUNK_PAUSE
+  modes = [('unbounded', 10 ** 9, 0), ('chunked', args.chunk, CHUNK_PAUSE)]
+  print(f"scale: {args.scale}")
+  print(f"{'mode':<11}{'rows':>8}{'delete ms':>11}{'bookings':>10}{'p50 ms':>8}{'p99 ms':>8}{'max ms':>8}")
+  for label, chunk_size, pause in modes:
+    deleted, elapsed, during = run(args.scale, chunk_size, pause)
+    print(f"{label:<11}{deleted:>8}{elapsed:>11.1f}{len(during):>10}"
+          f"{percentile(during, 50):>8.1f}{percentile(during, 99):>8.1f}{max(during or [0]):>8.1f}")
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
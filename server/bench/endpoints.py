@@ -0,0 +1,242 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+#엔드포인트 벤치마크
+#server 디렉터리에서 실행: python -m bench.endpoints [--scale N] [--iterations N] [--record]
+#각 라우트의 p50/p95/p99 지연시간, 처리량, 요청당 SQL 실행 수를 측정하고
+#budgets.json 에 저장된 예산(쿼리 수, p95)을 넘으면 실패(exit 1)로 처리한다
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+
+
+class Case:
+  def __init__(self, name, method, build, auth=False, writes=False, conditional=False):
+    self.name = name
+    self.method = method
+    self.build = build #build(fixture, i) -> (path, json_body)
+    self.auth = auth
+    self.writes = writes
+    self.conditional = conditional #첫 응답의 ETag 로 If-None-Match 요청 (304 기대)
+
+
+def signup_body(email):
+  return {'name': '신규', 'email': email, 'password': 'bench-password', 'phone_number': '010-0000-0000',
+          'address': '서울특별시 강남구', 'zonecode': '06000', 'address_detail': '101호', 'role': 'student'}
+
+def unbookmarked_class(fx, student_index):
+  return (student_index * 7 + 1) % fx.class_count + 1
+
+CASES = [
+  Case('class_list', 'GET', lambda fx, i: ('/api/class_list', None)),
+  Case('class_list_region', 'GET', lambda fx, i: (f'/api/class_list?city={fx.region}&district={fx.district}', None)),
+  #주소 형태별 지역 조회: 시 + 구 ('성남시 분당구'), 시 이름만 ('성남시' -> 구 포함), district 가 없는 세종
+  Case('class_list_region_gu', 'GET', lambda fx, i: (
+    f'/api/class_list?city={fx.city_gu_region}&district={quote(fx.city_gu_district)}', None)),
+  Case('class_list_region_si', 'GET', lambda fx, i: (
+    f'/api/class_list?city={fx.city_gu_region}&district={fx.city_gu_district.split()[0]}', None)),
+  Case('class_list_region_sejong', 'GET', lambda fx, i: (f'/api/class_list?city={fx.no_district_region}', None)),
+  Case('class_addresses', 'GET', lambda fx, i: ('/api/class_addresses', None)),
+  Case('nearby_class_list', 'GET', lambda fx, i: (
+    '/api/nearby_class_list?minLat=%s&maxLat=%s&minLng=%s&maxLng=%s' % fx.bbox, None)),
+  Case('nearby_class_radius', 'GET', lambda fx, i: (
+    '/api/nearby_class_list?lat=%s&lng=%s&radius=3000&limit=20' % (fx.bbox[0], fx.bbox[2]), None)),
+  Case('class_detail', 'GET', lambda fx, i: (f'/api/get_class_detail/{fx.class_id}', None)),
+  Case('class_additional_data', 'GET', lambda fx, i: (f'/api/class_additional_data/{fx.class_id}', None)),
+  Case('class_dates', 'GET', lambda fx, i: (f'/api/class_dates/{fx.class_id}?student_id={fx.student_id}', None)),
+  Case('class_date_by_id', 'GET', lambda fx, i: (f'/api/{fx.class_date_id}/dates', None)),
+  Case('class_id_by_date', 'GET', lambda fx, i: (f'/api/{fx.class_date_id}/classId', None)),
+  Case('attendees', 'GET', lambda fx, i: (f'/api/{fx.class_date_id}/attendees', None)),
+  Case('classes_by_instructor', 'GET', lambda fx, i: (f'/api/get_classes_by_instructor?id={fx.instructor_id}', None)),
+  Case('my_bookings', 'GET', lambda fx, i: (f'/api/class/{fx.student_id}/booking', None), auth=True),
+  Case('reviews_by_class', 'GET', lambda fx, i: (f'/api/reviews?classId={fx.class_id}', None)),
+  Case('reviews_by_user', 'GET', lambda fx, i: (f'/api/reviews?userId={fx.student_id}', None)),
+  Case('reviews_all', 'GET', lambda fx, i: ('/api/reviews', None)),
+  Case('bookmarks', 'GET', lambda fx, i: (f'/api/user/{fx.student_id}/bookmarks', None), auth=True),
+  Case('bookmark_status', 'GET', lambda fx, i: (f'/api/user/{fx.student_id}/bookmarks?classId={fx.class_id}', None), auth=True),
+  Case('user_info', 'GET', lambda fx, i: (f'/api/users/{fx.student_id}', None), auth=True),
+  #변경이 없는 상태에서 폴링 (If-None-Match -> 304)
+  Case('class_list_304', 'GET', lambda fx, i: ('/api/class_list', None), conditional=True),
+  Case('class_detail_304', 'GET', lambda fx, i: (f'/api/get_class_detail/{fx.class_id}', None), conditional=True),
+  Case('class_dates_304', 'GET', lambda fx, i: (
+    f'/api/class_dates/{fx.class_id}?student_id={fx.student_id}', None), conditional=True),
+  Case('reviews_by_class_304', 'GET', lambda fx, i: (f'/api/reviews?classId={fx.class_id}', None), conditional=True),
+  Case('login', 'POST', lambda fx, i: ('/api/login', {'email': fx.student_email, 'password': fx.password})),
+  #이미 가입된 이메일: 해시 없이 중복 확인 한 번으로 거절 (오류 응답이 정상)
+  Case('signup_duplicate', 'POST', lambda fx, i: ('/api/signup', signup_body(fx.student_email))),
+  Case('signup', 'POST', lambda fx, i: ('/api/signup', signup_body(f'signup{i}@bench.local')), writes=True),
+  #쓰기 케이스는 짝을 이뤄 실행 후 상태를 원래대로 되돌림
+  Case('book_class', 'POST', lambda fx, i: (
+    '/api/class/booking', {'classId': 1, 'classDateId': fx.free_date_id}), auth=True, writes=True),
+  Case('cancel_booking', 'PATCH', lambda fx, i: (
+    '/api/class/booking', {'classId': 1, 'classDateId': fx.free_date_id}), auth=True, writes=True),
+  Case('add_bookmark', 'POST', lambda fx, i: (
+    f'/api/user/{fx.student_ids[i]}/bookmarks', {'classId': unbookmarked_class(fx, i)}), auth=True, writes=True),
+  Case('remove_bookmark', 'DELETE', lambda fx, i: (
+    f'/api/user/{fx.student_ids[i]}/bookmarks/{unbookmarked_class(fx, i)}', None), auth=True, writes=True),
+]
+
+
+def percentile(sorted_values, pct):
+  if not sorted_values:
+    return 0.0
+  index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+  return sorted_values[index]
+
+
+#앱을 로컬 DB 에 연결해서 부팅
+def boot_app(db_path):
+  os.environ.setdefault('SECRET_KEY', 'onedayclass-local-benchmark-secret-key')
+  #결제 승인 폴러의 쿼리가 측정 구간의 쿼리 수에 섞이지 않도록 끔 (bench.payment_flow 는 켬)
+  os.environ.setdefault('PAYMENT_APPROVAL_POLL_INTERVAL', '0')
+
+  import db_model.mysql as mysql
+  from bench.local_db import LocalPool
+  pool = LocalPool(db_path)
+  mysql.POOL = pool
+
+  from main import app
+  app.config['TESTING'] = True
+  return app, pool
+
+
+#임시 디렉터리에 시드된 로컬 DB 를 만들고 앱을 부팅, (app, pool, fixture) 반환
+def prepare(scale=1):
+  if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+  workdir = tempfile.mkdtemp(prefix='onedayclass-bench-')
+  #flask_session / app.log 가 저장소를 더럽히지 않도록 임시 디렉터리에서 실행
+  os.chdir(workdir)
+  db_path = os.path.join(workdir, 'bench.sqlite3')
+
+  from bench import seed
+  fx = seed.build(db_path, scale=scale)
+  fx.password = seed.PASSWORD
+  app, pool = boot_app(db_path)
+  return app, pool, fx
+
+def auth_header(app, user_id, role='student'):
+  from flask_jwt_extended import create_access_token
+  with app.app_context():
+    token = create_access_token(identity=str(user_id), additional_claims={'role': role})
+  return {'Authorization': f"Bearer {token}"}
+
+
+def run_case(app, pool, fx, case, iterations, tokens):
+  client = app.test_client()
+  devnull = open(os.devnull, 'w')
+  latencies = []
+  statements = []
+  errors = 0
+
+  etag = None
+  if not case.writes:
+    path, body = case.build(fx, 0)
+    with contextlib.redirect_stdout(devnull):
+      warmup = client.open(path, method=case.method, json=body, headers=tokens.get(fx.student_id) if case.auth else None)
+    etag = warmup.headers.get('ETag')
+
+  started = time.perf_counter()
+  for i in range(iterations):
+    path, body = case.build(fx, i)
+    headers = None
+    if case.auth:
+      #쓰기 케이스는 반복마다 다른 수강생으로 요청
+      user_id = fx.student_ids[i] if case.writes else fx.student_id
+      headers = tokens[user_id]
+    if case.conditional:
+      headers = dict(headers or {}, **{'If-None-Match': etag})
+    pool.take_statements()
+    t0 = time.perf_counter()
+    #라우트의 print 출력이 결과표에 섞이지 않도록 버림
+    with contextlib.redirect_stdout(devnull):
+      response = client.open(path, method=case.method, json=body, headers=headers)
+    latencies.append((time.perf_counter() - t0) * 1000)
+    statements.append(pool.take_statements())
+    payload = response.get_json(silent=True)
+    if response.status_code >= 400 or (isinstance(payload, dict) and payload.get('status') == 'error'):
+      errors += 1
+    elif case.conditional and response.status_code != 304:
+      errors += 1
+  elapsed = time.perf_counter() - started
+  devnull.close()
+
+  latencies.sort()
+  return {
+    'p50_ms': percentile(latencies, 50),
+    'p95_ms': percentile(latencies, 95),
+    'p99_ms': percentile(latencies, 99),
+    'rps': iterations / elapsed if elapsed else 0.0,
+    'queries': max(statements) if statements else 0,
+    'errors': errors,
+  }
+
+
+def check_budget(name, result, budgets):
+  budget = budgets.get(name)
+  if budget is None:
+    return ['no budget recorded']
+  problems = []
+  if result['queries'] > budget['queries']:
+    problems.append(f"queries {result['queries']} > budget {budget['queries']}")
+  if result['p95_ms'] > budget['p95_ms']:
+    problems.append(f"p95 {result['p95_ms']:.1f}ms > budget {budget['p95_ms']}ms")
+  if result['errors'] and not budget.get('allow_errors'):
+    problems.append(f"{result['errors']} error responses")
+  return problems
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Benchmark API routes against a local SQLite database.')
+  parser.add_argument('--scale', type=int, default=1)
+  parser.add_argument('--iterations', type=int, default=30)
+  parser.add_argument('--only', action='append', help='run only the named case (repeatable)')
+  parser.add_argument('--record', action='store_true', help='write the observed numbers to budgets.json')
+  args = parser.parse_args(argv)
+
+  app, pool, fx = prepare(args.scale)
+  tokens = {user_id: auth_header(app, user_id) for user_id in fx.student_ids}
+
+  iterations = min(args.iterations, len(fx.student_ids))
+  with open(BUDGETS_PATH, encoding='utf-8') as f:
+    budgets = json.load(f)
+
+  results = {}
+  failed = False
+  print(f"{'route':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'sql':>6}  budget")
+  for case in CASES:
+    if args.only and case.name not in args.only:
+      continue
+    result = run_case(app, pool, fx, case, iterations, tokens)
+    results[case.name] = result
+    problems = [] if args.record else check_budget(case.name, result, budgets)
+    failed = failed or bool(problems)
+    print(f"{case.name:<24}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+          f"{result['rps']:>9.0f}{result['queries']:>6}  {'; '.join(problems) if problems else 'ok'}")
+
+  if args.record:
+    for name, result in results.items():
+      budgets[name] = {
+        'queries': result['queries'],
+        #지연시간은 환경 차이를 감안해 여유를 둠
+        'p95_ms': max(50, int(result['p95_ms'] * 3) + 1),
+      }
+      if result['errors']:
+        budgets[name]['allow_errors'] = True
+    with open(BUDGETS_PATH, 'w', encoding='utf-8') as f:
+      json.dump(budgets, f, indent=2, sort_keys=True)
+      f.write('\n')
+    print(f'budgets written to {BUDGETS_PATH}')
+    return 0
+
+  return 1 if failed else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,97 @@
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+#카카오페이 API 대역 서버 (네트워크 없이 결제 흐름을 부하 테스트하기 위함)
+#server 디렉터리에서 실행: python -m bench.kakaopay_stub --port 8765 --latency-ms 80
+#앱은 KAKAOPAY_BASE_URL=http://127.0.0.1:8765 로 실행
+
+
+class StubState:
+  def __init__(self, latency=0.0):
+    self.latency = latency
+    self.payments = {} #tid -> 결제 정보
+    self.lock = threading.Lock()
+
+
+def make_handler(state):
+  class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' #keep-alive 지원
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+      length = int(self.headers.get('Content-Length') or 0)
+      form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+      if state.latency:
+        time.sleep(state.latency)
+
+      if not self.headers.get('Authorization', '').startswith('KakaoAK '):
+        return self._reply(401, {'code': -401, 'msg': 'invalid admin key'})
+
+      if self.path == '/v1/payment/ready':
+        tid = 'T' + uuid.uuid4().hex[:18]
+        with state.lock:
+          state.payments[tid] = {'status': 'READY', 'amount': form.get('total_amount')}
+        return self._reply(200, {
+          'tid': tid,
+          'next_redirect_pc_url': f'http://127.0.0.1/stub/pay/{tid}',
+          'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+
+      if self.path == '/v1/payment/approve':
+        with state.lock:
+          payment = state.payments.get(form.get('tid'))
+          if payment is None or payment['status'] != 'READY':
+            return self._reply(400, {'code': -702, 'msg': 'payment already approved or unknown tid'})
+          payment['status'] = 'SUCCESS_PAYMENT'
+        return self._reply(200, {'tid': form.get('tid'), 'partner_order_id': form.get('partner_order_id'),
+                                 'amount': {'total': payment['amount']}})
+
+      if self.path == '/v1/payment/order':
+        with state.lock:
+          payment = state.payments.get(form.get('tid'))
+        if payment is None:
+          return self._reply(400, {'code': -780, 'msg': 'unknown tid'})
+        return self._reply(200, {'tid': form.get('tid'), 'status': payment['status']})
+
+      return self._reply(404, {'msg': 'not found'})
+
+    def _reply(self, status, payload):
+      body = json.dumps(payload).encode('utf-8')
+      self.send_response(status)
+      self.send_header('Content-Type', 'application/json;charset=UTF-8')
+      self.send_header('Content-Length', str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+    def log_message(self, format, *args):
+      pass
+
+  return Handler
+
+
+#백그라운드 스레드로 대역 서버 실행, (server, base_url) 반환
+def start(port=0, latency=0.0):
+  state = StubState(latency)
+  server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+  server.daemon_threads = True
+  server.state = state
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Local stand-in for the Kakao Pay API.')
+  parser.add_argument('--port', type=int, default=8765)
+  parser.add_argument('--latency-ms', type=float, default=0)
+  args = parser.parse_args()
+  server, url = start(args.port, args.latency_ms / 1000)
+  print(f'Kakao Pay stub listening on {url}')
+  try:
+    threading.Event().wait()
+  except KeyboardInterrupt:
+    server.shutdown()
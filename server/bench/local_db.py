@@ -0,0 +1,156 @@
+import re
+import sqlite3
+import pymysql.cursors
+import threading
+from datetime import datetime
+
+#db_model.mysql 의 POOL 대신 사용하는 로컬 SQLite 풀
+#pymysql DictCursor 와 같은 인터페이스(execute, fetchone, fetchall, lastrowid, rowcount)를 흉내낸다
+
+_COMMENT = re.compile(r"#[^\n]*")
+_REWRITES = [
+  (re.compile(r"%s"), "?"),
+  (re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE), "INSERT OR IGNORE"),
+  (re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE), ""),
+  (re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE), "ON CONFLICT DO UPDATE SET"),
+]
+
+
+#MySQL 문법을 SQLite 에서 실행할 수 있게 변환
+def translate(query):
+  query = _COMMENT.sub("", query)
+  for pattern, replacement in _REWRITES:
+    query = pattern.sub(replacement, query)
+  return query
+
+#pymysql 은 단일 값 파라미터도 허용하므로 튜플로 맞춰줌
+def normalize_params(params):
+  if params is None:
+    return ()
+  if isinstance(params, (list, tuple, dict)):
+    return params
+  return (params,)
+
+
+#SQLite 유니크 제약 위반을 MySQL 의 중복 키 오류(1062, 메시지에 인덱스 이름)로 바꿔서 던짐
+_UNIQUE_FAILED = re.compile(r"UNIQUE constraint failed: (.+)")
+
+def duplicate_key_error(conn, error):
+  match = _UNIQUE_FAILED.match(str(error))
+  if not match:
+    return error
+  columns = [column.split('.', 1) for column in match[1].split(', ')]
+  table = columns[0][0]
+  names = [name for _, name in columns]
+  key = 'PRIMARY'
+  for _, index, unique, origin, *_ in conn.execute(f"PRAGMA index_list({table})").fetchall():
+    if unique and [row[2] for row in conn.execute(f"PRAGMA index_info({index})").fetchall()] == names:
+      key = 'PRIMARY' if origin == 'pk' else index
+      break
+  return pymysql.err.IntegrityError(1062, f"Duplicate entry for key '{table}.{key}'")
+
+
+class LocalCursor:
+  def __init__(self, pool, conn, as_dict=True):
+    self._pool = pool
+    self._cur = conn.cursor()
+    self._row = dict if as_dict else tuple
+    if not as_dict:
+      #pymysql Cursor 처럼 sqlite 가 만든 튜플을 그대로 반환
+      self._cur.row_factory = None
+    self.lastrowid = None
+    self.rowcount = -1
+
+  def execute(self, query, params=None):
+    self._pool.record(query)
+    try:
+      self._cur.execute(translate(query), normalize_params(params))
+    except sqlite3.IntegrityError as e:
+      raise duplicate_key_error(self._cur.connection, e) from e
+    self.lastrowid = self._cur.lastrowid
+    self.rowcount = self._cur.rowcount
+    return self.rowcount
+
+  def executemany(self, query, seq_of_params):
+    self._pool.record(query)
+    try:
+      self._cur.executemany(translate(query), [normalize_params(p) for p in seq_of_params])
+    except sqlite3.IntegrityError as e:
+      raise duplicate_key_error(self._cur.connection, e) from e
+    self.lastrowid = self._cur.lastrowid
+    self.rowcount = self._cur.rowcount
+    return self.rowcount
+
+  def fetchone(self):
+    row = self._cur.fetchone()
+    return self._row(row) if row is not None else None
+
+  def fetchall(self):
+    return [self._row(row) for row in self._cur.fetchall()]
+
+  def fetchmany(self, size=1):
+    return [self._row(row) for row in self._cur.fetchmany(size)]
+
+  def __iter__(self):
+    for row in self._cur:
+      yield self._row(row)
+
+  def close(self):
+    self._cur.close()
+
+
+class LocalConnection:
+  def __init__(self, pool, path):
+    self._pool = pool
+    #autocommit=True 인 운영 풀과 동일하게 명시적 begin() 전까지는 자동 커밋
+    self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    self._conn.row_factory = sqlite3.Row
+    #커밋마다 fsync 를 기다리면 디스크 속도가 결과를 지배하므로 완화 (운영 MySQL 대역일 뿐 내구성은 불필요)
+    self._conn.execute("PRAGMA synchronous=OFF")
+    self._conn.create_function("NOW", 0, lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    self._conn.create_function("CONCAT", -1, lambda *parts: "".join(str(part) for part in parts))
+
+  #pymysql 의 DictCursor 계열이면 dict, Cursor/SSCursor 면 튜플 행
+  def cursor(self, cursor_class=None):
+    as_dict = cursor_class is None or issubclass(cursor_class, pymysql.cursors.DictCursorMixin)
+    return LocalCursor(self._pool, self._conn, as_dict)
+
+  def begin(self):
+    if not self._conn.in_transaction:
+      self._conn.execute("BEGIN IMMEDIATE")
+
+  def commit(self):
+    if self._conn.in_transaction:
+      self._conn.execute("COMMIT")
+
+  def rollback(self):
+    if self._conn.in_transaction:
+      self._conn.execute("ROLLBACK")
+
+  def close(self):
+    self.rollback()
+    self._conn.close()
+
+
+class LocalPool:
+  def __init__(self, path):
+    self.path = path
+    self._lock = threading.Lock()
+    self.statements = 0
+    self.log = None
+
+  def connection(self):
+    return LocalConnection(self, self.path)
+
+  def record(self, query):
+    with self._lock:
+      self.statements += 1
+      if self.log is not None:
+        self.log.append(" ".join(query.split()))
+
+  #실행된 SQL 문 개수를 반환하고 카운터를 초기화
+  def take_statements(self):
+    with self._lock:
+      count = self.statements
+      self.statements = 0
+      return count
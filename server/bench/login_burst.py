@@ -0,0 +1,113 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import requests
+
+#로그인 폭주 벤치마크: 비밀번호 해시를 요청 스레드에서 계산(inline) vs 해시 프로세스 풀(pool)
+#gthread 워커 하나에 로그인 요청을 몰아넣는 동안, 다른 클라이언트가 가벼운 API(/api/print)를 호출해 지연 시간을 잰다
+#pool 모드에서 대기열이 가득 차면 로그인은 503 으로 바로 거절된다 (rejected)
+#server 디렉터리에서 실행: python -m bench.login_burst --clients 32 --hash-workers 1 --hash-queue 4
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def burst(base_url, emails, password, clients, duration):
+  latencies, outcomes = [], {'ok': 0, 'rejected': 0, 'error': 0}
+  lock = threading.Lock()
+  stop_at = time.monotonic() + duration
+
+  def client(index):
+    session = requests.Session()
+    email = emails[index % len(emails)]
+    while time.monotonic() < stop_at:
+      t0 = time.perf_counter()
+      try:
+        response = session.post(base_url + '/api/login', json={'email': email, 'password': password}, timeout=60)
+        outcome = 'ok' if response.status_code == 200 and response.json().get('status') == 'success' \
+          else 'rejected' if response.status_code == 503 else 'error'
+      except requests.exceptions.RequestException:
+        outcome = 'error'
+      with lock:
+        outcomes[outcome] += 1
+        if outcome == 'ok':
+          latencies.append((time.perf_counter() - t0) * 1000)
+      if outcome == 'rejected':
+        time.sleep(float(response.headers.get('Retry-After', 1)))
+
+  threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+  for thread in threads:
+    thread.start()
+  return threads, latencies, outcomes
+
+def probe(base_url, stop):
+  latencies = []
+  session = requests.Session()
+  while not stop.is_set():
+    t0 = time.perf_counter()
+    try:
+      session.get(base_url + '/api/print', timeout=60)
+    except requests.exceptions.RequestException:
+      continue
+    latencies.append((time.perf_counter() - t0) * 1000)
+    time.sleep(0.02)
+  return latencies
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Login throughput and head-of-line blocking under a login burst.')
+  parser.add_argument('--clients', type=int, default=32)
+  parser.add_argument('--duration', type=float, default=5)
+  parser.add_argument('--threads', type=int, default=8, help='gthread threads per worker')
+  parser.add_argument('--hash-workers', type=int, default=1)
+  parser.add_argument('--hash-queue', type=int, default=4)
+  parser.add_argument('--port', type=int, default=8791)
+  args = parser.parse_args(argv)
+
+  if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+  from bench import seed
+  from bench.endpoints import percentile
+  from bench.worker_modes import start_server
+
+  workdir = tempfile.mkdtemp(prefix='onedayclass-login-burst-')
+  db_path = os.path.join(workdir, 'bench.sqlite3')
+  fx = seed.build(db_path)
+  emails = [f'user{student_id}@bench.local' for student_id in fx.student_ids]
+
+  modes = [('inline', 0, 1), ('pool', args.hash_workers, args.hash_queue)]
+  print(f"clients: {args.clients}  duration: {args.duration:.0f}s  gthread threads: {args.threads}")
+  print(f"{'mode':<8}{'logins/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'rejected':>10}{'errors':>8}{'probe p50':>11}{'probe p99':>11}")
+  for label, hash_workers, hash_queue in modes:
+    os.environ.update(WORKER_THREADS=str(args.threads), PASSWORD_HASH_WORKERS=str(hash_workers),
+                      PASSWORD_HASH_QUEUE=str(hash_queue))
+    server_args = argparse.Namespace(workers=1, port=args.port)
+    process, base_url = start_server('gthread', server_args, db_path, 'http://127.0.0.1:9', workdir)
+    try:
+      #해시 프로세스 기동 시간을 측정에서 제외
+      requests.post(base_url + '/api/login', json={'email': emails[0], 'password': seed.PASSWORD}, timeout=60)
+      stop = threading.Event()
+      probe_result = []
+      probe_thread = threading.Thread(target=lambda: probe_result.extend(probe(base_url, stop)))
+      probe_thread.start()
+      started = time.perf_counter()
+      threads, latencies, outcomes = burst(base_url, emails, seed.PASSWORD, args.clients, args.duration)
+      for thread in threads:
+        thread.join()
+      elapsed = time.perf_counter() - started
+      stop.set()
+      probe_thread.join()
+    finally:
+      process.terminate()
+      process.wait(timeout=30)
+    latencies.sort()
+    probe_result.sort()
+    print(f"{label:<8}{outcomes['ok'] / elapsed:>10.1f}{percentile(latencies, 50):>9.0f}{percentile(latencies, 99):>9.0f}"
+          f"{outcomes['rejected']:>10}{outcomes['error']:>8}{percentile(probe_result, 50):>11.1f}{percentile(probe_result, 99):>11.1f}")
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
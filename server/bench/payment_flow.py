@@ -0,0 +1,91 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+#결제 흐름 부하 테스트 (결제 준비 -> 결제 승인 요청 -> 승인 완료까지 상태 조회)
+#카카오페이 대역 서버(bench.kakaopay_stub)를 띄우고 여러 스레드에서 동시에 결제를 진행한다
+#approve 는 승인 요청 자체의 응답 시간(요청 스레드가 묶이는 시간), settled 는 승인이 완료될 때까지의 시간
+#server 디렉터리에서 실행: python -m bench.payment_flow --threads 8 --payments 200 --latency-ms 80
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Load-test the payment flow against a local Kakao Pay stub.')
+  parser.add_argument('--threads', type=int, default=8)
+  parser.add_argument('--payments', type=int, default=200)
+  parser.add_argument('--latency-ms', type=float, default=80, help='simulated Kakao Pay latency')
+  args = parser.parse_args(argv)
+
+  from bench import kakaopay_stub
+  stub, base_url = kakaopay_stub.start(latency=args.latency_ms / 1000)
+  #앱이 대역 서버를 바라보도록 import 전에 설정
+  os.environ['KAKAOPAY_BASE_URL'] = base_url
+  os.environ.setdefault('KAKAOPAY_ADMINKEY', 'stub-admin-key')
+  os.environ.setdefault('PAYMENT_APPROVAL_POLL_INTERVAL', '2')
+
+  from bench.endpoints import prepare, auth_header, percentile
+  app, pool, fx = prepare()
+  users = fx.student_ids[:args.threads]
+  headers = {user_id: auth_header(app, user_id) for user_id in users}
+
+  ready_ms, approve_ms, settled_ms, errors = [], [], [], []
+  completed = [0]
+  lock = threading.Lock()
+  per_thread = args.payments // args.threads
+
+  #결제는 대기 중인 예약이 있어야 확정되므로 매번 예약 후 결제하고, 끝나면 취소해 좌석을 돌려놓는다 (시간 측정에서 제외)
+  booking = {'classId': fx.class_id, 'classDateId': fx.class_date_id}
+
+  def worker(user_id):
+    client = app.test_client()
+    for _ in range(per_thread):
+      booked = client.post('/api/class/booking', headers=headers[user_id], json=booking).get_json()
+      if booked.get('status') != 'success':
+        with lock:
+          errors.append(booked)
+        continue
+      t0 = time.perf_counter()
+      ready = client.post(f'/api/{fx.class_date_id}/payment', headers=headers[user_id]).get_json()
+      t1 = time.perf_counter()
+      if ready.get('status') != 'success':
+        with lock:
+          errors.append(ready)
+        continue
+      approved = client.post(f'/api/{fx.class_date_id}/payment/success', headers=headers[user_id],
+                             json={'pg_token': 'stub-token', 'paymentId': ready['data']['paymentId']}).get_json()
+      t2 = time.perf_counter()
+      state = approved.get('data', {}).get('state') if approved.get('status') == 'success' else None
+      while state in ('pending', 'running'):
+        time.sleep(0.01)
+        polled = client.get(f"/api/payment/{ready['data']['paymentId']}/status", headers=headers[user_id]).get_json()
+        state = polled.get('data', {}).get('state')
+      t3 = time.perf_counter()
+      with lock:
+        ready_ms.append((t1 - t0) * 1000)
+        approve_ms.append((t2 - t1) * 1000)
+        settled_ms.append((t3 - t1) * 1000)
+        if state != 'done':
+          errors.append(approved)
+        else:
+          completed[0] += 1
+      client.patch('/api/class/booking', headers=headers[user_id], json=booking)
+
+  started = time.perf_counter()
+  threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in users]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  elapsed = time.perf_counter() - started
+  stub.shutdown()
+
+  print(f"payments: {per_thread * len(users)}  threads: {len(users)}  stub latency: {args.latency_ms:.0f}ms")
+  for name, values in (('ready', sorted(ready_ms)), ('approve', sorted(approve_ms)), ('settled', sorted(settled_ms))):
+    print(f"{name:<8} p50 {percentile(values, 50):7.1f}ms  p95 {percentile(values, 95):7.1f}ms  p99 {percentile(values, 99):7.1f}ms")
+  print(f"throughput: {completed[0] / elapsed:.1f} payments/s  errors: {len(errors)}")
+  return 1 if errors else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
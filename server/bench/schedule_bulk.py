@@ -0,0 +1,58 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+#시간대 등록 비교: 단건 API(/api/add_class_time)를 N 번 호출 vs 일괄 API(/api/add_class_times) 한 번
+#매주 같은 요일/시간의 시간대 N 개를 등록하고 SQL 문 수와 소요 시간, 재요청 시 건너뛴 수를 측정한다
+#server 디렉터리에서 실행: python -m bench.schedule_bulk --weeks 52
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Compare single and bulk class time registration.')
+  parser.add_argument('--weeks', type=int, default=52)
+  args = parser.parse_args(argv)
+
+  from bench.endpoints import prepare, auth_header
+
+  app, pool, fx = prepare()
+  client = app.test_client()
+  headers = auth_header(app, fx.instructor_id, role='instructor')
+  devnull = open(os.devnull, 'w')
+
+  #시드된 클래스 중 강사 본인 클래스 두 개를 사용 (하나는 단건, 하나는 일괄)
+  single_class, bulk_class = fx.class_id, fx.class_id + 10
+  start = datetime(2030, 1, 7, 19, 0)
+  dates = [(start + timedelta(weeks=n)).strftime("%Y-%m-%dT%H:%M") for n in range(args.weeks)]
+  rule = {'weekdays': ['MO'], 'time': '19:00', 'start': '2030-01-07',
+          'until': (start + timedelta(weeks=args.weeks - 1)).strftime("%Y-%m-%d")}
+
+  def run(requests):
+    pool.take_statements()
+    started = time.perf_counter()
+    payloads = []
+    with contextlib.redirect_stdout(devnull):
+      for path, body in requests:
+        payloads.append(client.post(path, json=body, headers=headers).get_json())
+    return (time.perf_counter() - started) * 1000, pool.take_statements(), payloads
+
+  print(f"weeks: {args.weeks}")
+  print(f"{'mode':<16}{'requests':>9}{'statements':>12}{'ms':>9}{'created':>9}{'skipped':>9}")
+  single = [(f'/api/add_class_time/{single_class}', {'classDateTime': d, 'capacity': 10}) for d in dates]
+  bulk = [(f'/api/add_class_times/{bulk_class}', {'recurrence': rule, 'capacity': 10})]
+  for label, requests in (('single', single), ('bulk', bulk), ('bulk (repeat)', bulk)):
+    ms, statements, payloads = run(requests)
+    if label == 'single':
+      created = sum(1 for p in payloads if p['status'] == 'success')
+      skipped = len(payloads) - created
+    else:
+      created, skipped = len(payloads[0]['data']['created']), len(payloads[0]['data']['skipped'])
+    print(f"{label:<16}{len(requests):>9}{statements:>12}{ms:>9.1f}{created:>9}{skipped:>9}")
+  devnull.close()
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
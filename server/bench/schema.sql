@@ -0,0 +1,140 @@
+-- 벤치마크용 로컬 DB 스키마 (운영 MySQL 테이블 구조를 SQLite로 옮긴 것)
+
+CREATE TABLE user_info (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  email TEXT NOT NULL,
+  password TEXT NOT NULL,
+  name TEXT,
+  phone_number TEXT,
+  address TEXT,
+  zonecode TEXT,
+  address_detail TEXT,
+  role TEXT,
+  bookmark_version INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX uq_user_info_email ON user_info (email);
+
+CREATE TABLE class (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  class_name TEXT,
+  description TEXT,
+  location TEXT,
+  instructor_id INTEGER,
+  cost INTEGER,
+  latitude REAL,
+  longitude REAL,
+  target_student TEXT,
+  curriculum TEXT,
+  content TEXT,
+  city TEXT,
+  district TEXT,
+  review_count INTEGER NOT NULL DEFAULT 0,
+  rating_sum INTEGER NOT NULL DEFAULT 0,
+  rating_1 INTEGER NOT NULL DEFAULT 0,
+  rating_2 INTEGER NOT NULL DEFAULT 0,
+  rating_3 INTEGER NOT NULL DEFAULT 0,
+  rating_4 INTEGER NOT NULL DEFAULT 0,
+  rating_5 INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_class_instructor ON class (instructor_id);
+CREATE INDEX idx_class_city_district ON class (city, district);
+
+CREATE TABLE class_dates (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  class_id INTEGER NOT NULL,
+  class_date DATETIME NOT NULL,
+  capacity INTEGER NOT NULL,
+  booked_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_class_dates_class ON class_dates (class_id);
+CREATE UNIQUE INDEX uq_class_dates_class_date ON class_dates (class_id, class_date);
+
+CREATE TABLE class_booking (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  class_id INTEGER NOT NULL,
+  student_id INTEGER NOT NULL,
+  class_date_id INTEGER NOT NULL,
+  status TEXT NOT NULL
+);
+CREATE UNIQUE INDEX uq_class_booking_student_date ON class_booking (student_id, class_date_id);
+CREATE INDEX idx_class_booking_date ON class_booking (class_date_id);
+CREATE INDEX idx_class_booking_student_class ON class_booking (student_id, class_id);
+
+CREATE TABLE class_reviews (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  class_id INTEGER NOT NULL,
+  user_id INTEGER NOT NULL,
+  class_date_id INTEGER NOT NULL,
+  rating INTEGER NOT NULL,
+  comment TEXT,
+  booking_id INTEGER,
+  instructor_comment TEXT,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_class_reviews_class ON class_reviews (class_id);
+CREATE INDEX idx_class_reviews_user ON class_reviews (user_id);
+CREATE INDEX idx_class_reviews_created ON class_reviews (created_at, id);
+CREATE INDEX idx_class_reviews_class_created ON class_reviews (class_id, created_at, id);
+CREATE INDEX idx_class_reviews_user_created ON class_reviews (user_id, created_at, id);
+CREATE INDEX idx_class_reviews_booking ON class_reviews (booking_id);
+
+CREATE TABLE user_bookmarks (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id INTEGER NOT NULL,
+  class_id INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX uq_user_bookmarks_user_class ON user_bookmarks (user_id, class_id);
+CREATE INDEX idx_user_bookmarks_class ON user_bookmarks (class_id);
+
+CREATE TABLE payment (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id INTEGER NOT NULL,
+  class_date_id INTEGER NOT NULL,
+  amount INTEGER,
+  status TEXT,
+  tid TEXT
+);
+CREATE INDEX idx_payment_user ON payment (user_id);
+CREATE INDEX idx_payment_class_date ON payment (class_date_id);
+
+CREATE TABLE app_sessions (
+  sid TEXT PRIMARY KEY,
+  data TEXT NOT NULL,
+  expires_at DATETIME NOT NULL
+);
+CREATE INDEX idx_app_sessions_expires ON app_sessions (expires_at);
+
+CREATE TABLE resource_versions (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE deletion_jobs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kind TEXT NOT NULL,
+  target_id INTEGER NOT NULL,
+  owner_id INTEGER NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',
+  step TEXT,
+  deleted_rows INTEGER NOT NULL DEFAULT 0,
+  error TEXT,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_deletion_jobs_status ON deletion_jobs (status);
+
+CREATE TABLE payment_approval_jobs (
+  payment_id INTEGER PRIMARY KEY,
+  user_id INTEGER NOT NULL,
+  class_date_id INTEGER NOT NULL,
+  pg_token TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  error TEXT,
+  next_attempt_at DATETIME NOT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_payment_approval_jobs_status ON payment_approval_jobs (status, next_attempt_at);
+CREATE INDEX idx_payment_approval_jobs_user ON payment_approval_jobs (user_id);
+CREATE INDEX idx_payment_approval_jobs_class_date ON payment_approval_jobs (class_date_id);
@@ -0,0 +1,143 @@
+import json
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from control.region import split_region
+
+#벤치마크용 데이터 생성 (scale=1 기준 운영 DB 와 비슷한 비율의 데이터량)
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.sql')
+PASSWORD = 'bench-password'
+
+#주소 형태별로: 시/도 + 구, 시/도 + 시 + 구, 시/도 + 시, 시/군/구가 없는 세종
+REGIONS = [
+  ('서울특별시', ['강남구', '마포구', '종로구', '송파구', '성동구']),
+  ('경기도', ['성남시 분당구', '수원시 영통구', '고양시 일산동구', '김포시']),
+  ('부산광역시', ['해운대구', '수영구']),
+  ('세종특별자치시', ['']),
+]
+
+
+class Fixture:
+  def __init__(self, **kwargs):
+    self.__dict__.update(kwargs)
+
+
+def build(path, scale=1, seed=42):
+  rng = random.Random(seed)
+  conn = sqlite3.connect(path)
+  #여러 프로세스(gunicorn 워커)가 동시에 읽고 쓸 수 있도록 WAL 모드
+  conn.execute("PRAGMA journal_mode=WAL")
+  with open(SCHEMA_PATH, encoding='utf-8') as f:
+    conn.executescript(f.read())
+
+  instructors = 10 * scale
+  students = 200 * scale
+  classes = 60 * scale
+  dates_per_class = 8
+  bookings_per_student = 24
+  bookmarks_per_student = 15
+
+  password_hash = generate_password_hash(PASSWORD)
+
+  #user_info (강사 먼저, 그 다음 수강생)
+  users = []
+  for i in range(instructors + students):
+    role = 'instructor' if i < instructors else 'student'
+    users.append((f'user{i + 1}@bench.local', password_hash, f'user{i + 1}', '010-0000-0000',
+                  '서울특별시 강남구', '06000', '101호', role))
+  conn.executemany(
+    "INSERT INTO user_info (email, password, name, phone_number, address, zonecode, address_detail, role) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    users)
+  student_ids = list(range(instructors + 1, instructors + students + 1))
+
+  #class
+  class_rows = []
+  for i in range(classes):
+    city, districts = REGIONS[i % len(REGIONS)]
+    district = districts[(i // len(REGIONS)) % len(districts)]
+    class_rows.append((
+      f'클래스 {i + 1}', f'클래스 {i + 1} 설명 ' * 5, ' '.join(filter(None, [city, district, f'테스트로 {i + 1}'])),
+      (i % instructors) + 1, 10000 + (i % 10) * 5000,
+      37.4 + rng.random() * 0.3, 126.8 + rng.random() * 0.4,
+      json.dumps(['초보자', '취미반']), json.dumps([{'title': f'{n}주차', 'content': '실습'} for n in range(4)]),
+      '수업 내용 ' * 20) + split_region(f'{city} {district} 테스트로'))
+  conn.executemany(
+    "INSERT INTO class (class_name, description, location, instructor_id, cost, latitude, longitude, target_student, curriculum, content, city, district) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    class_rows)
+
+  #class_dates
+  start = datetime(2024, 1, 6, 10, 0)
+  date_rows = []
+  for class_id in range(1, classes + 1):
+    for n in range(dates_per_class):
+      date_rows.append((class_id, (start + timedelta(days=7 * n, hours=class_id % 8)).strftime('%Y-%m-%d %H:%M:%S'), 40))
+  total_dates = len(date_rows)
+  #쓰기 벤치 전용 날짜 (시드 예약이 없고 정원이 충분함)
+  date_rows.append((1, (start + timedelta(days=7 * dates_per_class)).strftime('%Y-%m-%d %H:%M:%S'), 100000))
+  conn.executemany("INSERT INTO class_dates (class_id, class_date, capacity) VALUES (?, ?, ?)", date_rows)
+
+  #class_booking / class_reviews
+  booking_id = 0
+  review_rows = []
+  booking_rows = []
+  for s, student_id in enumerate(student_ids):
+    for k in range(bookings_per_student):
+      date_id = (s * 37 + k * 97) % total_dates + 1
+      class_id = date_rows[date_id - 1][0]
+      status = ('cancelled', 'pending', 'confirmed', 'confirmed')[k % 4]
+      booking_rows.append((class_id, student_id, date_id, status))
+      booking_id += 1
+      if status == 'confirmed' and k % 2 == 0:
+        created_at = (start + timedelta(minutes=booking_id)).strftime('%Y-%m-%d %H:%M:%S')
+        review_rows.append((class_id, student_id, date_id, 1 + (s + k) % 5, '좋은 수업이었습니다.', booking_id, None, created_at))
+  conn.executemany("INSERT INTO class_booking (class_id, student_id, class_date_id, status) VALUES (?, ?, ?, ?)", booking_rows)
+  conn.executemany(
+    "INSERT INTO class_reviews (class_id, user_id, class_date_id, rating, comment, booking_id, instructor_comment, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    review_rows)
+  conn.execute("""
+    UPDATE class_dates SET booked_count = (
+      SELECT COUNT(*) FROM class_booking cb
+      WHERE cb.class_date_id = class_dates.id AND cb.status <> 'cancelled'
+    )""")
+  #클래스별 리뷰 집계
+  conn.execute("""
+    UPDATE class SET
+      review_count = (SELECT COUNT(*) FROM class_reviews cr WHERE cr.class_id = class.id),
+      rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM class_reviews cr WHERE cr.class_id = class.id),
+      rating_1 = (SELECT COUNT(*) FROM class_reviews cr WHERE cr.class_id = class.id AND cr.rating = 1),
+      rating_2 = (SELECT COUNT(*) FROM class_reviews cr WHERE cr.class_id = class.id AND cr.rating = 2),
+      rating_3 = (SELECT COUNT(*) FROM class_reviews cr WHERE cr.class_id = class.id AND cr.rating = 3),
+      rating_4 = (SELECT COUNT(*) FROM class_reviews cr WHERE cr.class_id = class.id AND cr.rating = 4),
+      rating_5 = (SELECT COUNT(*) FROM class_reviews cr WHERE cr.class_id = class.id AND cr.rating = 5)""")
+
+  #user_bookmarks
+  bookmark_rows = []
+  for s, student_id in enumerate(student_ids):
+    for k in range(bookmarks_per_student):
+      bookmark_rows.append((student_id, (s * 7 + k * 3) % classes + 1))
+  conn.executemany("INSERT INTO user_bookmarks (user_id, class_id) VALUES (?, ?)", bookmark_rows)
+
+  conn.commit()
+  conn.close()
+
+  return Fixture(
+    scale=scale,
+    instructor_id=1,
+    student_id=student_ids[0],
+    student_ids=student_ids,
+    student_email=users[student_ids[0] - 1][0],
+    class_id=1,
+    class_count=classes,
+    class_date_id=1,
+    total_dates=total_dates,
+    free_date_id=total_dates + 1,
+    region=REGIONS[0][0],
+    district=REGIONS[0][1][0],
+    city_gu_region=REGIONS[1][0],
+    city_gu_district=REGIONS[1][1][0],
+    no_district_region=REGIONS[3][0],
+    bbox=(37.45, 37.6, 126.9, 127.1),
+  )
@@ -0,0 +1,102 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+#목록 응답 직렬화 마이크로 벤치마크
+#기존 방식: DictCursor 행(dict) -> camelCase dict 로 복사 -> Flask 기본 JSON provider (표준 json)
+#변경 방식: 튜플 커서 행 -> control.projection 스키마로 바로 변환 -> orjson (control.json_encoder)
+#행당 CPU 시간과 요청 하나를 직렬화하는 동안의 할당량(tracemalloc 최대치)을 비교한다
+#server 디렉터리에서 실행: python -m bench.serialization --rows 5000
+
+
+def class_rows(count):
+  return [(i, f'클래스 {i}', f'클래스 {i} 설명 ' * 5, f'서울특별시 강남구 테스트로 {i}', 10000 + i, 15, 45, 3, 3, 3, 3, 3)
+          for i in range(1, count + 1)]
+
+def booking_rows(count):
+  base = datetime(2024, 1, 1, 10, 0, 0)
+  return [(i, 11, i % 60 + 1, i, 'confirmed', f'클래스 {i % 60 + 1}', '설명 ' * 5, base + timedelta(hours=i), i % 2)
+          for i in range(1, count + 1)]
+
+
+def as_dicts(schema, rows):
+  keys = [key for field in schema.fields for key in field.keys]
+  return [dict(zip(keys, row)) for row in rows]
+
+
+#기존 라우트의 복사 코드와 같은 형태
+def legacy_classes(dict_rows):
+  modified_classes = []
+  for class_data in dict_rows:
+    modified_classes.append({
+      "classId": class_data["id"],
+      "className": class_data["class_name"],
+      "description": class_data["description"],
+      "location": class_data["location"],
+      "cost": class_data["cost"],
+      "reviewCount": class_data["review_count"],
+      "ratingSum": class_data["rating_sum"],
+      "ratingHistogram": [class_data[f"rating_{n}"] for n in range(1, 6)]
+    })
+  return modified_classes
+
+def legacy_bookings(dict_rows):
+  for booking in dict_rows:
+    booking['has_reviewed'] = bool(booking['has_reviewed'])
+  return dict_rows
+
+
+def measure(fn, repeat):
+  fn()
+  started = time.perf_counter()
+  for _ in range(repeat):
+    fn()
+  elapsed = (time.perf_counter() - started) / repeat
+  tracemalloc.start()
+  fn()
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return elapsed, peak
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Compare list serialization paths.')
+  parser.add_argument('--rows', type=int, default=5000)
+  parser.add_argument('--repeat', type=int, default=20)
+  args = parser.parse_args(argv)
+
+  from flask import Flask
+  from flask.json.provider import DefaultJSONProvider
+  from control.json_encoder import dumps_bytes, orjson
+  from control.projection import CLASS_SUMMARY, BOOKING
+
+  app = Flask('serialization-bench')
+  legacy = DefaultJSONProvider(app)
+
+  cases = [
+    ('class_list', CLASS_SUMMARY, class_rows(args.rows), legacy_classes),
+    ('my_bookings', BOOKING, booking_rows(args.rows), legacy_bookings),
+  ]
+
+  print(f"rows: {args.rows}  orjson: {'yes' if orjson is not None else 'no (stdlib fallback)'}")
+  print(f"{'list':<14}{'path':<10}{'us/row':>9}{'peak KiB':>10}{'bytes':>10}")
+  with app.app_context():
+    for name, schema, rows, legacy_copy in cases:
+      #DictCursor 는 행마다 dict 를 만들므로 기존 방식은 그 비용까지 포함
+      def legacy_path():
+        return legacy.dumps({'status': 'success', 'data': legacy_copy(as_dicts(schema, rows))}).encode('utf-8')
+
+      def fast_path():
+        return dumps_bytes({'status': 'success', 'data': schema.rows(rows)})
+
+      for label, fn in (('legacy', legacy_path), ('schema', fast_path)):
+        elapsed, peak = measure(fn, args.repeat)
+        size = len(fn())
+        print(f"{name:<14}{label:<10}{elapsed / args.rows * 1e6:>9.2f}{peak / 1024:>10.0f}{size:>10}")
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,64 @@
+import argparse
+import sys
+import time
+
+#세션 저장소별 요청당 오버헤드 비교
+#세션을 읽기만 하는 요청과 세션에 쓰는 요청을 각각 측정하고, 세션을 사용하지 않는 요청과의 차이를 보고한다
+#server 디렉터리에서 실행: python -m bench.session_overhead --requests 2000
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Compare per-request overhead of the session backends.')
+  parser.add_argument('--requests', type=int, default=2000)
+  args = parser.parse_args(argv)
+
+  from bench.endpoints import prepare
+  #로컬 DB 에 연결된 풀을 사용하기 위해 앱을 부팅
+  main_app, pool, fx = prepare()
+
+  from flask import Flask, session
+  from control.session_backend import create_session_interface
+
+  def build_app(backend):
+    app = Flask(f'session-bench-{backend}')
+    app.secret_key = main_app.secret_key
+    app.session_interface = create_session_interface(backend)
+
+    @app.route('/none')
+    def no_session():
+      return 'ok'
+
+    @app.route('/read')
+    def read_session():
+      return str(session.get('_user_id'))
+
+    @app.route('/write')
+    def write_session():
+      session['_user_id'] = str(fx.student_id)
+      session['counter'] = session.get('counter', 0) + 1
+      return 'ok'
+
+    return app
+
+  def measure(client, path):
+    started = time.perf_counter()
+    for _ in range(args.requests):
+      client.get(path)
+    return (time.perf_counter() - started) / args.requests * 1e6
+
+  print(f"{'backend':<10}{'no session':>14}{'read':>14}{'write':>14}   (us/request, overhead vs no session)")
+  for backend in ('cookie', 'memory', 'sql'):
+    client = build_app(backend).test_client()
+    client.get('/write') #세션 생성
+    for path in ('/none', '/read', '/write'):
+      for _ in range(200):
+        client.get(path)
+    baseline = measure(client, '/none')
+    read = measure(client, '/read')
+    write = measure(client, '/write')
+    print(f"{backend:<10}{baseline:>14.0f}{read:>9.0f} (+{read - baseline:.0f}){write:>9.0f} (+{write - baseline:.0f})")
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
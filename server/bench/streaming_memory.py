@@ -0,0 +1,61 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+
+#전체 목록 응답과 스트리밍 응답(stream=1)의 최대 메모리 사용량 비교
+#카탈로그 크기(scale)를 키워가며 요청 한 번을 처리하는 동안의 tracemalloc 최대치와 첫 바이트까지의 시간을 측정한다
+#server 디렉터리에서 실행: python -m bench.streaming_memory --scales 1 4 16
+
+#(이름, 버퍼링 응답 경로, 스트리밍 경로). 리뷰는 버퍼링 응답이 항상 페이지 단위이므로 최대 페이지와 비교
+PATHS = [
+  ('class_list', '/api/class_list', '/api/class_list?stream=1'),
+  ('class_addresses', '/api/class_addresses', '/api/class_addresses?stream=1'),
+  ('reviews_all', '/api/reviews?limit=100', '/api/reviews?stream=1'),
+]
+
+
+#응답 본문을 청크 단위로 읽고 버림 (클라이언트 쪽에 본문을 쌓지 않음)
+def measure(client, path):
+  devnull = open(os.devnull, 'w')
+  tracemalloc.start()
+  tracemalloc.reset_peak()
+  started = time.perf_counter()
+  first_byte = None
+  size = 0
+  with contextlib.redirect_stdout(devnull):
+    response = client.get(path, buffered=False)
+    for chunk in response.response:
+      if first_byte is None:
+        first_byte = time.perf_counter() - started
+      size += len(chunk)
+    response.close()
+  elapsed = time.perf_counter() - started
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  devnull.close()
+  return peak, (first_byte or elapsed) * 1000, elapsed * 1000, size
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Compare peak memory of buffered and streamed list responses.')
+  parser.add_argument('--scales', type=int, nargs='+', default=[1, 4, 16])
+  args = parser.parse_args(argv)
+
+  from bench.endpoints import prepare
+
+  print(f"{'route':<18}{'scale':>6}{'mode':>8}{'bytes':>11}{'peak KiB':>10}{'ttfb ms':>9}{'total ms':>10}")
+  for scale in args.scales:
+    app, pool, fx = prepare(scale)
+    client = app.test_client()
+    for name, buffered_path, stream_path in PATHS:
+      for mode, url in (('buffer', buffered_path), ('stream', stream_path)):
+        peak, ttfb, total, size = measure(client, url)
+        print(f"{name:<18}{scale:>6}{mode:>8}{size:>11}{peak / 1024:>10.0f}{ttfb:>9.1f}{total:>10.1f}")
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,131 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+
+#gunicorn 워커 모드별 처리량 비교 (I/O 대기가 긴 요청)
+#카카오페이 대역 서버에 지연을 주고 결제 준비 API(DB 조회 + 카카오페이 호출 + DB 쓰기)를 동시에 호출한다
+#server 디렉터리에서 실행: python -m bench.worker_modes --workers 2 --clients 64 --latency-ms 200
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET_KEY = 'onedayclass-local-benchmark-secret-key'
+
+
+def make_token(user_id):
+  from flask import Flask
+  from flask_jwt_extended import JWTManager, create_access_token
+  app = Flask('worker-modes-bench')
+  app.secret_key = SECRET_KEY
+  JWTManager(app)
+  with app.app_context():
+    return create_access_token(identity=str(user_id), additional_claims={'role': 'student'})
+
+
+def start_server(mode, args, db_path, stub_url, workdir):
+  env = dict(os.environ,
+             WORKER_MODE=mode,
+             WEB_CONCURRENCY=str(args.workers),
+             PORT=str(args.port),
+             BENCH_DB=db_path,
+             SECRET_KEY=SECRET_KEY,
+             KAKAOPAY_BASE_URL=stub_url,
+             KAKAOPAY_ADMINKEY='stub-admin-key',
+             LOG_FILE=os.path.join(workdir, f'{mode}.log'))
+  process = subprocess.Popen(
+    [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'bench.wsgi_app:app'],
+    cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+  base_url = f'http://127.0.0.1:{args.port}'
+  deadline = time.monotonic() + 30
+  while time.monotonic() < deadline:
+    if process.poll() is not None:
+      raise RuntimeError(f'gunicorn ({mode}) exited with code {process.returncode}')
+    try:
+      requests.get(base_url + '/api/print', timeout=1)
+      return process, base_url
+    except requests.exceptions.ConnectionError:
+      time.sleep(0.2)
+  process.terminate()
+  raise RuntimeError(f'gunicorn ({mode}) did not start')
+
+
+def load(base_url, path, headers, clients, duration):
+  latencies, errors = [], [0]
+  lock = threading.Lock()
+  stop_at = time.monotonic() + duration
+
+  def client():
+    session = requests.Session()
+    while time.monotonic() < stop_at:
+      t0 = time.perf_counter()
+      try:
+        response = session.post(base_url + path, headers=headers, timeout=30)
+        ok = response.status_code == 200 and response.json().get('status') == 'success'
+      except requests.exceptions.RequestException:
+        ok = False
+      with lock:
+        if ok:
+          latencies.append((time.perf_counter() - t0) * 1000)
+        else:
+          errors[0] += 1
+
+  started = time.perf_counter()
+  threads = [threading.Thread(target=client) for _ in range(clients)]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  return latencies, errors[0], time.perf_counter() - started
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Compare gunicorn worker modes under I/O-bound load.')
+  parser.add_argument('--modes', nargs='+', default=['sync', 'gthread', 'gevent'])
+  parser.add_argument('--workers', type=int, default=2)
+  parser.add_argument('--clients', type=int, default=64)
+  parser.add_argument('--duration', type=float, default=5)
+  parser.add_argument('--latency-ms', type=float, default=200, help='simulated Kakao Pay latency')
+  parser.add_argument('--port', type=int, default=8790)
+  args = parser.parse_args(argv)
+
+  if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+  from bench import kakaopay_stub, seed
+  from bench.endpoints import percentile
+
+  workdir = tempfile.mkdtemp(prefix='onedayclass-worker-modes-')
+  db_path = os.path.join(workdir, 'bench.sqlite3')
+  fx = seed.build(db_path)
+  stub, stub_url = kakaopay_stub.start(latency=args.latency_ms / 1000)
+  headers = {'Authorization': f'Bearer {make_token(fx.student_id)}'}
+  path = f'/api/{fx.class_date_id}/payment'
+
+  print(f"workers: {args.workers}  clients: {args.clients}  duration: {args.duration:.0f}s  stub latency: {args.latency_ms:.0f}ms")
+  print(f"{'mode':<10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+  failed = False
+  for mode in args.modes:
+    if mode == 'gevent':
+      try:
+        import gevent #noqa: F401
+      except ImportError:
+        print(f"{mode:<10}  skipped (gevent is not installed)")
+        continue
+    process, base_url = start_server(mode, args, db_path, stub_url, workdir)
+    try:
+      latencies, errors, elapsed = load(base_url, path, headers, args.clients, args.duration)
+    finally:
+      process.terminate()
+      process.wait(timeout=30)
+    latencies.sort()
+    failed = failed or bool(errors)
+    print(f"{mode:<10}{len(latencies) / elapsed:>9.0f}{percentile(latencies, 50):>9.1f}"
+          f"{percentile(latencies, 95):>9.1f}{percentile(latencies, 99):>9.1f}{errors:>8}")
+  stub.shutdown()
+  return 1 if failed else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
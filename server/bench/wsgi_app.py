@@ -0,0 +1,7 @@
+import os
+from bench.endpoints import boot_app
+
+#gunicorn 으로 띄울 벤치마크용 앱 (BENCH_DB 의 시드된 로컬 DB 에 연결)
+#bench.worker_modes 가 WORKER_MODE 별로 gunicorn -c gunicorn.conf.py bench.wsgi_app:app 으로 실행
+
+app, pool = boot_app(os.environ['BENCH_DB'])
@@ -0,0 +1,71 @@
+from control.resource_versions import bump_class_dates_after_commit
+from db_model.mysql import is_duplicate_key
+from db_model import queries
+
+#예약 좌석 배정/반납
+#class_dates.booked_count 를 조건부 UPDATE 한 번으로 증가시켜 정원을 넘지 않게 하고,
+#잠금은 해당 예약날짜 행 하나에만, 커밋 직전까지만 걸리도록 좌석 배정을 트랜잭션의 마지막에 수행하고
+#예약날짜 ETag 버전은 커밋 뒤에 올린다
+
+
+class BookingError(Exception):
+  pass
+
+class AlreadyBooked(BookingError):
+  def __init__(self):
+    super().__init__('이미 예약된 수업입니다.')
+
+class ClassFull(BookingError):
+  def __init__(self):
+    super().__init__('예약 가능한 자리가 없습니다.')
+
+class BookingNotFound(BookingError):
+  def __init__(self):
+    super().__init__('Booking not found or already cancelled')
+
+
+#좌석 하나를 원자적으로 배정 (정원이 차 있으면 False)
+def admit_seat(cur, class_date_id):
+  cur.execute(queries.CLASS_DATES_ADMIT_SEAT, (class_date_id,))
+  return cur.rowcount == 1
+
+def release_seat(cur, class_date_id):
+  cur.execute(queries.CLASS_DATES_RELEASE_SEAT, (class_date_id,))
+
+
+#예약 (취소된 예약이 있으면 되살리고, 없으면 새로 생성)
+#(student_id, class_date_id) 유니크 제약으로 동시에 들어온 중복 예약도 하나만 남고 나머지는 1062 -> AlreadyBooked
+def reserve(conn, cur, class_id, student_id, class_date_id):
+  conn.begin()
+  try:
+    cur.execute(queries.BOOKING_REOPEN, (student_id, class_date_id))
+    if cur.rowcount == 0:
+      try:
+        cur.execute(queries.BOOKING_INSERT, (class_id, student_id, class_date_id))
+      except Exception as e:
+        if is_duplicate_key(e, queries.BOOKING_KEY):
+          raise AlreadyBooked() from e
+        raise
+    
+    if not admit_seat(cur, class_date_id):
+      raise ClassFull()
+    conn.commit()
+  except Exception:
+    conn.rollback()
+    raise
+  bump_class_dates_after_commit(cur, class_date_id)
+
+#예약 취소 후 좌석 반납 
+def cancel(conn, cur, student_id, class_date_id):
+  conn.begin()
+  try:
+    cur.execute(queries.BOOKING_CANCEL, (class_date_id, student_id))
+    if cur.rowcount == 0:
+      raise BookingNotFound()
+    
+    release_seat(cur, class_date_id)
+    conn.commit()
+  except Exception:
+    conn.rollback()
+    raise
+  bump_class_dates_after_commit(cur, class_date_id)
@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+#프로세스 내 LRU + TTL 캐시
+#gunicorn 워커마다 따로 존재하므로, 다른 워커에서 발생한 쓰기는 ttl 이 지나야 반영된다
+class TTLCache:
+  def __init__(self, maxsize=1024, ttl=60):
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self.hits = 0
+    self.misses = 0
+    self._data = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, key, default=None):
+    now = time.monotonic()
+    with self._lock:
+      item = self._data.get(key, _MISSING)
+      if item is not _MISSING:
+        expires_at, value = item
+        if expires_at > now:
+          self._data.move_to_end(key)
+          self.hits += 1
+          return value
+        del self._data[key]
+      self.misses += 1
+      return default
+
+  def set(self, key, value):
+    with self._lock:
+      self._data[key] = (time.monotonic() + self.ttl, value)
+      self._data.move_to_end(key)
+      while len(self._data) > self.maxsize:
+        self._data.popitem(last=False)
+
+  def delete(self, key):
+    with self._lock:
+      self._data.pop(key, None)
+
+  def clear(self):
+    with self._lock:
+      self._data.clear()
+
+  def stats(self):
+    with self._lock:
+      return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
@@ -0,0 +1,41 @@
+import hashlib
+from flask import Response
+from control.json_encoder import dumps_bytes
+from control.cache import TTLCache
+from control.resource_versions import not_modified
+
+#클래스 상세 페이지 캐시 (class_id -> (디코딩된 데이터, 직렬화된 응답 바이트, ETag))
+#update_class_by_instructor, delete_class_by_instructor, delete_user 에서 무효화
+class_detail_cache = TTLCache(maxsize=2048, ttl=60)
+class_additional_cache = TTLCache(maxsize=2048, ttl=60)
+
+CACHES = {
+  'class_detail': class_detail_cache,
+  'class_additional_data': class_additional_cache,
+}
+
+
+#응답 JSON 을 미리 직렬화 (jsonify 와 같은 인코더 사용)
+def serialize(payload):
+  return dumps_bytes(payload)
+
+#캐시 항목 생성 (ETag 는 응답 바이트의 해시라서 DB 조회 없이 비교 가능)
+def cache_entry(data, payload):
+  body = serialize(payload)
+  return (data, body, hashlib.sha1(body).hexdigest())
+
+#캐시된 바이트로 응답 생성 (If-None-Match 가 같으면 304)
+def cached_response(entry):
+  response = not_modified(entry[2])
+  if response is not None:
+    return response
+  response = Response(entry[1], mimetype='application/json')
+  response.set_etag(entry[2])
+  return response
+
+def invalidate_class(class_id):
+  for cache in CACHES.values():
+    cache.delete(int(class_id))
+
+def cache_stats():
+  return {name: cache.stats() for name, cache in CACHES.items()}
@@ -0,0 +1,34 @@
+from db_model.mysql import conn_mysqldb
+from control.class_cache import invalidate_class
+from control.spatial_index import class_locations
+from control import resource_versions
+
+#클래스 등록/수정/삭제 후 프로세스 내 캐시와 인덱스를 갱신하고 ETag 버전을 올림 (커밋 이후에 호출)
+#cur: 호출한 쪽이 이미 잡고 있는 커넥션의 DictCursor (커넥션을 잡은 채 풀에서 하나 더 꺼내지 않도록, 없으면 새로 연결)
+
+def class_saved(class_id, cur=None):
+  invalidate_class(class_id)
+  class_locations.refresh(class_id, cur)
+  _bump_versions(class_id, cur)
+
+def class_deleted(class_id, cur=None):
+  invalidate_class(class_id)
+  class_locations.remove(class_id)
+  _bump_versions(class_id, cur)
+
+#리뷰 작성/삭제로 리뷰 집계가 바뀐 경우 (버전은 리뷰 트랜잭션에서 이미 올림)
+def class_rated(class_id, cur=None):
+  invalidate_class(class_id)
+  class_locations.refresh(class_id, cur)
+
+#목록/주소/리뷰(클래스 이름 포함)와 예약날짜(클래스 이름 포함) 응답이 바뀜
+def _bump_versions(class_id, cur=None):
+  if cur is not None:
+    resource_versions.bump(cur, resource_versions.CLASS_CATALOG, resource_versions.class_dates_key(class_id))
+    return
+  conn, cur = conn_mysqldb()
+  try:
+    _bump_versions(class_id, cur)
+  finally:
+    cur.close()
+    conn.close()
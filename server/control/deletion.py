@@ -0,0 +1,202 @@
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from db_model.mysql import conn_mysqldb, dict_cursor
+from db_model import queries
+from control import ratings, resource_versions, user_cache
+from control.class_events import class_deleted, class_rated
+from control.email_filter import registered_emails
+from control.runtime import DELETION_WORKERS
+
+#계정/클래스 삭제 (연관된 모든 테이블을 청크 단위로 삭제)
+#단계마다 대상 행 id 를 CHUNK_SIZE 개씩 잠그고 지운 뒤 바로 커밋하므로, 예약 테이블의 행 잠금은 청크 하나 동안만 유지된다
+#각 단계는 조건으로 남은 행을 다시 찾으므로 중간에 실패해도 같은 삭제를 다시 실행하면 이어서 지워진다
+#백그라운드 실행 시 deletion_jobs 테이블에 진행 상태를 기록한다 (GET /api/deletion_jobs/<job_id>)
+
+CHUNK_SIZE = 500
+CHUNK_PAUSE = 0.05 #백그라운드 실행 시 청크 사이 대기 (초), 그 사이 예약 요청이 잠금을 가져감
+
+logger = logging.getLogger(__name__)
+
+#삭제 작업은 한 번에 하나씩 (여러 작업이 커넥션과 잠금을 동시에 잡지 않도록)
+_executor = ThreadPoolExecutor(max_workers=DELETION_WORKERS, thread_name_prefix='deletion')
+
+
+class Step:
+  def __init__(self, table, condition, params, on_chunk=None, columns=None, key='id'):
+    self.table = table
+    self.key = key #청크를 나누고 지울 때 쓰는 기본 키 컬럼
+    self.condition = condition #삭제 대상 조건 (params 로 바인딩)
+    self.params = params
+    self.on_chunk = on_chunk #삭제 직전 같은 트랜잭션에서 호출 (cur, rows, notify)
+    self.columns = columns or key #on_chunk 에 넘길 컬럼 (첫 번째는 key)
+
+
+#클래스 리뷰 집계 차감, 리뷰 목록/클래스 목록 ETag 갱신
+def _reviews_changed(cur, rows, notify):
+  ratings.removed(cur, [(row[1], row[2]) for row in rows])
+  resource_versions.bump(cur, resource_versions.REVIEWS, resource_versions.CLASS_CATALOG)
+  notify['rated'].update(row[1] for row in rows)
+
+#지워지는 활성 예약만큼 예약 인원 카운터 차감 (수강생 한 명은 예약날짜마다 예약이 하나뿐)
+def _release_seats(cur, rows, notify):
+  active = [row for row in rows if row[3] != 'cancelled']
+  if not active:
+    return
+  cur.execute(queries.CLASS_DATES_RELEASE_SEATS(len(active)), [row[2] for row in active])
+  resource_versions.bump(cur, *{resource_versions.class_dates_key(row[1]) for row in active})
+
+#커밋 이후 캐시/공간 인덱스에서 제거
+def _classes_deleted(cur, rows, notify):
+  notify['deleted'].update(row[0] for row in rows)
+
+#커밋 이후 가입 이메일 필터에서 제거
+def _users_deleted(cur, rows, notify):
+  notify['emails'].update(row[1] for row in rows)
+
+
+#결제/예약날짜를 먼저 지워 새 예약이 들어오지 않게 한 뒤, 나머지 연관 데이터와 클래스 행을 삭제
+def _class_steps(class_condition, params):
+  classes = f"class_id IN (SELECT id FROM class WHERE {class_condition})"
+  class_dates = f"class_date_id IN (SELECT id FROM class_dates WHERE {classes})"
+  return [
+    Step('payment_approval_jobs', class_dates, params, key='payment_id'),
+    Step('payment', class_dates, params),
+    Step('class_dates', classes, params),
+    Step('class_reviews', classes, params, _reviews_changed, columns='id, class_id, rating'),
+    Step('class_booking', classes, params),
+    Step('user_bookmarks', classes, params),
+    Step('class', class_condition, params, _classes_deleted),
+  ]
+
+#수강생으로 남긴 데이터 -> 강사로 등록한 클래스 -> 사용자 행
+def user_steps(user_id):
+  params = (int(user_id),)
+  return [
+    Step('class_reviews', "user_id = %s", params, _reviews_changed, columns='id, class_id, rating'),
+    Step('class_booking', "student_id = %s", params, _release_seats, columns='id, class_id, class_date_id, status'),
+    Step('user_bookmarks', "user_id = %s", params),
+    Step('payment_approval_jobs', "user_id = %s", params, key='payment_id'),
+    Step('payment', "user_id = %s", params),
+    *_class_steps("instructor_id = %s", params),
+    Step('user_info', "id = %s", params, _users_deleted, columns='id, email'),
+  ]
+
+def class_steps(class_id, instructor_id):
+  return _class_steps("id = %s AND instructor_id = %s", (int(class_id), int(instructor_id)))
+
+
+def _delete_in_chunks(conn, cur, step, notify, pause):
+  deleted = 0
+  while True:
+    conn.begin()
+    try:
+      cur.execute(queries.DELETION_LOCK_CHUNK(step.table, step.columns, step.condition, step.key), (*step.params, CHUNK_SIZE))
+      rows = cur.fetchall()
+      if rows:
+        if step.on_chunk:
+          step.on_chunk(cur, rows, notify)
+        cur.execute(queries.DELETION_DELETE_CHUNK(step.table, step.key, len(rows)), [row[0] for row in rows])
+        deleted += cur.rowcount
+      conn.commit()
+    except Exception:
+      conn.rollback()
+      raise
+    if len(rows) < CHUNK_SIZE:
+      return deleted
+    if pause:
+      time.sleep(pause)
+
+#단계를 순서대로 실행하고 삭제한 행 수를 반환 (conn 은 conn_mysqldb(tuples=True) 로 연 커넥션)
+#on_step(table, deleted): 단계 시작 전 호출 (진행 상태 기록용)
+def run_steps(conn, cur, steps, pause=0, on_step=None):
+  deleted = 0
+  notify = {'deleted': set(), 'rated': set(), 'emails': set()}
+  try:
+    for step in steps:
+      if on_step:
+        on_step(step.table, deleted)
+      deleted += _delete_in_chunks(conn, cur, step, notify, pause)
+  finally:
+    #같은 커넥션으로 캐시/공간 인덱스 갱신 (인덱스는 dict 행을 사용)
+    events_cur = dict_cursor(conn)
+    try:
+      for class_id in notify['deleted']:
+        class_deleted(class_id, events_cur)
+      for class_id in notify['rated'] - notify['deleted']:
+        class_rated(class_id, events_cur)
+    finally:
+      events_cur.close()
+    for email in notify['emails']:
+      registered_emails.remove(email)
+  return deleted
+
+
+def delete_user(conn, cur, user_id, pause=0, on_step=None):
+  deleted = run_steps(conn, cur, user_steps(user_id), pause, on_step)
+  user_cache.invalidate(user_id)
+  return deleted
+
+def delete_class(conn, cur, class_id, instructor_id, pause=0, on_step=None):
+  return run_steps(conn, cur, class_steps(class_id, instructor_id), pause, on_step)
+
+
+#백그라운드 삭제 작업
+#kind: 'user' (target_id = owner_id = user_id) | 'class' (target_id = class_id, owner_id = instructor_id)
+def create_job(cur, kind, target_id, owner_id):
+  cur.execute(queries.DELETION_JOB_INSERT, (kind, int(target_id), int(owner_id)))
+  return cur.lastrowid
+
+def get_job(cur, job_id):
+  cur.execute(queries.DELETION_JOB_BY_ID, (job_id,))
+  return cur.fetchone()
+
+#after: 작업이 끝난 뒤 같은 프로세스에서 호출할 함수 (라우트 쪽 캐시 정리 등)
+def submit(job_id, after=None):
+  return _executor.submit(run_job, job_id, after)
+
+def run_job(job_id, after=None, pause=CHUNK_PAUSE):
+  conn, cur = conn_mysqldb(tuples=True)
+  try:
+    cur.execute(queries.DELETION_JOB_TARGET, (job_id,))
+    kind, target_id, owner_id = cur.fetchone()
+    cur.execute(queries.DELETION_JOB_START, (job_id,))
+
+    def on_step(table, deleted):
+      cur.execute(queries.DELETION_JOB_STEP, (table, deleted, job_id))
+
+    try:
+      if kind == 'user':
+        deleted = delete_user(conn, cur, target_id, pause, on_step)
+      else:
+        deleted = delete_class(conn, cur, target_id, owner_id, pause, on_step)
+    except Exception as e:
+      logger.exception("deletion job %s failed", job_id)
+      cur.execute(queries.DELETION_JOB_FAIL, (str(e), job_id))
+      return
+    cur.execute(queries.DELETION_JOB_DONE, (deleted, job_id))
+  finally:
+    cur.close()
+    conn.close()
+  if after:
+    after()
+
+#끝나지 않은 작업(프로세스 재시작 등으로 중단되었거나 실패한 작업)을 다시 실행
+#server 디렉터리에서 실행: python -m control.deletion
+def resume_jobs():
+  conn, cur = conn_mysqldb(tuples=True)
+  try:
+    cur.execute(queries.DELETION_JOBS_UNFINISHED)
+    job_ids = [row[0] for row in cur.fetchall()]
+  finally:
+    cur.close()
+    conn.close()
+  for job_id in job_ids:
+    run_job(job_id, pause=0)
+  return job_ids
+
+
+if __name__ == '__main__':
+  logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+  print(f"{len(resume_jobs())} deletion jobs resumed")
@@ -0,0 +1,110 @@
+import hashlib
+import math
+import threading
+import time
+from db_model.mysql import conn_mysqldb
+from db_model import queries
+
+#가입된 이메일의 카운팅 블룸 필터 (회원가입 중복 확인용)
+#"없음" 은 확실하므로 DB 조회 없이 바로 가입을 진행하고, "있을 수도 있음" 일 때만 user_info 를 조회한다
+#중복 여부의 최종 판단은 user_info.email 유니크 인덱스가 하므로, 필터가 오래되어도 결과가 틀리지는 않는다
+#(다른 워커에서 가입한 이메일을 모르면 INSERT 에서 중복으로 걸러지고, 지워진 이메일이 남아 있으면 DB 조회가 한 번 더 생길 뿐)
+#워커마다 처음 사용할 때 user_info 전체 이메일로 만들고, REBUILD_INTERVAL 마다 또는 용량을 넘으면 다시 만든다
+
+FALSE_POSITIVE_RATE = 0.01
+MIN_CAPACITY = 10000
+REBUILD_INTERVAL = 3600 #초
+LOAD_BATCH_SIZE = 5000
+
+
+def normalize(email):
+  return email.strip().lower()
+
+
+class CountingBloomFilter:
+  def __init__(self, capacity, error_rate=FALSE_POSITIVE_RATE):
+    self.capacity = capacity
+    self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+    self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+    self.count = 0
+    self._counters = bytearray(self.size) #255 에서 멈추는 카운터 (멈춘 칸은 제거하지 않음)
+
+  def _indexes(self, key):
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+  def add(self, key):
+    for index in self._indexes(key):
+      if self._counters[index] < 255:
+        self._counters[index] += 1
+    self.count += 1
+
+  def remove(self, key):
+    indexes = self._indexes(key)
+    if not all(self._counters[index] for index in indexes):
+      return
+    for index in indexes:
+      if self._counters[index] < 255:
+        self._counters[index] -= 1
+    self.count -= 1
+
+  def __contains__(self, key):
+    return all(self._counters[index] for index in self._indexes(key))
+
+
+class EmailFilter:
+  def __init__(self):
+    self._filter = None
+    self.built_at = None
+    self._lock = threading.Lock()
+
+  def _build(self):
+    conn, cur = conn_mysqldb(unbuffered=True, tuples=True)
+    try:
+      cur.execute(queries.USER_COUNT)
+      total = cur.fetchone()[0]
+      bloom = CountingBloomFilter(max(MIN_CAPACITY, total * 2))
+      cur.execute(queries.USER_EMAILS)
+      while True:
+        rows = cur.fetchmany(LOAD_BATCH_SIZE)
+        if not rows:
+          break
+        for row in rows:
+          bloom.add(normalize(row[0]))
+    finally:
+      cur.close()
+      conn.close()
+    return bloom
+
+  def _current(self):
+    bloom = self._filter
+    if bloom is not None and bloom.count <= bloom.capacity and time.monotonic() - self.built_at < REBUILD_INTERVAL:
+      return bloom
+    with self._lock:
+      bloom = self._filter
+      if bloom is None or bloom.count > bloom.capacity or time.monotonic() - self.built_at >= REBUILD_INTERVAL:
+        bloom = self._build()
+        self._filter = bloom
+        self.built_at = time.monotonic()
+      return bloom
+
+  #False 면 가입된 적 없는 이메일 (DB 확인 불필요)
+  def might_contain(self, email):
+    return normalize(email) in self._current()
+
+  #가입/이메일 변경 후 호출 (필터가 아직 없으면 다음 빌드 때 포함됨)
+  def add(self, email):
+    with self._lock:
+      if self._filter is not None:
+        self._filter.add(normalize(email))
+
+  #계정삭제 후 호출
+  def remove(self, email):
+    with self._lock:
+      if self._filter is not None:
+        self._filter.remove(normalize(email))
+
+
+registered_emails = EmailFilter()
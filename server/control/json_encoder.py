@@ -0,0 +1,39 @@
+import json
+from flask.json.provider import DefaultJSONProvider
+
+#orjson 기반 JSON 직렬화 (설치되어 있지 않으면 표준 json 으로 동작)
+#jsonify 와 같은 결과를 내도록 키 정렬을 유지하고, datetime/date/Decimal/UUID 는
+#Flask 기본 provider 의 변환 규칙(HTTP date 문자열 등)을 그대로 사용한다
+#한글은 \uXXXX 이스케이프 대신 UTF-8 그대로 출력된다
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+if orjson is not None:
+  ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+                    | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+_default = DefaultJSONProvider.default
+
+
+#응답 본문용 bytes (줄바꿈 없음)
+def dumps_bytes(obj):
+  if orjson is not None:
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+  return json.dumps(obj, default=_default, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+  def dumps(self, obj, **kwargs):
+    if orjson is None or kwargs:
+      return super().dumps(obj, **kwargs)
+    return dumps_bytes(obj).decode('utf-8')
+
+  #들여쓰기 출력이 필요 없으면 bytes 를 바로 응답 본문으로 사용
+  def response(self, *args, **kwargs):
+    if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+      return super().response(*args, **kwargs)
+    obj = self._prepare_response_obj(args, kwargs)
+    return self._app.response_class(dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
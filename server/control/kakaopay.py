@@ -0,0 +1,87 @@
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from db_model import metrics
+
+#카카오페이 API 클라이언트
+#keep-alive 커넥션 풀을 재사용하고, 연결/응답 타임아웃과 제한된 재시도를 적용한다
+
+load_dotenv('.env.local')
+
+KAKAOPAY_BASE_URL = os.getenv('KAKAOPAY_BASE_URL', 'https://kapi.kakao.com')
+KAKAOPAY_ADMIN_KEY = os.getenv('KAKAOPAY_ADMINKEY')
+CONNECT_TIMEOUT = float(os.getenv('KAKAOPAY_CONNECT_TIMEOUT', '3'))
+READ_TIMEOUT = float(os.getenv('KAKAOPAY_READ_TIMEOUT', '10'))
+POOL_SIZE = int(os.getenv('KAKAOPAY_POOL_SIZE', '10'))
+MAX_RETRIES = int(os.getenv('KAKAOPAY_MAX_RETRIES', '2'))
+RETRY_BACKOFF = 0.2
+KAKAOPAY_CID = "TC0ONETIME" # 테스트용 CID
+
+request_latency = metrics.REGISTRY.register(metrics.Histogram(
+  'kakaopay_request_duration_seconds', 'Kakao Pay API latency by endpoint and outcome.', labels=('endpoint', 'outcome')))
+
+
+class KakaoPayError(Exception):
+  def __init__(self, message, status_code=None, body=None):
+    super().__init__(message)
+    self.status_code = status_code
+    self.body = body
+
+
+class KakaoPayClient:
+  def __init__(self, base_url=KAKAOPAY_BASE_URL, admin_key=KAKAOPAY_ADMIN_KEY,
+               connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+               pool_size=POOL_SIZE, max_retries=MAX_RETRIES):
+    self.base_url = base_url.rstrip('/')
+    self.timeout = (connect_timeout, read_timeout)
+    self.max_retries = max_retries
+    self.session = requests.Session()
+    self.session.mount(self.base_url, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    self.session.headers.update({
+      "Authorization": f"KakaoAK {admin_key}",
+      "Content-type": "application/x-www-form-urlencoded;charset=utf-8"
+    })
+
+  #결제 준비
+  def ready(self, params):
+    return self._post('/v1/payment/ready', params, idempotent=False)
+
+  #결제 승인
+  def approve(self, params):
+    return self._post('/v1/payment/approve', params, idempotent=False)
+
+  #결제 상태 조회 (여러 번 호출해도 안전)
+  def order(self, cid, tid):
+    return self._post('/v1/payment/order', {'cid': cid, 'tid': tid}, idempotent=True)
+
+  #연결 자체가 실패한 경우(요청이 전달되지 않음)는 항상 재시도하고,
+  #응답 타임아웃이나 5xx 는 멱등한 호출만 재시도한다
+  def _post(self, path, data, idempotent):
+    endpoint = path.rsplit('/', 1)[-1]
+    attempt = 0
+    while True:
+      started = time.perf_counter()
+      try:
+        response = self.session.post(self.base_url + path, data=data, timeout=self.timeout)
+      except requests.exceptions.ConnectTimeout as e:
+        request_latency.observe(time.perf_counter() - started, endpoint, 'connect_error')
+        error, retryable = KakaoPayError(f'Kakao Pay connection failed: {e}'), True
+      except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectionError) as e:
+        request_latency.observe(time.perf_counter() - started, endpoint, 'error')
+        error, retryable = KakaoPayError(f'Kakao Pay request failed: {e}'), idempotent
+      else:
+        request_latency.observe(time.perf_counter() - started, endpoint, str(response.status_code))
+        if response.status_code == 200:
+          return response.json()
+        error = KakaoPayError(f'Kakao Pay {endpoint} failed', response.status_code, response.text)
+        retryable = idempotent and response.status_code >= 500
+
+      if not retryable or attempt >= self.max_retries:
+        raise error
+      time.sleep(RETRY_BACKOFF * (2 ** attempt))
+      attempt += 1
+
+
+kakaopay = KakaoPayClient()
@@ -0,0 +1,103 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from flask import g, request
+
+#구조화(JSON) 로그 설정
+#요청 스레드는 큐에 레코드를 넣기만 하고, 파일/표준출력 쓰기는 백그라운드 스레드가 담당한다
+#LOG_LEVEL (기본 INFO), LOG_FILE (기본 app.log, '-' 이면 표준출력)
+
+QUEUE_SIZE = 10000
+RECORD_FIELDS = ('route', 'method', 'path', 'status', 'duration_ms', 'db_ms', 'db_queries', 'query', 'rows', 'params')
+
+
+class JsonFormatter(logging.Formatter):
+  def format(self, record):
+    payload = {
+      'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+      'level': record.levelname,
+      'logger': record.name,
+      'msg': record.getMessage(),
+    }
+    for field in RECORD_FIELDS:
+      value = getattr(record, field, None)
+      if value is not None:
+        payload[field] = value
+    if record.exc_text:
+      payload['exc'] = record.exc_text
+    elif record.exc_info:
+      payload['exc'] = self.formatException(record.exc_info)
+    return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+#큐가 가득 차면 요청을 막지 않고 레코드를 버림
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+  def __init__(self, log_queue):
+    super().__init__(log_queue)
+    self.dropped = 0
+
+  def enqueue(self, record):
+    try:
+      self.queue.put_nowait(record)
+    except queue.Full:
+      self.dropped += 1
+
+  #예외 스택만 미리 문자열로 만들고 JSON 변환은 백그라운드 스레드에서 수행
+  def prepare(self, record):
+    record = logging.makeLogRecord(record.__dict__)
+    record.msg = record.getMessage()
+    record.args = None
+    if record.exc_info:
+      record.exc_text = logging.Formatter().formatException(record.exc_info)
+      record.exc_info = None
+    return record
+
+
+def configure_logging(app):
+  level = os.getenv('LOG_LEVEL', 'INFO').upper()
+  target = os.getenv('LOG_FILE', 'app.log')
+
+  output = logging.StreamHandler(sys.stdout) if target == '-' else logging.FileHandler(target, encoding='utf-8')
+  output.setFormatter(JsonFormatter())
+
+  log_queue = queue.Queue(QUEUE_SIZE)
+  handler = DroppingQueueHandler(log_queue)
+  listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+  listener.start()
+  atexit.register(listener.stop)
+
+  root = logging.getLogger()
+  root.handlers = [handler]
+  root.setLevel(level)
+
+  access_log = logging.getLogger('access')
+
+  @app.before_request
+  def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.db_time = 0.0
+    g.db_queries = 0
+
+  #요청마다 라우트, 상태, 소요시간, DB 시간, 쿼리 수를 한 줄로 기록
+  @app.after_request
+  def log_request(response):
+    started = g.get('request_started')
+    if started is not None and access_log.isEnabledFor(logging.INFO):
+      access_log.info('request', extra={
+        'route': request.endpoint,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+        'db_ms': round(g.get('db_time', 0.0) * 1000, 2),
+        'db_queries': g.get('db_queries', 0),
+      })
+    return response
+
+  return listener
@@ -0,0 +1,35 @@
+import threading
+from flask import request
+from control.cache import TTLCache
+
+#비밀번호 실패 횟수 제한 (해시를 계산하기 전에 확인)
+#계정(email / user_id)과 IP 별로 실패를 세고, 한도를 넘으면 마지막 실패 후 WINDOW 초 동안 시도를 막는다
+#워커 프로세스마다 따로 세므로 실제 한도는 워커 수만큼 늘어난다 (해시 폭주를 막는 용도)
+
+WINDOW = 15 * 60 #초
+ACCOUNT_LIMIT = 5
+IP_LIMIT = 30
+
+_failures = TTLCache(maxsize=50000, ttl=WINDOW)
+_lock = threading.Lock()
+
+
+#프록시(railway) 뒤에서는 프록시가 마지막에 붙인 X-Forwarded-For 값이 실제 접속 IP
+def client_ip():
+  route = request.access_route
+  return route[-1] if route else request.remote_addr
+
+def _keys(account):
+  return [(('account', str(account).lower()), ACCOUNT_LIMIT), (('ip', client_ip()), IP_LIMIT)]
+
+def is_blocked(account):
+  return any(_failures.get(key, 0) >= limit for key, limit in _keys(account))
+
+def record_failure(account):
+  with _lock:
+    for key, _ in _keys(account):
+      _failures.set(key, _failures.get(key, 0) + 1)
+
+#성공하면 계정의 실패 횟수만 초기화 (IP 는 다른 계정 시도가 섞여 있을 수 있으므로 유지)
+def record_success(account):
+  _failures.delete(('account', str(account).lower()))
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+#키셋(커서) 페이지네이션 공통 처리
+#커서는 "정렬키,id" 형태의 문자열이며 다음 페이지 요청 시 before= 로 그대로 전달된다
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+#limit 파라미터 검증 (최대값을 넘으면 최대값으로 제한)
+def parse_limit(raw, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+  if raw is None or raw == '':
+    return default
+  limit = int(raw)
+  if limit < 1:
+    raise ValueError('limit must be a positive integer')
+  return min(limit, maximum)
+
+def format_datetime(value):
+  if isinstance(value, datetime):
+    return value.strftime(DATETIME_FORMAT)
+  return str(value)
+
+#"YYYY-MM-DD HH:MM:SS,id" 형태의 커서 생성
+def encode_datetime_cursor(value, row_id):
+  return f"{format_datetime(value)},{row_id}"
+
+#커서를 (datetime 문자열, id) 로 분리 (없으면 None)
+def decode_datetime_cursor(raw):
+  if not raw:
+    return None
+  try:
+    value, row_id = raw.rsplit(',', 1)
+    value = datetime.strptime(value.strip(), DATETIME_FORMAT).strftime(DATETIME_FORMAT)
+    return value, int(row_id)
+  except ValueError:
+    raise ValueError('Invalid cursor')
+
+#정수 id 하나로 이루어진 커서
+def decode_id_cursor(raw):
+  if not raw:
+    return None
+  try:
+    return int(raw)
+  except ValueError:
+    raise ValueError('Invalid cursor')
+
+#limit 또는 after 가 주어진 요청만 페이지 단위로 응답 (파라미터가 없으면 기존처럼 전체 목록)
+def wants_page(args):
+  return 'limit' in args or 'after' in args
+
+#limit + 1 개를 조회한 결과에서 다음 페이지 존재 여부를 판단
+def split_page(rows, limit):
+  if len(rows) > limit:
+    return rows[:limit], True
+  return rows, False
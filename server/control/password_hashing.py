@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import check_password_hash, generate_password_hash
+from db_model import metrics
+from control.runtime import password_hash_workers, password_hash_queue
+
+#비밀번호 해시 계산을 요청 스레드 대신 전용 프로세스 풀에서 실행
+#해시는 일부러 CPU 를 많이 쓰므로 요청 스레드에서 계산하면 로그인이 몰릴 때 같은 워커의 다른 요청이 모두 밀린다
+#실행 중 + 대기 중인 작업이 PASSWORD_HASH_QUEUE 를 넘으면 기다리지 않고 HashingBusy 를 던진다 (라우트는 503 으로 응답)
+#풀은 워커 프로세스마다 처음 사용할 때 만든다 (gunicorn fork 이후, 스레드가 있는 프로세스를 fork 하지 않도록 spawn)
+
+#현재 해시 파라미터. 다른 파라미터로 저장된 해시는 로그인 성공 시 이 값으로 다시 해시한다
+METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+TIMEOUT = 10 #초
+
+hash_jobs = metrics.REGISTRY.register(metrics.Counter(
+  'password_hash_jobs_total', 'Password hash jobs by outcome.', labels=('outcome',)))
+
+
+class HashingBusy(Exception):
+  pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(password_hash_queue(), 1))
+
+def _get_pool():
+  global _pool
+  with _pool_lock:
+    if _pool is None:
+      _pool = ProcessPoolExecutor(max_workers=password_hash_workers(), mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+def _reset_pool():
+  global _pool
+  with _pool_lock:
+    pool, _pool = _pool, None
+  if pool is not None:
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _run(fn, *args):
+  if password_hash_workers() <= 0:
+    hash_jobs.inc('inline')
+    return fn(*args)
+  if not _slots.acquire(blocking=False):
+    hash_jobs.inc('rejected')
+    raise HashingBusy()
+  future = None
+  try:
+    future = _get_pool().submit(fn, *args)
+    #슬롯은 작업이 실제로 끝날 때 반납 (시간 초과로 요청이 먼저 돌아가도 해시 프로세스는 계속 계산 중)
+    future.add_done_callback(lambda _: _slots.release())
+    result = future.result(timeout=TIMEOUT)
+    hash_jobs.inc('done')
+    return result
+  except FutureTimeout:
+    #풀이 밀려 있는 상태이므로 대기열이 가득 찬 경우와 같이 503
+    hash_jobs.inc('timeout')
+    raise HashingBusy()
+  except BrokenProcessPool:
+    #해시 프로세스가 죽은 경우 다음 요청에서 새로 만듦
+    _reset_pool()
+    hash_jobs.inc('failed')
+    raise
+  finally:
+    #제출하지 못한 경우에만 여기서 반납
+    if future is None:
+      _slots.release()
+
+
+#프로세스 풀에서 실행되는 함수들
+def _verify(pwhash, password, method):
+  if not check_password_hash(pwhash, password):
+    return False, None
+  if pwhash.split('$', 1)[0] != method:
+    return True, generate_password_hash(password, method)
+  return True, None
+
+def _generate(password, method):
+  return generate_password_hash(password, method)
+
+
+#(일치 여부, 다시 해시한 값 또는 None) 반환. 저장된 해시가 현재 파라미터가 아니면 같은 작업에서 새 해시를 만든다
+def verify(pwhash, password):
+  return _run(_verify, pwhash, password, METHOD)
+
+def generate(password):
+  return _run(_generate, password, METHOD)
@@ -0,0 +1,244 @@
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from db_model import metrics, queries
+from db_model.mysql import conn_mysqldb, is_duplicate_key
+from control.kakaopay import kakaopay, KakaoPayError, KAKAOPAY_CID
+from control.resource_versions import bump_class_dates_after_commit
+from control.runtime import payment_approval_workers, payment_approval_poll_interval
+
+#결제 승인 작업 큐 (payment_approval_jobs 테이블)
+#결제 성공 요청은 작업을 기록하고 바로 응답하며, 카카오페이 승인 호출과 예약/결제 확정은 워커 스레드가 처리한다
+#승인 응답이 느려져도 기다리는 것은 PAYMENT_APPROVAL_WORKERS 개의 워커 스레드뿐이고 요청 스레드는 묶이지 않는다
+#payment_id 가 작업의 키이므로 같은 결제를 여러 번 요청해도 승인은 한 번만 진행된다
+#카카오페이 호출 중에는 DB 커넥션을 잡고 있지 않는다
+#클라이언트는 GET /api/payment/<payment_id>/status 로 상태를 조회 (pending | running | done | failed)
+#승인 뒤 확정할 예약이 없으면(예약 대기 중 취소) 결제는 refund_required, 작업은 failed 로 남기고 오류 로그 (환불은 수동 처리)
+#재시도는 next_attempt_at 에 기록하고, 워커마다 하나씩 도는 폴러 스레드가 실행할 때가 된 작업을 다시 실행한다
+#(프로세스가 재시작되어도 대기 중인 재시도와 멈춘 작업이 DB 에 남아 있으므로 이어서 처리됨)
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 2 #초, 시도할 때마다 두 배
+STALE_AFTER = 120 #초, running 상태로 이보다 오래 멈춘 작업은 워커가 중단된 것으로 보고 다시 실행
+
+logger = logging.getLogger(__name__)
+
+approval_jobs = metrics.REGISTRY.register(metrics.Counter(
+  'payment_approval_jobs_total', 'Payment approval jobs by outcome.', labels=('outcome',)))
+
+_executor = ThreadPoolExecutor(max_workers=max(payment_approval_workers(), 1), thread_name_prefix='payment-approval')
+_queued = set() #이 워커의 실행기에 들어가 있는 작업 (폴러가 같은 작업을 중복으로 넣지 않도록)
+_queued_lock = threading.Lock()
+_poller = None
+
+
+class ApprovalError(Exception):
+  pass
+
+
+#DB 서버와 워커의 시계가 달라도 비교가 어긋나지 않도록 이 모듈의 시각은 모두 워커 시계로 기록
+def _now():
+  return datetime.now().replace(microsecond=0)
+
+def get_job(cur, payment_id):
+  cur.execute(queries.APPROVAL_JOB_BY_ID, (payment_id,))
+  return cur.fetchone()
+
+#결제한 사용자의 결제인지 확인하고 작업을 기록한 뒤 작업 행을 반환 (이미 있으면 기존 작업 그대로)
+#(cur 는 conn_mysqldb() 의 DictCursor)
+def enqueue(cur, payment_id, user_id, class_date_id, pg_token):
+  cur.execute(queries.PAYMENT_FOR_APPROVAL, (payment_id,))
+  payment = cur.fetchone()
+  if not payment or str(payment['user_id']) != str(user_id) or str(payment['class_date_id']) != str(class_date_id) \
+      or not payment['tid']:
+    raise ApprovalError("Required payment information is missing or invalid")
+
+  now = _now()
+  try:
+    cur.execute(queries.APPROVAL_JOB_INSERT, (int(payment_id), int(user_id), int(class_date_id), pg_token, now, now, now))
+    approval_jobs.inc('queued')
+  except Exception as e:
+    #같은 결제로 다시 요청한 경우 (payment_id 기본 키 위반만, 그 외 오류는 그대로)
+    if not is_duplicate_key(e, queries.APPROVAL_JOB_KEY):
+      raise
+    approval_jobs.inc('duplicate')
+  return get_job(cur, payment_id)
+
+def submit(payment_id):
+  with _queued_lock:
+    if payment_id in _queued:
+      return None
+    _queued.add(payment_id)
+  return _executor.submit(_run_queued, payment_id)
+
+def _run_queued(payment_id):
+  try:
+    return run_job(payment_id)
+  finally:
+    with _queued_lock:
+      _queued.discard(payment_id)
+
+
+#pending 이거나 멈춘 running 작업을 running 으로 바꾼 워커만 실행 (여러 워커/프로세스가 같은 작업을 동시에 실행하지 않도록)
+def _claim(cur, payment_id):
+  now = _now()
+  cur.execute(queries.APPROVAL_JOB_CLAIM, (now, payment_id, now, now - timedelta(seconds=STALE_AFTER)))
+  if cur.rowcount != 1:
+    return None
+  cur.execute(queries.APPROVAL_JOB_CLAIMED, (payment_id,))
+  return cur.fetchone()
+
+#카카오페이 승인 (재시도일 때는 이전 시도가 응답만 못 받고 승인되었을 수 있으므로 먼저 상태 조회)
+def _approve(job):
+  if job['attempts'] > 1:
+    order = kakaopay.order(KAKAOPAY_CID, job['tid'])
+    if order.get('status') == 'SUCCESS_PAYMENT':
+      return
+  kakaopay.approve({
+    "cid": KAKAOPAY_CID,
+    "tid": job['tid'],
+    "partner_order_id": job['payment_id'],
+    "partner_user_id": job['user_id'],
+    "pg_token": job['pg_token'],
+  })
+
+#결제한 사용자의 예약과 해당 결제만 확정 (예약 대기 중에 취소한 예약은 되살리지 않음)
+#확정할 예약이 없으면 결제를 refund_required 로 표시하고 False
+REFUND_REQUIRED_ERROR = 'Booking was cancelled before the payment was approved; refund required'
+
+def complete_payment(conn, cur, payment_id, user_id, class_date_id):
+  conn.begin()
+  try:
+    cur.execute(queries.BOOKING_CONFIRM_PENDING, (user_id, class_date_id))
+    confirmed = cur.rowcount
+    if confirmed:
+      cur.execute(queries.PAYMENT_COMPLETE, (payment_id,))
+      cur.execute(queries.APPROVAL_JOB_DONE, (_now(), payment_id))
+    else:
+      cur.execute(queries.PAYMENT_REFUND_REQUIRED, (payment_id,))
+      cur.execute(queries.APPROVAL_JOB_FAIL, (REFUND_REQUIRED_ERROR, _now(), payment_id))
+    conn.commit()
+  except Exception:
+    conn.rollback()
+    raise
+  if not confirmed:
+    logger.error("payment %s approved without a pending booking (user %s, class_date %s); refund required",
+                 payment_id, user_id, class_date_id)
+    return False
+  bump_class_dates_after_commit(cur, class_date_id)
+  return True
+
+#승인 실패: 연결 오류/5xx/DB 오류는 시도 횟수가 남아 있으면 다시 대기열로 (폴러가 next_attempt_at 이후에 실행)
+#카카오페이가 거절(4xx)하면 결제 실패로 확정
+#승인 뒤 기록 중에 실패한 작업은 재시도 때 주문 상태를 조회하므로 결제가 두 번 승인되지 않는다
+def _fail(cur, job, error):
+  declined = isinstance(error, KakaoPayError) and error.status_code is not None and error.status_code < 500
+  if not declined and job['attempts'] < MAX_ATTEMPTS:
+    delay = RETRY_DELAY * (2 ** (job['attempts'] - 1))
+    now = _now()
+    cur.execute(queries.APPROVAL_JOB_RETRY, (str(error), now + timedelta(seconds=delay), now, job['payment_id']))
+    approval_jobs.inc('retry')
+    return
+  #승인 여부를 알 수 없는 오류로 시도 횟수를 다 쓴 경우에는 결제 상태를 바꾸지 않고 작업만 실패로 남긴다 (수동 확인)
+  if declined:
+    cur.execute(queries.PAYMENT_FAIL, (job['payment_id'],))
+  cur.execute(queries.APPROVAL_JOB_FAIL, (str(error), _now(), job['payment_id']))
+  approval_jobs.inc('failed')
+
+def run_job(payment_id):
+  conn, cur = conn_mysqldb()
+  try:
+    job = _claim(cur, payment_id)
+  finally:
+    cur.close()
+    conn.close()
+  if job is None:
+    return False
+
+  try:
+    _approve(job)
+    complete = True
+  except Exception as e:
+    logger.warning("payment approval %s failed (attempt %s): %s", payment_id, job['attempts'], e)
+    error, complete = e, False
+
+  if complete:
+    conn, cur = None, None
+    try:
+      conn, cur = conn_mysqldb()
+      if complete_payment(conn, cur, job['payment_id'], job['user_id'], job['class_date_id']):
+        approval_jobs.inc('done')
+        return True
+      approval_jobs.inc('refund_required')
+      return False
+    except Exception as e:
+      logger.exception("payment approval %s could not be recorded", payment_id)
+      error = e
+    finally:
+      if cur:
+        cur.close()
+      if conn:
+        conn.close()
+
+  #실패 기록도 새 커넥션으로 (기록에 실패하면 running 으로 남고 STALE_AFTER 뒤에 폴러가 다시 실행)
+  conn, cur = None, None
+  try:
+    conn, cur = conn_mysqldb()
+    _fail(cur, job, error)
+  except Exception:
+    logger.exception("payment approval %s failure could not be recorded", payment_id)
+  finally:
+    if cur:
+      cur.close()
+    if conn:
+      conn.close()
+  return False
+
+
+#실행할 때가 된 작업과 멈춘 작업(프로세스 재시작 등)의 payment_id
+def due_jobs():
+  now = _now()
+  conn, cur = conn_mysqldb(tuples=True)
+  try:
+    cur.execute(queries.APPROVAL_JOBS_DUE, (now, now - timedelta(seconds=STALE_AFTER)))
+    return [row[0] for row in cur.fetchall()]
+  finally:
+    cur.close()
+    conn.close()
+
+#실행할 때가 된 작업을 이 스레드에서 바로 실행
+#server 디렉터리에서 실행: python -m control.payment_approval (폴러를 끈 배포에서 주기적으로 실행해도 안전)
+def resume_jobs():
+  payment_ids = due_jobs()
+  for payment_id in payment_ids:
+    run_job(payment_id)
+  return payment_ids
+
+#PAYMENT_APPROVAL_POLL_INTERVAL 초마다 실행할 때가 된 작업을 실행기에 넣는 데몬 스레드 (워커마다 하나, 0 이면 끔)
+#여러 워커가 같은 작업을 넣어도 _claim 을 통과한 워커만 실행한다
+def _poll(interval):
+  while True:
+    time.sleep(interval)
+    try:
+      for payment_id in due_jobs():
+        submit(payment_id)
+    except Exception:
+      logger.exception("payment approval poll failed")
+
+def start_poller():
+  global _poller
+  interval = payment_approval_poll_interval()
+  with _queued_lock:
+    if _poller is not None or interval <= 0:
+      return _poller
+    _poller = threading.Thread(target=_poll, args=(interval,), name='payment-approval-poller', daemon=True)
+    _poller.start()
+  return _poller
+
+
+if __name__ == '__main__':
+  logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+  print(f"{len(resume_jobs())} payment approval jobs resumed")
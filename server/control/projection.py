@@ -0,0 +1,104 @@
+#리소스별 응답 스키마 (SELECT 컬럼 -> 응답 필드 이름)
+#튜플 커서(conn_mysqldb(tuples=True))의 행을 중간 dict 없이 바로 응답 dict 로 변환한다
+#쿼리는 schema.columns 를 SELECT 목록으로 사용해야 컬럼 순서가 맞는다
+
+
+#column 이 튜플이면 여러 컬럼을 응답 필드 하나로 묶음 (convert 는 값 튜플을 받음)
+class Field:
+  def __init__(self, name, column, convert=None):
+    self.name = name #응답 필드 이름
+    self.column = column #SELECT 식 (예: 'c.class_name', 'cd.class_date') 또는 SELECT 식 튜플
+    self.convert = convert #값 변환 함수 (없으면 그대로)
+    self.columns = column if isinstance(column, tuple) else (column,)
+
+  #'c.description AS class_description' -> 'class_description'
+  @property
+  def key(self):
+    return self.keys[0]
+
+  @property
+  def keys(self):
+    return tuple(_column_key(column) for column in self.columns)
+
+def _column_key(column):
+  expression = column.split(' AS ')[-1] if ' AS ' in column else column
+  return expression.rsplit('.', 1)[-1]
+
+
+class Schema:
+  def __init__(self, *fields):
+    self.fields = fields
+    self.names = tuple(field.name for field in fields)
+    self.columns = ', '.join(column for field in fields for column in field.columns)
+    self._keys = tuple(key for field in fields for key in field.keys)
+    self._converters = tuple((i, field.convert) for i, field in enumerate(fields) if field.convert)
+    #여러 컬럼을 묶는 필드가 있으면 행을 필드 단위로 나눔 (필드마다 (컬럼 위치 또는 slice, 변환 함수))
+    self._slices = None
+    if any(len(field.columns) > 1 for field in fields):
+      self._slices, start = [], 0
+      for field in fields:
+        width = len(field.columns)
+        self._slices.append((slice(start, start + width) if width > 1 else start, field.convert))
+        start += width
+
+  #SELECT 결과에서 컬럼 위치 (키셋 커서 등에 사용)
+  def index(self, key):
+    return self._keys.index(key)
+
+  def row(self, values):
+    if self._slices is not None:
+      return dict(zip(self.names, [convert(values[part]) if convert else values[part] for part, convert in self._slices]))
+    item = dict(zip(self.names, values))
+    for i, convert in self._converters:
+      name = self.names[i]
+      item[name] = convert(item[name])
+    return item
+
+  def rows(self, rows):
+    names = self.names
+    if not self._converters and self._slices is None:
+      return [dict(zip(names, values)) for values in rows]
+    return [self.row(values) for values in rows]
+
+  #DictCursor 행(컬럼 이름 키)을 변환 (튜플 커서를 쓸 수 없는 곳용)
+  def from_mapping(self, mapping):
+    return self.row(tuple(mapping[key] for key in self._keys))
+
+
+RATING_HISTOGRAM_COLUMNS = ('rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5')
+RATING_COLUMNS = ('review_count', 'rating_sum') + RATING_HISTOGRAM_COLUMNS #class 테이블 리뷰 집계 컬럼 (control.ratings)
+
+#클래스 목록 (class_list, nearby_class_list, get_classes_by_instructor)
+CLASS_SUMMARY = Schema(
+  Field('classId', 'id'),
+  Field('className', 'class_name'),
+  Field('description', 'description'),
+  Field('location', 'location'),
+  Field('cost', 'cost'),
+  #리뷰 집계 (control.ratings), 평균은 ratingSum / reviewCount
+  Field('reviewCount', 'review_count'),
+  Field('ratingSum', 'rating_sum'),
+  Field('ratingHistogram', RATING_HISTOGRAM_COLUMNS, list), #[1점 개수, ..., 5점 개수]
+)
+
+#클래스 주소 (class_addresses)
+CLASS_ADDRESS = Schema(
+  Field('class_id', 'id'),
+  Field('location', 'location'),
+)
+
+#내 예약 목록 (class/<user_id>/booking)
+BOOKING = Schema(
+  Field('id', 'cb.id'),
+  Field('student_id', 'cb.student_id'),
+  Field('class_id', 'cb.class_id'),
+  Field('class_date_id', 'cb.class_date_id'),
+  Field('status', 'cb.status'),
+  Field('class_name', 'c.class_name'),
+  Field('class_description', 'c.description AS class_description'),
+  Field('class_date', 'cd.class_date'),
+  Field('has_reviewed', """EXISTS(
+          SELECT 1 FROM class_reviews cr
+          WHERE cr.class_date_id = cb.class_date_id AND cr.user_id = cb.student_id
+        ) AS has_reviewed""", bool),
+)
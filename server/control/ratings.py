@@ -0,0 +1,41 @@
+from control.projection import RATING_HISTOGRAM_COLUMNS
+from db_model import queries
+
+#클래스별 리뷰 집계 (class.review_count, rating_sum, rating_1 ~ rating_5)
+#리뷰 작성/삭제와 같은 트랜잭션에서 갱신하므로 상세/목록 응답은 class_reviews 를 읽지 않고 평점을 보여준다
+#집계가 어긋나면 python -m db_model.rebuild_class_ratings 로 class_reviews 에서 다시 계산
+
+RATINGS = (1, 2, 3, 4, 5)
+
+
+#1 ~ 5 정수만 허용
+def parse_rating(value):
+  rating = int(value)
+  if rating not in RATINGS:
+    raise ValueError(f"Invalid rating: {value}")
+  return rating
+
+#(class_id, rating) 목록만큼 집계를 더하거나(sign=1) 뺌(sign=-1), 클래스마다 UPDATE 한 번
+def apply(cur, reviews, sign=1):
+  deltas = {}
+  for class_id, rating in reviews:
+    delta = deltas.setdefault(int(class_id), [0] * (2 + len(RATINGS)))
+    delta[0] += sign
+    delta[1] += sign * rating
+    delta[1 + rating] += sign
+  if deltas:
+    cur.executemany(queries.CLASS_RATINGS_APPLY, [(*delta, class_id) for class_id, delta in deltas.items()])
+
+def added(cur, class_id, rating):
+  apply(cur, [(class_id, rating)], 1)
+
+def removed(cur, reviews):
+  apply(cur, reviews, -1)
+
+#상세 응답용
+def summary(row):
+  return {
+    'reviewCount': row['review_count'],
+    'ratingSum': row['rating_sum'],
+    'ratingHistogram': [row[column] for column in RATING_HISTOGRAM_COLUMNS],
+  }
@@ -0,0 +1,58 @@
+#주소(location)에서 시/도(city), 시/군/구(district) 분리
+#"서울특별시 강남구 테헤란로 123" 과 "서울 강남구 테헤란로 123" 이 같은 지역으로 조회되도록 시/도 이름은 약칭으로 통일
+#  서울특별시 강남구 테헤란로 123       -> ('서울', '강남구')
+#  경기도 성남시 분당구 판교역로 235    -> ('경기', '성남시 분당구')  구가 있는 시는 시와 구를 함께
+#  세종특별자치시 한누리대로 2130       -> ('세종', None)            시/군/구가 없는 특별자치시
+
+CITY_ALIASES = {
+  '서울특별시': '서울',
+  '부산광역시': '부산',
+  '대구광역시': '대구',
+  '인천광역시': '인천',
+  '광주광역시': '광주',
+  '대전광역시': '대전',
+  '울산광역시': '울산',
+  '세종특별자치시': '세종',
+  '세종시': '세종',
+  '경기도': '경기',
+  '강원도': '강원',
+  '강원특별자치도': '강원',
+  '충청북도': '충북',
+  '충청남도': '충남',
+  '전라북도': '전북',
+  '전북특별자치도': '전북',
+  '전라남도': '전남',
+  '경상북도': '경북',
+  '경상남도': '경남',
+  '제주특별자치도': '제주',
+}
+
+NO_DISTRICT_CITIES = ('세종',)
+DISTRICT_SUFFIXES = ('시', '군', '구') #이 글자로 끝나는 토큰만 district 로 (도로명/읍면동이 바로 오면 district 없음)
+
+
+def normalize_city(city):
+  if not city:
+    return None
+  city = city.strip()
+  return CITY_ALIASES.get(city, city)
+
+def normalize_district(district):
+  if not district:
+    return None
+  return ' '.join(district.split()) or None
+
+#location 문자열 -> (city, district)
+def split_region(location):
+  tokens = (location or '').split()
+  city = normalize_city(tokens[0]) if tokens else None
+  if city is None or city in NO_DISTRICT_CITIES or len(tokens) < 2 or not tokens[1].endswith(DISTRICT_SUFFIXES):
+    return city, None
+  if tokens[1].endswith('시') and len(tokens) > 2 and tokens[2].endswith('구'):
+    return city, normalize_district(f'{tokens[1]} {tokens[2]}')
+  return city, normalize_district(tokens[1])
+
+#district 조회 조건: 구가 있는 시는 시 이름만으로도 조회 ('성남시' -> '성남시', '성남시 분당구', ...)
+def district_condition(district):
+  district = normalize_district(district)
+  return "(district = %s OR district LIKE %s)", [district, district + ' %']
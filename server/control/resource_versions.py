@@ -0,0 +1,71 @@
+import hashlib
+import logging
+from flask import Response, request
+from db_model import queries
+
+#조건부 GET(ETag / If-None-Match) 지원
+#쓰기 API 가 resource_versions 테이블의 버전 카운터를 올리고, 조회 API 는 전체 쿼리 대신
+#버전 행만 읽어 ETag 를 계산한다. 워커끼리 DB 를 통해 공유하므로 다른 워커의 쓰기도 바로 반영된다
+#버전은 반드시 데이터를 변경한 뒤(같은 트랜잭션 또는 커밋 이후)에 올리고, 조회 시에는 데이터보다 먼저 읽는다
+
+logger = logging.getLogger(__name__)
+
+CLASS_CATALOG = 'class_catalog' #class 테이블 (목록, 주소, 클래스 이름)
+REVIEWS = 'reviews' #class_reviews 테이블
+
+#예약날짜, 잔여 좌석, 예약 상태
+def class_dates_key(class_id):
+  return f'class_dates:{int(class_id)}'
+
+
+def bump(cur, *names):
+  if not names:
+    return
+  cur.executemany(queries.RESOURCE_VERSIONS_BUMP, [(name,) for name in names])
+
+#예약 변경처럼 class_id 대신 class_date_id / student_id 만 아는 경우, 해당 클래스들의 예약날짜 버전을 한 문장으로 올림
+
+def bump_class_dates_for_date(cur, class_date_id):
+  cur.execute(queries.RESOURCE_VERSIONS_BUMP_FOR_DATE, (class_date_id,))
+
+#예약/취소/결제 확정처럼 좌석 행을 잠그는 트랜잭션은 커밋한 뒤 autocommit 문장 하나로 버전을 올림
+#(class_dates:<class_id> 버전 행 잠금까지 트랜잭션에 묶이면 같은 클래스의 모든 날짜 예약이 한 줄로 처리됨)
+#데이터는 이미 커밋되었으므로 실패해도 요청은 성공으로 두고 기록만 남긴다
+def bump_class_dates_after_commit(cur, class_date_id):
+  try:
+    bump_class_dates_for_date(cur, class_date_id)
+  except Exception:
+    logger.exception("class_dates version bump failed for class_date %s", class_date_id)
+
+def bump_class_dates_for_student(cur, student_id):
+  cur.execute(queries.RESOURCE_VERSIONS_BUMP_FOR_STUDENT, (student_id,))
+
+def current_versions(cur, names):
+  cur.execute(queries.RESOURCE_VERSIONS_CURRENT(len(names)), tuple(names))
+  #dict 커서와 튜플 커서 모두 지원
+  rows = cur.fetchall()
+  versions = dict((row['name'], row['version']) if isinstance(row, dict) else row for row in rows)
+  return [versions.get(name, 0) for name in names]
+
+#버전 + 쿼리스트링(필터, 페이지 등 응답을 바꾸는 값)으로 strong ETag 생성
+def make_etag(names, versions):
+  source = '|'.join(f'{name}={version}' for name, version in zip(names, versions))
+  source += '|' + request.query_string.decode('latin-1')
+  return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+#(etag, 304 응답 또는 None) 반환
+def conditional_get(cur, *names):
+  etag = make_etag(names, current_versions(cur, names))
+  return etag, not_modified(etag)
+
+def not_modified(etag):
+  if request.if_none_match.contains_weak(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+  return None
+
+def with_etag(response, etag):
+  response.set_etag(etag)
+  return response
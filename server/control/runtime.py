@@ -0,0 +1,79 @@
+import os
+
+#gunicorn 워커 모드 / 동시성 / DB 커넥션 풀 크기 설정 (gunicorn.conf.py 와 db_model.mysql 에서 공유)
+#  WORKER_MODE             : sync | gthread (기본) | gevent
+#  WEB_CONCURRENCY         : 워커 프로세스 수 (gunicorn 밖에서 실행하면 1)
+#  WORKER_THREADS          : gthread 워커당 스레드 수 (기본 8)
+#  WORKER_CONNECTIONS      : gevent 워커당 동시 요청 수 (기본 200)
+#  DB_MAX_CONNECTIONS      : DB 서버가 허용하는 전체 커넥션 수 (기본 50)
+#  DB_RESERVED_CONNECTIONS : 관리/마이그레이션용으로 남겨둘 커넥션 수 (기본 5)
+#  PASSWORD_HASH_WORKERS   : 워커당 비밀번호 해시 전용 프로세스 수 (기본 1, 0 이면 요청 스레드에서 직접 계산)
+#  PASSWORD_HASH_QUEUE     : 워커당 해시 작업 한도 (실행 중 + 대기, 기본 해시 프로세스 수 * 4)
+#  PAYMENT_APPROVAL_WORKERS: 워커당 결제 승인 작업 스레드 수 (기본 4, 카카오페이 승인 호출을 동시에 기다리는 최대 수)
+#  PAYMENT_APPROVAL_POLL_INTERVAL: 재시도/멈춘 결제 승인 작업을 확인하는 주기 (초, 기본 2, 0 이면 폴러를 끄고 control.payment_approval 을 따로 실행)
+#  DB_CHECKOUT_TIMEOUT     : 풀이 모두 사용중일 때 커넥션을 기다리는 최대 시간 (초, 기본 5, 넘으면 503)
+
+WORKER_MODES = ('sync', 'gthread', 'gevent')
+
+
+def worker_mode():
+  mode = os.getenv('WORKER_MODE', 'gthread')
+  if mode not in WORKER_MODES:
+    raise ValueError(f'Unknown WORKER_MODE: {mode} (expected one of {", ".join(WORKER_MODES)})')
+  return mode
+
+#sync 는 CPU*2+1, 스레드/greenlet 워커는 워커 하나가 여러 요청을 처리하므로 CPU 수만큼
+def default_worker_count(mode):
+  cpus = os.cpu_count() or 1
+  return cpus * 2 + 1 if mode == 'sync' else cpus
+
+def worker_count():
+  return int(os.getenv('WEB_CONCURRENCY', '1'))
+
+def worker_threads():
+  return int(os.getenv('WORKER_THREADS', '8'))
+
+def worker_connections():
+  return int(os.getenv('WORKER_CONNECTIONS', '200'))
+
+#워커 하나가 동시에 처리하는 요청 수
+def worker_concurrency(mode):
+  if mode == 'gthread':
+    return worker_threads()
+  if mode == 'gevent':
+    return worker_connections()
+  return 1
+
+DELETION_WORKERS = 1 #control.deletion 의 백그라운드 삭제 스레드 수
+
+#요청 밖에서 커넥션을 쓰는 워커 내 백그라운드 스레드 수 (결제 승인 + 결제 승인 폴러 + 삭제 작업)
+def background_connections():
+  poller = 1 if payment_approval_poll_interval() > 0 else 0
+  return max(payment_approval_workers(), 1) + poller + DELETION_WORKERS
+
+#워커 하나의 커넥션 풀 크기
+#모든 워커의 풀을 합쳐도 DB 한도(DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS)를 넘지 않고,
+#동시에 처리할 수 있는 요청 수 + 백그라운드 스레드 수보다 많이 열지 않는다
+#요청/작업 하나는 커넥션을 하나만 잡는다 (커넥션을 잡은 채 다른 커넥션을 꺼내지 않음)
+def db_pool_size():
+  mode = worker_mode()
+  available = int(os.getenv('DB_MAX_CONNECTIONS', '50')) - int(os.getenv('DB_RESERVED_CONNECTIONS', '5'))
+  per_worker = available // worker_count()
+  if per_worker < 1:
+    raise ValueError(f'{worker_count()} workers cannot share {available} database connections; lower WEB_CONCURRENCY')
+  return min(per_worker, worker_concurrency(mode) + background_connections())
+
+def password_hash_workers():
+  return int(os.getenv('PASSWORD_HASH_WORKERS', '1'))
+
+def password_hash_queue():
+  return int(os.getenv('PASSWORD_HASH_QUEUE', str(max(password_hash_workers(), 1) * 4)))
+
+def payment_approval_workers():
+  return int(os.getenv('PAYMENT_APPROVAL_WORKERS', '4'))
+
+def payment_approval_poll_interval():
+  return float(os.getenv('PAYMENT_APPROVAL_POLL_INTERVAL', '2'))
+
+def db_checkout_timeout():
+  return float(os.getenv('DB_CHECKOUT_TIMEOUT', '5'))
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+#수업 시간대 일괄 등록용 날짜 목록 만들기
+#요청 형식 1: {"classDateTimes": ["2024-03-04T19:00", ...], "capacity": 10}
+#요청 형식 2: {"recurrence": {"weekdays": ["MO", "WE"], "time": "19:00", "start": "2024-03-01", "until": "2024-05-31"}, "capacity": 10}
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M"
+MAX_DATES = 366 #요청 하나로 등록할 수 있는 최대 시간대 수
+
+WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+
+
+class ScheduleError(ValueError):
+  pass
+
+
+#정원은 1 이상의 정수 (숫자 문자열 허용, 소수/불리언/빈 값은 거절)
+def parse_capacity(value):
+  if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+    raise ScheduleError(f"Invalid capacity: {value}")
+  try:
+    capacity = int(value)
+  except (TypeError, ValueError):
+    raise ScheduleError(f"Invalid capacity: {value}")
+  if capacity < 1:
+    raise ScheduleError(f"Invalid capacity: {value}")
+  return capacity
+
+#"2024-03-04T19:00" -> datetime (초는 00으로)
+def parse_datetime(value):
+  try:
+    return datetime.strptime(value, DATETIME_FORMAT).replace(second=0)
+  except (TypeError, ValueError):
+    raise ScheduleError(f"Invalid date time: {value}")
+
+#매주 지정한 요일/시간에 start ~ until(포함) 사이의 날짜들
+def expand_weekly(weekdays, time, start, until):
+  try:
+    days = {WEEKDAYS[day.upper()] for day in weekdays}
+    hour, minute = (int(part) for part in time.split(':'))
+    first = datetime.strptime(start, "%Y-%m-%d").replace(hour=hour, minute=minute)
+    last = datetime.strptime(until, "%Y-%m-%d").replace(hour=hour, minute=minute)
+  except (KeyError, AttributeError, TypeError, ValueError):
+    raise ScheduleError("Invalid recurrence rule")
+  if not days:
+    raise ScheduleError("Invalid recurrence rule")
+
+  dates = []
+  current = first
+  while current <= last:
+    if current.weekday() in days:
+      dates.append(current)
+      if len(dates) > MAX_DATES:
+        break
+    current += timedelta(days=1)
+  return dates
+
+#요청 본문 -> 중복 없이 정렬된 datetime 목록
+def requested_dates(data):
+  if data.get('recurrence'):
+    rule = data['recurrence']
+    if not isinstance(rule, dict):
+      raise ScheduleError("Invalid recurrence rule")
+    dates = expand_weekly(rule.get('weekdays') or [], rule.get('time'), rule.get('start'), rule.get('until'))
+  else:
+    values = data.get('classDateTimes')
+    if not isinstance(values, list):
+      raise ScheduleError("classDateTimes or recurrence is required")
+    dates = [parse_datetime(value) for value in values]
+
+  dates = sorted(set(dates))
+  if not dates:
+    raise ScheduleError("No class times to register")
+  if len(dates) > MAX_DATES:
+    raise ScheduleError(f"Too many class times (max {MAX_DATES})")
+  return dates
+
+#DB 에서 읽은 class_date(datetime 또는 문자열) -> 요청과 같은 형식의 문자열
+def format_datetime(value):
+  if isinstance(value, str):
+    value = datetime.fromisoformat(value)
+  return value.strftime(DATETIME_FORMAT)
@@ -0,0 +1,156 @@
+import secrets
+import threading
+import time
+from datetime import datetime
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSessionInterface, SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from db_model.mysql import conn_mysqldb
+from db_model import queries
+
+#세션 저장소 선택 (SESSION_BACKEND 환경변수)
+#  cookie : 서명된 쿠키에 세션 전체를 저장 (서버 저장소 없음, 기본값)
+#  memory : 워커 프로세스 메모리에 저장 (단일 워커/개발용)
+#  sql    : 커넥션 풀을 통해 app_sessions 테이블에 저장 (여러 호스트에서 공유)
+
+SESSION_ID_BYTES = 32
+PURGE_INTERVAL = 600
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+  def __init__(self, initial=None, sid=None, new=False):
+    def on_update(self):
+      self.modified = True
+    super().__init__(initial, on_update)
+    self.sid = sid
+    self.new = new
+    self.modified = False
+
+
+class MemoryStore:
+  def __init__(self):
+    self._data = {}
+    self._lock = threading.Lock()
+    self._purged_at = time.monotonic()
+
+  def load(self, sid):
+    with self._lock:
+      item = self._data.get(sid)
+      if item is None:
+        return None
+      expires_at, value = item
+      if expires_at < time.time():
+        del self._data[sid]
+        return None
+      return value
+
+  def save(self, sid, value, lifetime):
+    with self._lock:
+      self._data[sid] = (time.time() + lifetime.total_seconds(), value)
+      if time.monotonic() - self._purged_at > PURGE_INTERVAL:
+        now = time.time()
+        for key in [key for key, (expires_at, _) in self._data.items() if expires_at < now]:
+          del self._data[key]
+        self._purged_at = time.monotonic()
+
+  def delete(self, sid):
+    with self._lock:
+      self._data.pop(sid, None)
+
+
+class SqlStore:
+  def __init__(self):
+    self._purged_at = time.monotonic()
+
+  def load(self, sid):
+    conn, cur = conn_mysqldb()
+    try:
+      cur.execute(queries.SESSION_LOAD, (sid, _now()))
+      row = cur.fetchone()
+      return row['data'] if row else None
+    finally:
+      cur.close()
+      conn.close()
+
+  def save(self, sid, value, lifetime):
+    conn, cur = conn_mysqldb()
+    try:
+      cur.execute(queries.SESSION_SAVE, (sid, value, _now(lifetime)))
+      #만료된 세션은 워커마다 PURGE_INTERVAL 에 한 번씩 정리
+      if time.monotonic() - self._purged_at > PURGE_INTERVAL:
+        self._purged_at = time.monotonic()
+        cur.execute(queries.SESSION_PURGE, (_now(),))
+      conn.commit()
+    finally:
+      cur.close()
+      conn.close()
+
+  def delete(self, sid):
+    conn, cur = conn_mysqldb()
+    try:
+      cur.execute(queries.SESSION_DELETE, (sid,))
+      conn.commit()
+    finally:
+      cur.close()
+      conn.close()
+
+
+def _now(offset=None):
+  now = datetime.now()
+  if offset is not None:
+    now += offset
+  return now.strftime('%Y-%m-%d %H:%M:%S')
+
+
+#세션 id 만 쿠키에 담고 내용은 store 에 저장하는 세션 인터페이스
+class ServerSideSessionInterface(SessionInterface):
+  serializer = TaggedJSONSerializer()
+
+  def __init__(self, store):
+    self.store = store
+
+  def open_session(self, app, request):
+    sid = request.cookies.get(self.get_cookie_name(app))
+    if sid:
+      value = self.store.load(sid)
+      if value is not None:
+        try:
+          return ServerSideSession(self.serializer.loads(value), sid=sid)
+        except ValueError:
+          pass
+    return ServerSideSession(sid=secrets.token_urlsafe(SESSION_ID_BYTES), new=True)
+
+  def save_session(self, app, session, response):
+    name = self.get_cookie_name(app)
+    domain = self.get_cookie_domain(app)
+    path = self.get_cookie_path(app)
+
+    #세션이 비워졌으면 저장소와 쿠키에서 삭제
+    if not session:
+      if session.modified and not session.new:
+        self.store.delete(session.sid)
+        response.delete_cookie(name, domain=domain, path=path)
+      return
+
+    #내용이 바뀐 요청만 저장소에 기록 (읽기만 한 요청은 쓰기 없음)
+    if not session.modified:
+      return
+
+    self.store.save(session.sid, self.serializer.dumps(dict(session)), app.permanent_session_lifetime)
+    response.set_cookie(
+      name, session.sid,
+      expires=self.get_expiration_time(app, session),
+      httponly=self.get_cookie_httponly(app),
+      domain=domain, path=path,
+      secure=self.get_cookie_secure(app),
+      samesite=self.get_cookie_samesite(app))
+
+
+def create_session_interface(backend):
+  if backend == 'cookie':
+    return SecureCookieSessionInterface()
+  if backend == 'memory':
+    return ServerSideSessionInterface(MemoryStore())
+  if backend == 'sql':
+    return ServerSideSessionInterface(SqlStore())
+  raise ValueError(f'Unknown session backend: {backend}')
@@ -0,0 +1,222 @@
+import heapq
+import logging
+import math
+import threading
+import time
+from db_model.mysql import conn_mysqldb
+from db_model import queries
+from control.projection import CLASS_SUMMARY
+
+#클래스 좌표 격자(grid) 인덱스
+#지도 이동 시마다 class 테이블을 BETWEEN 으로 스캔하지 않도록 메모리에서 범위/반경 조회
+
+EARTH_RADIUS_M = 6371000
+CELL_SIZE_DEG = 0.01 #약 1.1km
+#다른 워커에서 발생한 변경을 반영하기 위해 주기적으로 전체 재구성 (백그라운드 스레드, start_rebuilder)
+REBUILD_INTERVAL = 300
+
+logger = logging.getLogger(__name__)
+
+
+def haversine(lat1, lng1, lat2, lng2):
+  phi1, phi2 = math.radians(lat1), math.radians(lat2)
+  d_phi = phi2 - phi1
+  d_lambda = math.radians(lng2 - lng1)
+  a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+  return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+  def __init__(self, cell_size=CELL_SIZE_DEG):
+    self.cell_size = cell_size
+    self._cells = {}
+    self._entries = {} #class_id -> (lat, lng, item)
+    self._lock = threading.Lock()
+
+  def _cell(self, lat, lng):
+    return (math.floor(lat / self.cell_size), math.floor(lng / self.cell_size))
+
+  def upsert(self, class_id, lat, lng, item):
+    with self._lock:
+      self._remove(class_id)
+      self._entries[class_id] = (lat, lng, item)
+      self._cells.setdefault(self._cell(lat, lng), set()).add(class_id)
+
+  def remove(self, class_id):
+    with self._lock:
+      self._remove(class_id)
+
+  def _remove(self, class_id):
+    entry = self._entries.pop(class_id, None)
+    if entry is None:
+      return
+    cell = self._cell(entry[0], entry[1])
+    members = self._cells.get(cell)
+    if members is not None:
+      members.discard(class_id)
+      if not members:
+        del self._cells[cell]
+
+  def replace_all(self, entries):
+    with self._lock:
+      self._cells = {}
+      self._entries = {}
+      for class_id, lat, lng, item in entries:
+        self._entries[class_id] = (lat, lng, item)
+        self._cells.setdefault(self._cell(lat, lng), set()).add(class_id)
+
+  #사각 범위 안의 (class_id, lat, lng, item) 목록
+  def query_bbox(self, min_lat, max_lat, min_lng, max_lng):
+    with self._lock:
+      lat0, lng0 = self._cell(min_lat, min_lng)
+      lat1, lng1 = self._cell(max_lat, max_lng)
+      cell_count = (lat1 - lat0 + 1) * (lng1 - lng0 + 1)
+      #범위가 넓으면 격자를 도는 것보다 전체를 한 번 보는 편이 빠름
+      if cell_count > len(self._cells):
+        candidates = self._entries.keys()
+      else:
+        candidates = []
+        for i in range(lat0, lat1 + 1):
+          for j in range(lng0, lng1 + 1):
+            candidates.extend(self._cells.get((i, j), ()))
+      results = []
+      for class_id in candidates:
+        lat, lng, item = self._entries[class_id]
+        if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
+          results.append((class_id, lat, lng, item))
+      return results
+
+  def __len__(self):
+    return len(self._entries)
+
+
+#class 행을 목록 응답 형태로 변환
+to_item = CLASS_SUMMARY.from_mapping
+
+
+
+class ClassLocationIndex:
+  def __init__(self):
+    self.grid = GridIndex()
+    self.built_at = None
+    self._build_lock = threading.Lock()
+    #재구성 중에 들어온 refresh/remove 의 class_id (재구성 중이 아니면 None)
+    #전체 조회 이후의 변경이 replace_all 로 덮이지 않도록 교체 후 다시 읽어 반영
+    self._changed = None
+    self._changed_lock = threading.Lock()
+    self._rebuilder = None
+
+  def _load(self):
+    conn, cur = conn_mysqldb()
+    try:
+      cur.execute(queries.CLASS_LOCATIONS_ALL)
+      return [(row['id'], float(row['latitude']), float(row['longitude']), to_item(row)) for row in cur.fetchall()]
+    finally:
+      cur.close()
+      conn.close()
+
+  #전체 재구성 (시작할 때, 그리고 백그라운드 스레드에서 REBUILD_INTERVAL 마다)
+  def rebuild(self):
+    with self._build_lock:
+      self._rebuild()
+
+  def _rebuild(self):
+    with self._changed_lock:
+      self._changed = set()
+    try:
+      entries = self._load()
+      with self._changed_lock:
+        self.grid.replace_all(entries)
+        self.built_at = time.monotonic()
+        changed, self._changed = self._changed, None
+    except Exception:
+      with self._changed_lock:
+        self._changed = None
+      raise
+    for class_id in changed:
+      self.refresh(class_id)
+
+  #시작할 때 구성하지 못한 경우(DB 장애 등)에만 요청 스레드에서 구성
+  def ensure_built(self):
+    if self.built_at is not None:
+      return
+    with self._build_lock:
+      if self.built_at is None:
+        self._rebuild()
+
+  def _rebuild_loop(self, interval):
+    while True:
+      time.sleep(interval)
+      try:
+        self.rebuild()
+      except Exception:
+        logger.exception("class location index rebuild failed")
+
+  #시작할 때 한 번 구성하고 재구성 데몬 스레드 시작 (프로세스마다 하나)
+  def start_rebuilder(self, interval=REBUILD_INTERVAL):
+    with self._changed_lock:
+      if self._rebuilder is not None:
+        return self._rebuilder
+      self._rebuilder = threading.Thread(target=self._rebuild_loop, args=(interval,), name='class-location-rebuilder', daemon=True)
+    try:
+      self.rebuild()
+    except Exception:
+      logger.exception("class location index build failed")
+    self._rebuilder.start()
+    return self._rebuilder
+
+  #재구성 중이면 변경된 class_id 를 기록 (교체 후 다시 반영)
+  def _record(self, class_id):
+    with self._changed_lock:
+      if self._changed is not None:
+        self._changed.add(class_id)
+
+  #등록/수정된 클래스 한 건을 다시 읽어 반영
+  #cur: 호출한 쪽이 이미 잡고 있는 커넥션의 DictCursor (없으면 새로 연결)
+  def refresh(self, class_id, cur=None):
+    self._record(int(class_id))
+    if self.built_at is None:
+      return
+    if cur is None:
+      conn, cur = conn_mysqldb()
+      try:
+        return self.refresh(class_id, cur)
+      finally:
+        cur.close()
+        conn.close()
+    cur.execute(queries.CLASS_LOCATION_BY_ID, (int(class_id),))
+    row = cur.fetchone()
+    if row is None or row['latitude'] is None or row['longitude'] is None:
+      self.grid.remove(int(class_id))
+    else:
+      self.grid.upsert(row['id'], float(row['latitude']), float(row['longitude']), to_item(row))
+
+  def remove(self, class_id):
+    self._record(int(class_id))
+    self.grid.remove(int(class_id))
+
+  #사각 범위 조회, 기준점(center)에서 가까운 순으로 정렬
+  def within_bbox(self, min_lat, max_lat, min_lng, max_lng, center, limit):
+    self.ensure_built()
+    matches = self.grid.query_bbox(min_lat, max_lat, min_lng, max_lng)
+    return self._nearest(matches, center, limit, None)
+
+  #중심점 + 반경(m) 조회, 가까운 순으로 정렬
+  def within_radius(self, lat, lng, radius, limit):
+    self.ensure_built()
+    d_lat = math.degrees(radius / EARTH_RADIUS_M)
+    d_lng = math.degrees(radius / (EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 1e-6)))
+    matches = self.grid.query_bbox(lat - d_lat, lat + d_lat, lng - d_lng, lng + d_lng)
+    return self._nearest(matches, (lat, lng), limit, radius)
+
+  def _nearest(self, matches, center, limit, radius):
+    results = []
+    for class_id, lat, lng, item in matches:
+      distance = haversine(center[0], center[1], lat, lng)
+      if radius is None or distance <= radius:
+        results.append((distance, class_id, item))
+    nearest = heapq.nsmallest(limit, results, key=lambda result: (result[0], result[1]))
+    return [dict(item, distance=round(distance)) for distance, class_id, item in nearest]
+
+
+class_locations = ClassLocationIndex()
@@ -0,0 +1,77 @@
+import logging
+from flask import Response, jsonify, request, stream_with_context
+from control.json_encoder import dumps_bytes
+from control.pagination import parse_limit, decode_id_cursor, split_page, wants_page
+
+#큰 목록을 한 번에 만들지 않고 행 단위로 흘려보내는 JSON 응답
+#unbuffered 커서(conn_mysqldb(unbuffered=True))에서 STREAM_BATCH_SIZE 행씩 읽어 바로 인코딩하므로
+#워커 메모리는 목록 크기와 관계없이 일정하다. 응답이 끝날 때까지 커넥션을 점유한다
+
+STREAM_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+def wants_stream(args):
+  return args.get('stream') in ('1', 'true')
+
+#cur 에서 실행한 쿼리 결과를 {"status": "success", "data": [...]} 형태로 스트리밍
+#project 는 읽어온 행 묶음을 응답 항목 리스트로 변환 (예: schema.rows)
+#커넥션은 응답이 닫힐 때(전송 완료 또는 클라이언트 연결 종료) 반납되므로 호출한 쪽에서 닫지 않는다
+def stream_rows(conn, cur, project):
+  def generate():
+    yield b'{"status":"success","data":['
+    separator = b''
+    try:
+      while True:
+        rows = cur.fetchmany(STREAM_BATCH_SIZE)
+        if not rows:
+          break
+        #묶음 단위로 인코딩한 배열에서 대괄호만 떼어 이어붙임
+        yield separator + dumps_bytes(project(rows))[1:-1]
+        separator = b','
+    except Exception:
+      #헤더가 이미 전송되어 오류 응답으로 바꿀 수 없으므로 로그만 남기고 응답을 끊음
+      logger.exception("stream_rows failed: %s", request.path)
+      raise
+    yield b']}'
+
+  def release():
+    cur.close()
+    conn.close()
+
+  response = Response(stream_with_context(generate()), mimetype='application/json')
+  response.call_on_close(release)
+  return response
+
+
+#id 순으로 조회하는 목록 응답 공통 처리 (튜플 커서 + schema 변환)
+#  stream=1          : 전체 목록을 스트리밍 (conn_mysqldb(unbuffered=True, tuples=True) 로 연 커서 필요)
+#  limit=, after=<id> : 키셋 페이지, 다음 페이지 커서는 next
+#  그 외             : 전체 목록 (기존 응답 형식)
+#(응답, 스트리밍 여부) 반환. 스트리밍이면 커넥션은 응답이 닫힐 때 반납된다
+def id_list_response(conn, cur, schema, from_clause, conditions, params):
+  base_query = f"SELECT {schema.columns} FROM {from_clause}"
+  conditions = list(conditions)
+  params = list(params)
+
+  if wants_stream(request.args):
+    cur.execute(base_query + _where(conditions) + " ORDER BY id", params)
+    return stream_rows(conn, cur, schema.rows), True
+
+  if wants_page(request.args):
+    limit = parse_limit(request.args.get('limit'))
+    after = decode_id_cursor(request.args.get('after'))
+    if after is not None:
+      conditions.append("id > %s")
+      params.append(after)
+    cur.execute(base_query + _where(conditions) + " ORDER BY id LIMIT %s", params + [limit + 1])
+    rows, has_more = split_page(cur.fetchall(), limit)
+    next_cursor = str(rows[-1][schema.index('id')]) if has_more else None
+    return jsonify({'status': 'success', 'data': schema.rows(rows), 'next': next_cursor}), False
+
+  cur.execute(base_query + _where(conditions), params)
+  return jsonify({'status': 'success', 'data': schema.rows(cur.fetchall())}), False
+
+def _where(conditions):
+  return " WHERE " + " AND ".join(conditions) if conditions else ""
@@ -0,0 +1,61 @@
+from db_model.mysql import conn_mysqldb
+from db_model import queries
+from control.cache import TTLCache
+
+#user_info 행 캐시 (id 로 조회)
+#회원정보 수정/비밀번호 변경/계정삭제 시 갱신 또는 무효화한다
+#워커마다 따로 존재하므로 다른 워커의 변경은 ttl 이 지나야 반영된다 (그래서 인증은 load_user_by_* 로 DB 에서 읽음)
+user_cache = TTLCache(maxsize=10000, ttl=60) #id -> user_info 행
+
+
+#cur: 호출한 쪽이 이미 잡고 있는 커넥션의 DictCursor (없으면 새로 연결)
+def _load(query, value, cur=None):
+  if cur is not None:
+    cur.execute(query, (value,))
+    return cur.fetchone()
+  conn, cur = conn_mysqldb()
+  try:
+    return _load(query, value, cur)
+  finally:
+    cur.close()
+    conn.close()
+
+def store(user):
+  user_cache.set(int(user['id']), user)
+
+#id 로 user_info 행 조회 (캐시 우선)
+def get_user_by_id(user_id, cur=None):
+  user = user_cache.get(int(user_id))
+  if user is None:
+    user = _load(queries.USER_BY_ID, int(user_id), cur)
+    if user:
+      store(user)
+  return user
+
+#인증(로그인, 비밀번호 변경)용 조회: 비밀번호 해시는 캐시를 거치지 않고 항상 DB 에서 읽는다
+#(다른 워커에서 바꾼 비밀번호나 삭제한 계정이 ttl 동안 통과하지 않도록) 읽은 행으로 이 워커의 캐시도 갱신
+def load_user_by_id(user_id, cur=None):
+  user = _load(queries.USER_BY_ID, int(user_id), cur)
+  if user:
+    store(user)
+  else:
+    invalidate(user_id)
+  return user
+
+def load_user_by_email(email):
+  user = _load(queries.USER_BY_EMAIL, email)
+  if user:
+    store(user)
+  return user
+
+#수정된 컬럼을 캐시에 반영 (캐시에 없으면 다음 조회 시 다시 읽음)
+def update(user_id, changes):
+  user = user_cache.get(int(user_id))
+  if user is None:
+    return None
+  user = dict(user, **changes)
+  store(user)
+  return user
+
+def invalidate(user_id):
+  user_cache.delete(int(user_id))
@@ -0,0 +1,34 @@
+from db_model.mysql import conn_mysqldb
+from control.region import split_region
+
+#class.location 에서 city, district 컬럼을 채우는 작업 (split_region 규칙이 바뀌면 다시 실행, 값이 달라진 행만 갱신)
+#server 디렉터리에서 실행: python -m db_model.backfill_class_region
+
+BATCH_SIZE = 500
+
+
+def backfill():
+  conn, cur = conn_mysqldb()
+  updated = 0
+  last_id = 0
+  try:
+    while True:
+      cur.execute("SELECT id, location, city, district FROM class WHERE id > %s ORDER BY id LIMIT %s", (last_id, BATCH_SIZE))
+      rows = cur.fetchall()
+      if not rows:
+        break
+      params = [region + (row['id'],) for row in rows
+                for region in [split_region(row['location'])] if region != (row['city'], row['district'])]
+      if params:
+        cur.executemany("UPDATE class SET city = %s, district = %s WHERE id = %s", params)
+        conn.commit()
+      updated += len(params)
+      last_id = rows[-1]['id']
+    return updated
+  finally:
+    cur.close()
+    conn.close()
+
+
+if __name__ == '__main__':
+  print(f"{backfill()} classes updated")
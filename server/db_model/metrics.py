@@ -0,0 +1,114 @@
+import bisect
+import threading
+
+#커넥션 풀 / 쿼리 지표 수집 (Prometheus 텍스트 형식으로 노출)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(names, values):
+  if not names:
+    return ''
+  pairs = ','.join('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in zip(names, values))
+  return '{' + pairs + '}'
+
+
+class Counter:
+  def __init__(self, name, help_text, labels=()):
+    self.name = name
+    self.help_text = help_text
+    self.labels = labels
+    self._values = {}
+    self._lock = threading.Lock()
+
+  def inc(self, *label_values, amount=1):
+    with self._lock:
+      self._values[label_values] = self._values.get(label_values, 0) + amount
+
+  def render(self):
+    lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+    with self._lock:
+      for label_values, value in sorted(self._values.items()):
+        lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {value}')
+    return lines
+
+
+class Gauge:
+  def __init__(self, name, help_text, getter):
+    self.name = name
+    self.help_text = help_text
+    self.getter = getter
+
+  def render(self):
+    return [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} gauge', f'{self.name} {self.getter()}']
+
+
+class Histogram:
+  def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+    self.name = name
+    self.help_text = help_text
+    self.labels = labels
+    self.buckets = buckets
+    self._series = {} #label_values -> [bucket counts..., +Inf count, sum]
+    self._lock = threading.Lock()
+
+  def observe(self, value, *label_values):
+    index = bisect.bisect_left(self.buckets, value)
+    with self._lock:
+      series = self._series.get(label_values)
+      if series is None:
+        series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+      series[index] += 1
+      series[-1] += value
+
+  def render(self):
+    lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+    with self._lock:
+      snapshot = sorted((key, list(series)) for key, series in self._series.items())
+    for label_values, series in snapshot:
+      cumulative = 0
+      for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+        cumulative += count
+        labels = _format_labels(self.labels + ('le',), label_values + (bound,))
+        lines.append(f'{self.name}_bucket{labels} {cumulative}')
+      labels = _format_labels(self.labels, label_values)
+      lines.append(f'{self.name}_sum{labels} {series[-1]}')
+      lines.append(f'{self.name}_count{labels} {cumulative}')
+    return lines
+
+
+class Registry:
+  def __init__(self):
+    self._metrics = []
+
+  def register(self, metric):
+    self._metrics.append(metric)
+    return metric
+
+  def render(self):
+    lines = []
+    for metric in self._metrics:
+      lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+checkout_wait = REGISTRY.register(Histogram(
+  'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection.'))
+checkouts = REGISTRY.register(Counter(
+  'db_pool_checkouts_total', 'Connections checked out of the pool.'))
+checkout_timeouts = REGISTRY.register(Counter(
+  'db_pool_checkout_timeouts_total', 'Checkouts that gave up after DB_CHECKOUT_TIMEOUT.'))
+abandoned_connections = REGISTRY.register(Counter(
+  'db_pool_abandoned_connections_total', 'Connections garbage collected without close() and returned to the pool.'))
+query_latency = REGISTRY.register(Histogram(
+  'db_query_duration_seconds', 'SQL statement latency by route and statement type.', labels=('route', 'operation')))
+query_errors = REGISTRY.register(Counter(
+  'db_query_errors_total', 'SQL statements that raised an error.', labels=('route', 'operation')))
+statement_latency = REGISTRY.register(Histogram(
+  'db_statement_duration_seconds', 'SQL statement latency by query name (db_model.queries).', labels=('query',)))
+statement_rows = REGISTRY.register(Counter(
+  'db_statement_rows_total', 'Rows returned or affected by query name.', labels=('query',)))
+slow_statements = REGISTRY.register(Counter(
+  'db_slow_statements_total', 'Statements slower than SLOW_QUERY_MS by query name.', labels=('query',)))
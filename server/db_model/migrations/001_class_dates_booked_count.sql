@@ -0,0 +1,13 @@
+-- 예약날짜별 예약 인원 카운터 (book_class / cancel_booking 트랜잭션에서 함께 갱신)
+
+ALTER TABLE class_dates ADD COLUMN booked_count INT NOT NULL DEFAULT 0;
+
+-- 기존 예약 데이터로 카운터 채우기 (카운터 복구 시에도 그대로 다시 실행하면 됨)
+UPDATE class_dates cd
+SET booked_count = (
+  SELECT COUNT(*) FROM class_booking cb
+  WHERE cb.class_date_id = cd.id AND cb.status <> 'cancelled'
+);
+
+-- 특정 클래스에 대한 사용자의 예약 상태를 한 번에 조회하기 위한 인덱스
+CREATE INDEX idx_class_booking_student_class ON class_booking (student_id, class_id);
@@ -0,0 +1,5 @@
+-- 리뷰 목록을 created_at 역순으로 키셋 페이지네이션 하기 위한 인덱스
+
+CREATE INDEX idx_class_reviews_created ON class_reviews (created_at, id);
+CREATE INDEX idx_class_reviews_class_created ON class_reviews (class_id, created_at, id);
+CREATE INDEX idx_class_reviews_user_created ON class_reviews (user_id, created_at, id);
@@ -0,0 +1,10 @@
+-- 북마크 목록 버전 (추가/삭제 시 증가, 클라이언트는 변경분만 받아 목록을 갱신)
+
+ALTER TABLE user_info ADD COLUMN bookmark_version INT NOT NULL DEFAULT 0;
+
+-- 중복 북마크 정리 후 (user_id, class_id) 유니크 제약 추가
+DELETE ub1 FROM user_bookmarks ub1
+JOIN user_bookmarks ub2
+  ON ub1.user_id = ub2.user_id AND ub1.class_id = ub2.class_id AND ub1.id > ub2.id;
+
+CREATE UNIQUE INDEX uq_user_bookmarks_user_class ON user_bookmarks (user_id, class_id);
@@ -0,0 +1,7 @@
+-- 지역 필터(city, district)를 LIKE '%...%' 대신 인덱스로 조회하기 위한 컬럼
+-- 기존 데이터는 server 디렉터리에서 python -m db_model.backfill_class_region 으로 채운다
+
+ALTER TABLE class ADD COLUMN city VARCHAR(20) NULL;
+ALTER TABLE class ADD COLUMN district VARCHAR(30) NULL;
+
+CREATE INDEX idx_class_city_district ON class (city, district);
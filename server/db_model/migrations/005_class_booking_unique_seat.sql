@@ -0,0 +1,23 @@
+-- 같은 수강생이 같은 예약날짜를 두 번 예약하지 못하도록 유니크 제약 추가
+-- (동시 요청이 들어와도 좌석 배정은 한 번만 일어남)
+
+-- 1. 중복 예약 확인. 활성(pending/confirmed) 중복이 있으면 인덱스 생성 전에 직접 정리해야 한다
+SELECT student_id, class_date_id, COUNT(*) AS bookings
+FROM class_booking
+GROUP BY student_id, class_date_id
+HAVING COUNT(*) > 1;
+
+-- 2. 같은 예약날짜에 다른 예약이 있는 취소된 중복 예약 삭제
+DELETE cb1 FROM class_booking cb1
+JOIN class_booking cb2
+  ON cb1.student_id = cb2.student_id AND cb1.class_date_id = cb2.class_date_id AND cb1.id <> cb2.id
+WHERE cb1.status = 'cancelled' AND (cb2.status <> 'cancelled' OR cb1.id > cb2.id);
+
+CREATE UNIQUE INDEX uq_class_booking_student_date ON class_booking (student_id, class_date_id);
+
+-- 3. 예약 인원 카운터 재계산
+UPDATE class_dates cd
+SET booked_count = (
+  SELECT COUNT(*) FROM class_booking cb
+  WHERE cb.class_date_id = cd.id AND cb.status <> 'cancelled'
+);
@@ -0,0 +1,8 @@
+-- SESSION_BACKEND=sql 일 때 사용하는 세션 테이블
+
+CREATE TABLE app_sessions (
+  sid VARCHAR(64) NOT NULL PRIMARY KEY,
+  data TEXT NOT NULL,
+  expires_at DATETIME NOT NULL,
+  INDEX idx_app_sessions_expires (expires_at)
+);
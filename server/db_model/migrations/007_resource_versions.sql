@@ -0,0 +1,7 @@
+-- 조건부 GET(ETag) 용 리소스 버전 카운터
+-- name 예: class_catalog, reviews, class_dates:<class_id>
+
+CREATE TABLE resource_versions (
+  name VARCHAR(64) NOT NULL PRIMARY KEY,
+  version BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
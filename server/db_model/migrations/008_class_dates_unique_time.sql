@@ -0,0 +1,18 @@
+-- 같은 클래스에 같은 시간대가 두 번 등록되지 않도록 유니크 제약 추가
+-- (시간대 등록 API 는 행마다 중복 조회하지 않고 이 제약에 맡기며, 중복 키 오류 1062 를 "이미 있음" 으로 응답)
+
+-- 1. 중복 시간대 확인. 예약이 걸린 중복이 있으면 인덱스 생성 전에 직접 정리해야 한다
+SELECT cd.class_id, cd.class_date, COUNT(*) AS dates, SUM(cd.booked_count) AS booked
+FROM class_dates cd
+GROUP BY cd.class_id, cd.class_date
+HAVING COUNT(*) > 1;
+
+-- 2. 예약이 없는 중복 시간대 삭제 (같은 시간대 중 예약이 있거나 id 가 가장 작은 행을 남김)
+DELETE cd1 FROM class_dates cd1
+JOIN class_dates cd2
+  ON cd1.class_id = cd2.class_id AND cd1.class_date = cd2.class_date AND cd1.id <> cd2.id
+WHERE cd1.booked_count = 0
+  AND NOT EXISTS (SELECT 1 FROM class_booking cb WHERE cb.class_date_id = cd1.id)
+  AND (cd2.booked_count > 0 OR cd1.id > cd2.id);
+
+CREATE UNIQUE INDEX uq_class_dates_class_date ON class_dates (class_id, class_date);
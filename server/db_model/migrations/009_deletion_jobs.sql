@@ -0,0 +1,21 @@
+-- 백그라운드 계정/클래스 삭제 작업 상태 (control/deletion.py)
+-- 워커 프로세스가 여러 개여도 어느 워커에서든 상태를 조회할 수 있도록 DB 에 저장
+
+CREATE TABLE deletion_jobs (
+  id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  kind VARCHAR(16) NOT NULL, -- user | class
+  target_id INT NOT NULL,
+  owner_id INT NOT NULL, -- 삭제를 요청한 사용자 (상태 조회 권한)
+  status VARCHAR(16) NOT NULL DEFAULT 'pending', -- pending | running | done | failed
+  step VARCHAR(32), -- 진행 중인 테이블
+  deleted_rows INT NOT NULL DEFAULT 0,
+  error TEXT,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_deletion_jobs_status (status)
+);
+
+-- 삭제 단계에서 조건으로 사용하는 컬럼
+CREATE INDEX idx_payment_user ON payment (user_id);
+CREATE INDEX idx_payment_class_date ON payment (class_date_id);
+CREATE INDEX idx_user_bookmarks_class ON user_bookmarks (class_id);
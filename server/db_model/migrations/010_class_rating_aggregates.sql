@@ -0,0 +1,11 @@
+-- 클래스별 리뷰 집계 (리뷰 작성/삭제 시 같은 트랜잭션에서 갱신, control/ratings.py)
+-- 상세/목록 응답에서 class_reviews 를 읽지 않고 리뷰 수, 평점 합계, 1~5점 분포를 보여주기 위한 컬럼
+-- 기존 데이터는 server 디렉터리에서 python -m db_model.rebuild_class_ratings 으로 채운다
+
+ALTER TABLE class ADD COLUMN review_count INT NOT NULL DEFAULT 0;
+ALTER TABLE class ADD COLUMN rating_sum INT NOT NULL DEFAULT 0;
+ALTER TABLE class ADD COLUMN rating_1 INT NOT NULL DEFAULT 0;
+ALTER TABLE class ADD COLUMN rating_2 INT NOT NULL DEFAULT 0;
+ALTER TABLE class ADD COLUMN rating_3 INT NOT NULL DEFAULT 0;
+ALTER TABLE class ADD COLUMN rating_4 INT NOT NULL DEFAULT 0;
+ALTER TABLE class ADD COLUMN rating_5 INT NOT NULL DEFAULT 0;
@@ -0,0 +1,10 @@
+-- 같은 이메일로 두 번 가입하지 못하도록 유니크 제약 추가
+-- (회원가입은 INSERT 한 번으로 처리하고, 동시에 들어온 가입도 하나만 성공하며 나머지는 중복 키 오류 1062)
+
+-- 1. 중복 이메일 확인. 결과가 있으면 인덱스 생성 전에 직접 정리해야 한다
+SELECT email, COUNT(*) AS users
+FROM user_info
+GROUP BY email
+HAVING COUNT(*) > 1;
+
+CREATE UNIQUE INDEX uq_user_info_email ON user_info (email);
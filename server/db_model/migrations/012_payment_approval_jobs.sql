@@ -0,0 +1,19 @@
+-- 결제 승인 작업 큐 (control/payment_approval.py)
+-- 결제 성공 요청은 작업만 기록하고 바로 응답하며, 카카오페이 승인 호출은 백그라운드 워커가 처리한다
+-- payment_id 가 기본 키이므로 같은 결제의 승인 요청을 여러 번 보내도 작업은 하나만 생긴다
+
+CREATE TABLE payment_approval_jobs (
+  payment_id INT NOT NULL PRIMARY KEY,
+  user_id INT NOT NULL, -- 결제한 사용자 (상태 조회 권한, 예약 확정 대상)
+  class_date_id INT NOT NULL,
+  pg_token VARCHAR(255) NOT NULL,
+  status VARCHAR(16) NOT NULL DEFAULT 'pending', -- pending | running | done | failed
+  attempts INT NOT NULL DEFAULT 0,
+  error TEXT,
+  next_attempt_at DATETIME NOT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_payment_approval_jobs_status (status, next_attempt_at),
+  INDEX idx_payment_approval_jobs_user (user_id), -- 계정/클래스 삭제 단계에서 조건으로 사용
+  INDEX idx_payment_approval_jobs_class_date (class_date_id)
+);
@@ -0,0 +1,8 @@
+-- 지역 분리 규칙 변경: 세종특별자치시는 district 없음, 구가 있는 시는 '성남시 분당구' 처럼 시와 구를 함께 저장
+-- 스키마 변경은 없고, 기존 행은 server 디렉터리에서 python -m db_model.backfill_class_region 으로 다시 계산한다
+
+-- 1. 다시 계산될 행 확인 (세종, 시 다음에 구가 오는 주소)
+SELECT id, location, city, district
+FROM class
+WHERE location LIKE '세종%'
+   OR district LIKE '%시' AND location LIKE CONCAT('% ', district, ' %구 %');
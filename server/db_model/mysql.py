@@ -1,15 +1,28 @@
 import pymysql 
 from dotenv import load_dotenv
+import collections
+import logging
 import os 
+import threading
+import time
 from dbutils.pooled_db import PooledDB
+from flask import g, has_request_context, jsonify, request
+from db_model import metrics, queries
+from control.runtime import db_pool_size, db_checkout_timeout
 
 
 # .env.local 파일 로드
 load_dotenv('.env.local')
+logger = logging.getLogger(__name__)
+
+#워커 프로세스 하나의 풀 크기 (전체 워커 합계가 DB 커넥션 한도를 넘지 않도록 control.runtime 에서 계산)
+MAX_CONNECTIONS = db_pool_size()
+CHECKOUT_TIMEOUT = db_checkout_timeout()
 
 POOL = PooledDB(
   creator=pymysql,
-  maxconnections=50,
+  maxconnections=MAX_CONNECTIONS,
+  blocking=False, #대기는 아래 _slots 에서 시간 제한을 두고 처리 (PooledDB 의 대기에는 시간 제한이 없음)
   user=os.getenv('DB_USER'),
   passwd=os.getenv('DB_PASSWORD'),
   host=os.getenv('DB_HOST'),
@@ -20,7 +33,194 @@ POOL = PooledDB(
   ssl={'ca': os.getenv('SSL'), 'ssl_mode': 'VERIFY_IDENTITY'}
   )
 
-def conn_mysqldb():
-  conn = POOL.connection()
-  cursor = conn.cursor(pymysql.cursors.DictCursor)
+#현재 사용중인 커넥션 수 
+_in_use = 0
+_in_use_lock = threading.Lock()
+
+#풀에서 꺼낼 수 있는 남은 커넥션 수 (CHECKOUT_TIMEOUT 동안 기다려도 없으면 PoolExhausted)
+_slots = threading.BoundedSemaphore(MAX_CONNECTIONS)
+SLOT_WAIT_STEP = 0.1 #초, 기다리는 동안 이 간격으로 버려진 커넥션을 회수
+
+#close 없이 버려진 커넥션 (GC 는 아무 스레드에서나, 잠금을 잡은 채로도 돌 수 있으므로
+#__del__ 에서는 잠금 없이 여기에 넣기만 하고 다음 checkout 에서 풀에 반납한다)
+_abandoned = collections.deque()
+
+
+class PoolExhausted(Exception):
+  pass
+
+ER_DUP_ENTRY = 1062
+
+#유니크 인덱스 위반인지 확인 (key 를 주면 그 인덱스의 위반만)
+#INSERT IGNORE 는 중복 외의 오류(잘린 값, NOT NULL 등)도 경고로 바꿔 삼키므로 평범한 INSERT 후 이 오류로 중복을 판단한다
+def is_duplicate_key(error, key=None):
+  if not isinstance(error, pymysql.err.IntegrityError) or not error.args or error.args[0] != ER_DUP_ENTRY:
+    return False
+  #MySQL 8 은 'table.index', 5.7 은 'index' 형태로 메시지에 인덱스 이름을 넣는다
+  return key is None or f"{key}'" in str(error.args[-1])
+
+def _track_in_use(delta):
+  global _in_use
+  with _in_use_lock:
+    _in_use += delta
+
+#현재 요청의 라우트 이름 (지표 라벨로 사용)
+def current_route():
+  if has_request_context():
+    return request.endpoint or 'unknown'
+  return 'background'
+
+def _operation(query):
+  parts = query.split(None, 1)
+  return parts[0].lower() if parts else 'unknown'
+
+
+#버퍼 없는 커서는 실행 직후 행 수를 알 수 없음 (pymysql 은 -1 을 부호 없는 값으로 돌려줌)
+def _row_count(cursor):
+  rowcount = cursor.rowcount
+  return rowcount if 0 <= rowcount < 2 ** 63 else None
+
+
+#실행 시간을 측정하는 커서 (라우트/문장 종류별 + db_model.queries 의 문장 이름별)
+class InstrumentedCursor:
+  def __init__(self, cursor):
+    self._cursor = cursor
+
+  def execute(self, query, args=None):
+    return self._timed(self._cursor.execute, query, args, False)
+
+  def executemany(self, query, args):
+    return self._timed(self._cursor.executemany, query, args, True)
+
+  def _timed(self, method, query, args, many):
+    route = current_route()
+    operation = _operation(query)
+    name = getattr(query, 'name', None) or queries.caller_name(2)
+    started = time.perf_counter()
+    failed = False
+    try:
+      return method(query, args)
+    except Exception:
+      failed = True
+      metrics.query_errors.inc(route, operation)
+      raise
+    finally:
+      elapsed = time.perf_counter() - started
+      metrics.query_latency.observe(elapsed, route, operation)
+      queries.record(name, elapsed, None if failed else _row_count(self._cursor), route, args, many)
+      #요청 로그에 남길 DB 시간/쿼리 수 누적
+      if has_request_context():
+        g.db_time = g.get('db_time', 0.0) + elapsed
+        g.db_queries = g.get('db_queries', 0) + 1
+
+  def __iter__(self):
+    return iter(self._cursor)
+
+  def __getattr__(self, name):
+    return getattr(self._cursor, name)
+
+
+#반납 시 사용중 커넥션 수를 줄이는 커넥션 
+#close 는 여러 번 불러도 한 번만 반납하고, close 없이 버려져도 __del__ 에서 반납 대기열에 넣는다
+class InstrumentedConnection:
+  def __init__(self, conn):
+    self._conn = conn
+    self._closed = False
+    _track_in_use(1)
+
+  def close(self):
+    if not self._closed:
+      self._closed = True
+      _release(self._conn)
+
+  def __del__(self):
+    if not self.__dict__.get('_closed', True):
+      self._closed = True
+      _abandoned.append(self._conn)
+
+  def __getattr__(self, name):
+    return getattr(self._conn, name)
+
+def _release(conn):
+  try:
+    conn.close()
+  finally:
+    _track_in_use(-1)
+    _slots.release()
+
+def _reclaim_abandoned():
+  while _abandoned:
+    try:
+      conn = _abandoned.popleft()
+    except IndexError:
+      break
+    metrics.abandoned_connections.inc()
+    logger.warning("database connection was garbage collected without close(); returned to the pool")
+    _release(conn)
+
+#CHECKOUT_TIMEOUT 안에 슬롯을 얻으면 True
+def _acquire_slot():
+  deadline = time.monotonic() + CHECKOUT_TIMEOUT
+  while True:
+    _reclaim_abandoned()
+    remaining = deadline - time.monotonic()
+    if _slots.acquire(timeout=max(min(remaining, SLOT_WAIT_STEP), 0)):
+      return True
+    if remaining <= SLOT_WAIT_STEP:
+      return False
+
+
+#unbuffered=True 이면 결과를 서버에서 한 행씩 읽는 커서 (스트리밍 응답용)
+#tuples=True 이면 행을 dict 대신 튜플로 반환 (control.projection 스키마로 변환할 때)
+def conn_mysqldb(unbuffered=False, tuples=False):
+  started = time.perf_counter()
+  if not _acquire_slot():
+    metrics.checkout_timeouts.inc()
+    if has_request_context():
+      g.db_pool_exhausted = True
+    raise PoolExhausted(f'No database connection available within {CHECKOUT_TIMEOUT}s')
+  try:
+    conn = InstrumentedConnection(POOL.connection())
+  except Exception:
+    _slots.release()
+    raise
+  metrics.checkout_wait.observe(time.perf_counter() - started)
+  metrics.checkouts.inc()
+  if tuples:
+    cursor_class = pymysql.cursors.SSCursor if unbuffered else pymysql.cursors.Cursor
+  else:
+    cursor_class = pymysql.cursors.SSDictCursor if unbuffered else pymysql.cursors.DictCursor
+  cursor = InstrumentedCursor(conn.cursor(cursor_class))
   return conn, cursor
+
+
+#커넥션을 기다리다 시간이 초과된 요청은 503 으로 응답
+#라우트가 예외를 잡아 오류 JSON 으로 응답한 경우에도 요청 중에 PoolExhausted 가 났으면 503 으로 바꾼다
+def configure_pool_errors(app):
+  def busy_response():
+    return jsonify({'status': 'error', 'message': 'Server is busy. Try again later.'}), 503, {'Retry-After': '1'}
+
+  app.register_error_handler(PoolExhausted, lambda e: busy_response())
+
+  @app.after_request
+  def pool_exhausted_response(response):
+    if g.get('db_pool_exhausted') and response.status_code != 503:
+      return app.make_response(busy_response())
+    return response
+
+
+#이미 꺼낸 커넥션에서 DictCursor 하나 더 (튜플 커서로 작업 중에 dict 행을 쓰는 함수를 부를 때)
+def dict_cursor(conn):
+  return InstrumentedCursor(conn.cursor(pymysql.cursors.DictCursor))
+
+
+def _idle_connections():
+  idle = getattr(POOL, '_idle_cache', None)
+  return len(idle) if idle is not None else 0
+
+metrics.REGISTRY.register(metrics.Gauge(
+  'db_pool_connections_in_use', 'Connections currently checked out of the pool.', lambda: _in_use))
+metrics.REGISTRY.register(metrics.Gauge(
+  'db_pool_connections_idle', 'Idle connections kept in the pool.', _idle_connections))
+metrics.REGISTRY.register(metrics.Gauge(
+  'db_pool_connections_max', 'Maximum connections allowed by the pool.', lambda: MAX_CONNECTIONS))
@@ -0,0 +1,408 @@
+import logging
+import os
+import sys
+from db_model import metrics
+from control.projection import BOOKING, CLASS_SUMMARY, RATING_COLUMNS, RATING_HISTOGRAM_COLUMNS
+
+#이름 붙인 SQL 문 목록 (라우트와 control 모듈에서 실행하는 문장은 모두 여기서 정의)
+#Query 는 이름을 가진 str 이므로 cur.execute(queries.X, params) 로 그대로 실행한다
+#conn_mysqldb 의 커서가 문장 이름별 실행 시간/행 수를 기록하고, SLOW_QUERY_MS 이상 걸린 문장은
+#slow_query 로그에 라우트와 파라미터 모양(값이 아닌 타입과 개수)을 함께 남긴다
+#이름이 없는 문장(일회성 스크립트 등)은 실행한 함수 이름(모듈.함수)으로 기록된다
+#pymysql 은 서버 prepared statement(COM_STMT_PREPARE)를 지원하지 않으므로 파라미터는 클라이언트에서 바인딩되지만,
+#이름마다 문장 텍스트가 고정되어 있어 서버의 문장 다이제스트(performance_schema)와 이 지표가 1:1 로 대응한다
+#등록된 문장 목록: python -m db_model.queries (server 디렉터리에서 실행)
+#  SLOW_QUERY_MS : 느린 문장 기준 (밀리초, 기본 200, 음수면 기록하지 않음)
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+MAX_SHAPES = 512 #문장 묶음 하나가 캐시하는 문장 모양 수
+
+slow_log = logging.getLogger('slow_query')
+
+STATEMENTS = {} #이름 -> Query 또는 Family
+
+
+class Query(str):
+  def __new__(cls, name, sql):
+    query = super().__new__(cls, sql)
+    query.name = name
+    return query
+
+
+#컬럼 목록, 조건 조합, IN 목록 길이 등(shape)에 따라 텍스트가 달라지는 문장 묶음 (이름은 하나)
+#같은 shape 은 같은 Query 를 재사용한다
+class Family:
+  def __init__(self, name, build):
+    self.name = name
+    self._build = build
+    self._shapes = {}
+
+  def __call__(self, *shape):
+    query = self._shapes.get(shape)
+    if query is None:
+      query = Query(self.name, self._build(*shape))
+      if len(self._shapes) < MAX_SHAPES:
+        self._shapes[shape] = query
+    return query
+
+
+def _register(statement):
+  if statement.name in STATEMENTS:
+    raise ValueError(f'Duplicate query name: {statement.name}')
+  STATEMENTS[statement.name] = statement
+  return statement
+
+def define(name, sql):
+  return _register(Query(name, sql))
+
+def family(name, build):
+  return _register(Family(name, build))
+
+def _placeholders(count):
+  return ', '.join(['%s'] * count)
+
+#허용된 컬럼만 SET 절에 사용 (요청 본문의 키를 그대로 SQL 에 넣지 않도록)
+def _set_clause(table, columns, allowed):
+  unknown = [column for column in columns if column not in allowed]
+  if unknown or not columns:
+    raise ValueError(f"Invalid {table} fields: {', '.join(unknown) or '(none)'}")
+  return ', '.join(f"{column} = %s" for column in columns)
+
+
+#실행한 함수 이름 (이름 없는 문장의 지표 라벨), depth 는 이 함수를 부른 커서 메서드까지의 프레임 수
+def caller_name(depth):
+  frame = sys._getframe(depth + 1)
+  return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+#파라미터 값 대신 타입과 개수만 (연속된 같은 타입은 묶음, 예: (int, str x 3))
+def param_shape(args, many=False):
+  if many:
+    args = list(args or [])
+    return f"{len(args)} x {param_shape(args[0]) if args else '()'}"
+  if args is None:
+    return '()'
+  if isinstance(args, dict):
+    return '{' + ', '.join(f"{key}: {type(value).__name__}" for key, value in args.items()) + '}'
+  if not isinstance(args, (list, tuple)):
+    args = (args,)
+  runs = []
+  for value in args:
+    type_name = type(value).__name__
+    if runs and runs[-1][0] == type_name:
+      runs[-1][1] += 1
+    else:
+      runs.append([type_name, 1])
+  return '(' + ', '.join(type_name if count == 1 else f"{type_name} x {count}" for type_name, count in runs) + ')'
+
+#문장 하나의 실행 기록 (rows 가 None 이면 행 수를 알 수 없는 경우: 스트리밍 커서 등)
+def record(name, elapsed, rows, route, args, many=False):
+  metrics.statement_latency.observe(elapsed, name)
+  if rows is not None:
+    metrics.statement_rows.inc(name, amount=rows)
+  if 0 <= SLOW_QUERY_MS <= elapsed * 1000:
+    metrics.slow_statements.inc(name)
+    slow_log.warning('slow query', extra={
+      'query': name,
+      'route': route,
+      'duration_ms': round(elapsed * 1000, 2),
+      'rows': rows,
+      'params': param_shape(args, many),
+    })
+
+
+#class
+CLASS_BY_ID = define('class.by_id', "SELECT * FROM class WHERE id = %s")
+CLASS_DETAIL = define('class.detail',
+  f"SELECT class_name, description, location, cost, target_student, content, curriculum, latitude, longitude, {', '.join(RATING_COLUMNS)} FROM class WHERE id = %s")
+CLASS_ADDITIONAL = define('class.additional', "SELECT id, class_name, cost, description FROM class WHERE id = %s")
+CLASS_OWNED = define('class.owned', "SELECT id FROM class WHERE id = %s AND instructor_id = %s")
+CLASS_LOCK_OWNED = define('class.lock_owned', "SELECT id FROM class WHERE id = %s AND instructor_id = %s FOR UPDATE")
+CLASS_INSERT = define('class.insert', """
+    INSERT INTO class (class_name, description, location, instructor_id, cost, latitude, longitude, target_student, curriculum, content, city, district)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """)
+CLASS_EDITABLE_COLUMNS = ('class_name', 'description', 'location', 'cost', 'latitude', 'longitude',
+                          'target_student', 'curriculum', 'content', 'city', 'district')
+#shape: 수정할 컬럼 튜플
+CLASS_UPDATE = family('class.update', lambda columns:
+  f"UPDATE class SET {_set_clause('class', columns, CLASS_EDITABLE_COLUMNS)} WHERE id = %s AND instructor_id = %s")
+#리뷰 집계 증감 (control.ratings), 파라미터: review_count, rating_sum, rating_1 ~ rating_5 증감값, id
+CLASS_RATINGS_APPLY = define('class.ratings_apply',
+  "UPDATE class SET review_count = review_count + %s, rating_sum = rating_sum + %s, "
+  + ", ".join(f"{column} = {column} + %s" for column in RATING_HISTOGRAM_COLUMNS) + " WHERE id = %s")
+#좌표 격자 인덱스 (control.spatial_index)
+_CLASS_LOCATION_SELECT = f"SELECT {CLASS_SUMMARY.columns}, latitude, longitude FROM class"
+CLASS_LOCATIONS_ALL = define('class.locations_all',
+  _CLASS_LOCATION_SELECT + " WHERE latitude IS NOT NULL AND longitude IS NOT NULL")
+CLASS_LOCATION_BY_ID = define('class.location_by_id', _CLASS_LOCATION_SELECT + " WHERE id = %s")
+
+#class_dates
+CLASS_DATES_BY_ID = define('class_dates.by_id', "SELECT * FROM class_dates WHERE id = %s")
+CLASS_DATE_BY_ID = define('class_dates.date_by_id', "SELECT class_date FROM class_dates WHERE id = %s")
+CLASS_DATE_CLASS_ID = define('class_dates.class_id_by_id', "SELECT class_id FROM class_dates WHERE id = %s")
+CLASS_DATES_BY_CLASS = define('class_dates.by_class', """
+    SELECT cd.id, cd.class_date, cd.capacity, cd.booked_count, c.class_name as class_name
+    FROM class_dates cd
+    JOIN class c ON cd.class_id = c.id
+    WHERE cd.class_id = %s
+    ORDER BY cd.class_date
+    """)
+CLASS_DATES_KEY = 'uq_class_dates_class_date' #이 인덱스 위반(1062)이면 이미 등록된 시간대
+CLASS_DATES_INSERT = define('class_dates.insert',
+  "INSERT INTO class_dates (class_id, class_date, capacity) VALUES (%s, %s, %s)")
+#shape: 확인할 시간대 수
+CLASS_DATES_EXISTING = family('class_dates.existing', lambda count:
+  f"SELECT class_date FROM class_dates WHERE class_id = %s AND class_date IN ({_placeholders(count)})")
+#좌석 배정/반납 (control.booking_engine), 배정은 정원이 남아 있을 때만 한 행을 갱신
+CLASS_DATES_ADMIT_SEAT = define('class_dates.admit_seat', """
+    UPDATE class_dates SET booked_count = booked_count + 1
+    WHERE id = %s AND booked_count < capacity
+    """)
+CLASS_DATES_RELEASE_SEAT = define('class_dates.release_seat', """
+    UPDATE class_dates SET booked_count = booked_count - 1
+    WHERE id = %s AND booked_count > 0
+    """)
+#shape: 반납할 예약날짜 수 (control.deletion)
+CLASS_DATES_RELEASE_SEATS = family('class_dates.release_seats', lambda count:
+  f"UPDATE class_dates SET booked_count = booked_count - 1 WHERE id IN ({_placeholders(count)}) AND booked_count > 0")
+
+#class_booking
+BOOKING_STATUSES_FOR_CLASS = define('class_booking.statuses_for_class', """
+    SELECT class_date_id, status FROM class_booking
+    WHERE student_id = %s AND class_id = %s
+    """)
+BOOKING_STATUS = define('class_booking.status', "SELECT status FROM class_booking WHERE id = %s")
+BOOKING_ATTENDEES = define('class_booking.attendees', """
+    SELECT
+      class_booking.*,
+      user_info.name,
+      user_info.email,
+      user_info.phone_number
+    FROM
+      class_booking
+    INNER JOIN user_info ON class_booking.student_id = user_info.id
+    WHERE
+      class_booking.class_date_id = %s;
+    """)
+
+#shape: (상태 필터 수, 페이지 커서 여부, LIMIT 여부), 예약 + 클래스 + 날짜 + 리뷰 여부를 한 번에 조회 (수업 날짜 최신순)
+def _bookings_by_student(status_count, has_cursor, paged):
+  query = f"""
+    SELECT {BOOKING.columns}
+    FROM class_booking cb
+    JOIN class c ON c.id = cb.class_id
+    JOIN class_dates cd ON cd.id = cb.class_date_id
+    WHERE cb.student_id = %s
+  """
+  if status_count:
+    query += f" AND cb.status IN ({_placeholders(status_count)})"
+  if has_cursor:
+    query += " AND (cd.class_date < %s OR (cd.class_date = %s AND cb.id < %s))"
+  query += " ORDER BY cd.class_date DESC, cb.id DESC"
+  return query + " LIMIT %s" if paged else query
+
+BOOKINGS_BY_STUDENT = family('class_booking.by_student', _bookings_by_student)
+
+#예약/취소 (control.booking_engine)
+BOOKING_KEY = 'uq_class_booking_student_date' #이 인덱스 위반(1062)이면 이미 예약한 수업
+BOOKING_REOPEN = define('class_booking.reopen', """
+    UPDATE class_booking SET status = 'pending'
+    WHERE student_id = %s AND class_date_id = %s AND status = 'cancelled'
+    """)
+BOOKING_INSERT = define('class_booking.insert', """
+    INSERT INTO class_booking (class_id, student_id, class_date_id, status)
+    VALUES (%s, %s, %s, 'pending')
+    """)
+BOOKING_CANCEL = define('class_booking.cancel', """
+    UPDATE class_booking SET status = 'cancelled'
+    WHERE class_date_id = %s AND student_id = %s AND status IN ('pending', 'confirmed')
+    """)
+#결제한 사용자의 대기 중인 예약만 확정 (control.payment_approval)
+BOOKING_CONFIRM_PENDING = define('class_booking.confirm_pending', """
+    UPDATE class_booking SET status = 'confirmed'
+    WHERE student_id = %s AND class_date_id = %s AND status = 'pending'
+    """)
+
+#payment
+PAYMENT_INSERT = define('payment.insert', """
+    INSERT INTO payment (user_id, class_date_id, amount, status)
+    VALUES (%s, %s, %s, 'pending')
+    """)
+PAYMENT_SAVE_TID = define('payment.save_tid', "UPDATE payment SET tid = %s WHERE id = %s")
+PAYMENT_FOR_APPROVAL = define('payment.for_approval', "SELECT user_id, class_date_id, tid FROM payment WHERE id = %s")
+PAYMENT_COMPLETE = define('payment.complete', "UPDATE payment SET status = 'completed' WHERE id = %s AND status = 'pending'")
+PAYMENT_FAIL = define('payment.fail', "UPDATE payment SET status = 'failed' WHERE id = %s AND status = 'pending'")
+#승인은 되었지만 확정할 예약이 없는 결제 (예약 대기 중 취소), 환불 처리 대상
+PAYMENT_REFUND_REQUIRED = define('payment.refund_required',
+  "UPDATE payment SET status = 'refund_required' WHERE id = %s AND status = 'pending'")
+
+#payment_approval_jobs (control.payment_approval), 시각은 모두 워커 시계로 파라미터에 넣는다
+APPROVAL_JOB_BY_ID = define('payment_approval_jobs.by_id', """
+    SELECT payment_id, user_id, class_date_id, status, attempts, error, created_at, updated_at
+    FROM payment_approval_jobs WHERE payment_id = %s
+    """)
+APPROVAL_JOB_KEY = 'PRIMARY' #payment_id 중복(1062)이면 이미 기록된 작업
+APPROVAL_JOB_INSERT = define('payment_approval_jobs.insert', """
+    INSERT INTO payment_approval_jobs (payment_id, user_id, class_date_id, pg_token, status, next_attempt_at, created_at, updated_at)
+    VALUES (%s, %s, %s, %s, 'pending', %s, %s, %s)
+    """)
+#파라미터: now, payment_id, now, now - STALE_AFTER
+APPROVAL_JOB_CLAIM = define('payment_approval_jobs.claim', """
+    UPDATE payment_approval_jobs SET status = 'running', attempts = attempts + 1, updated_at = %s
+    WHERE payment_id = %s
+      AND ((status = 'pending' AND next_attempt_at <= %s) OR (status = 'running' AND updated_at < %s))
+    """)
+APPROVAL_JOB_CLAIMED = define('payment_approval_jobs.claimed', """
+    SELECT j.payment_id, j.user_id, j.class_date_id, j.pg_token, j.attempts, p.tid
+    FROM payment_approval_jobs j
+    JOIN payment p ON p.id = j.payment_id
+    WHERE j.payment_id = %s
+    """)
+APPROVAL_JOB_DONE = define('payment_approval_jobs.done',
+  "UPDATE payment_approval_jobs SET status = 'done', error = NULL, updated_at = %s WHERE payment_id = %s")
+APPROVAL_JOB_RETRY = define('payment_approval_jobs.retry', """
+    UPDATE payment_approval_jobs SET status = 'pending', error = %s, next_attempt_at = %s, updated_at = %s
+    WHERE payment_id = %s
+    """)
+APPROVAL_JOB_FAIL = define('payment_approval_jobs.fail',
+  "UPDATE payment_approval_jobs SET status = 'failed', error = %s, updated_at = %s WHERE payment_id = %s")
+#파라미터: now, now - STALE_AFTER
+APPROVAL_JOBS_DUE = define('payment_approval_jobs.due', """
+    SELECT payment_id FROM payment_approval_jobs
+    WHERE (status = 'pending' AND next_attempt_at <= %s) OR (status = 'running' AND updated_at < %s)
+    ORDER BY payment_id
+    """)
+
+#class_reviews
+REVIEW_COUNT_FOR_BOOKING = define('class_reviews.count_for_booking', "SELECT COUNT(*) FROM class_reviews WHERE booking_id = %s")
+REVIEW_LOCK_OWN = define('class_reviews.lock_own',
+  "SELECT class_id, rating FROM class_reviews WHERE id = %s AND user_id = %s FOR UPDATE")
+REVIEW_INSERT = define('class_reviews.insert', """
+    INSERT INTO class_reviews (class_id, user_id, class_date_id, rating, comment, booking_id)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    """)
+REVIEW_DELETE = define('class_reviews.delete', "DELETE FROM class_reviews WHERE id = %s")
+REVIEW_SET_INSTRUCTOR_COMMENT = define('class_reviews.set_instructor_comment',
+  "UPDATE class_reviews SET instructor_comment = %s WHERE id = %s")
+REVIEW_CLEAR_INSTRUCTOR_COMMENT = define('class_reviews.clear_instructor_comment',
+  "UPDATE class_reviews SET instructor_comment = NULL WHERE id = %s")
+
+#shape: (클래스 필터, 사용자 필터, 페이지 커서, LIMIT 여부), 리뷰 + 클래스 이름 + 수업 날짜 (작성일 최신순)
+def _reviews(by_class, by_user, has_cursor, paged):
+  query = """
+    SELECT cr.*, c.class_name, cd.class_date
+    FROM class_reviews cr
+    JOIN class c ON c.id = cr.class_id
+    JOIN class_dates cd ON cd.id = cr.class_date_id
+  """
+  conditions = []
+  if by_class:
+    conditions.append("cr.class_id = %s")
+  if by_user:
+    conditions.append("cr.user_id = %s")
+  if has_cursor:
+    conditions.append("(cr.created_at < %s OR (cr.created_at = %s AND cr.id < %s))")
+  if conditions:
+    query += " WHERE " + " AND ".join(conditions)
+  query += " ORDER BY cr.created_at DESC, cr.id DESC"
+  return query + " LIMIT %s" if paged else query
+
+REVIEWS_LIST = family('class_reviews.list', _reviews)
+
+#user_info
+USER_EMAIL_EXISTS = define('user_info.email_exists', "SELECT 1 FROM user_info WHERE email = %s LIMIT 1")
+USER_EMAIL_KEY = 'uq_user_info_email' #이 인덱스 위반(1062)이면 이미 가입된 이메일
+USER_INSERT = define('user_info.insert', """
+    INSERT INTO user_info (email, password, name, phone_number, address, zonecode, address_detail, role)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """)
+USER_SET_PASSWORD = define('user_info.set_password', "UPDATE user_info SET password = %s WHERE id = %s")
+USER_UPGRADE_PASSWORD = define('user_info.upgrade_password',
+  "UPDATE user_info SET password = %s WHERE id = %s AND password = %s")
+USER_BOOKMARK_VERSION = define('user_info.bookmark_version', "SELECT bookmark_version FROM user_info WHERE id = %s")
+USER_BUMP_BOOKMARK_VERSION = define('user_info.bump_bookmark_version',
+  "UPDATE user_info SET bookmark_version = bookmark_version + 1 WHERE id = %s")
+USER_EDITABLE_COLUMNS = ('name', 'email', 'phone_number', 'address', 'zonecode', 'address_detail')
+#shape: 수정할 컬럼 튜플
+USER_UPDATE = family('user_info.update', lambda columns:
+  f"UPDATE user_info SET {_set_clause('user_info', columns, USER_EDITABLE_COLUMNS)} WHERE id = %s")
+#user 캐시 (control.user_cache)
+USER_BY_ID = define('user_info.by_id', "SELECT * FROM user_info WHERE id = %s")
+USER_BY_EMAIL = define('user_info.by_email', "SELECT * FROM user_info WHERE email = %s")
+#가입 이메일 필터 (control.email_filter)
+USER_COUNT = define('user_info.count', "SELECT COUNT(*) FROM user_info")
+USER_EMAILS = define('user_info.emails', "SELECT email FROM user_info")
+
+#user_bookmarks
+_BOOKMARK_SELECT = """
+  SELECT ub.*, c.class_name, c.description AS class_description
+  FROM user_bookmarks ub
+  JOIN class c ON c.id = ub.class_id
+"""
+BOOKMARKS_BY_USER = define('user_bookmarks.by_user', _BOOKMARK_SELECT + " WHERE ub.user_id = %s")
+BOOKMARK_ONE = define('user_bookmarks.one', _BOOKMARK_SELECT + " WHERE ub.user_id = %s AND ub.class_id = %s")
+BOOKMARK_CLASS_IDS = define('user_bookmarks.class_ids', "SELECT class_id FROM user_bookmarks WHERE user_id = %s")
+BOOKMARK_KEY = 'uq_user_bookmarks_user_class' #이 인덱스 위반(1062)이면 이미 북마크한 클래스
+#존재하는 클래스만 추가 (없는 class_id 면 0 행)
+BOOKMARK_INSERT = define('user_bookmarks.insert',
+  "INSERT INTO user_bookmarks (user_id, class_id) SELECT %s, id FROM class WHERE id = %s")
+BOOKMARK_DELETE = define('user_bookmarks.delete', "DELETE FROM user_bookmarks WHERE user_id = %s AND class_id = %s")
+
+
+#resource_versions (control.resource_versions)
+RESOURCE_VERSIONS_BUMP = define('resource_versions.bump', """
+    INSERT INTO resource_versions (name, version) VALUES (%s, 1)
+    ON DUPLICATE KEY UPDATE version = version + 1
+    """)
+#예약 변경처럼 class_id 대신 class_date_id / student_id 만 아는 경우, 해당 클래스들의 예약날짜 버전을 한 문장으로 올림
+_BUMP_CLASS_DATES = """
+    INSERT INTO resource_versions (name, version)
+    SELECT DISTINCT CONCAT('class_dates:', class_id), 1 FROM {table} WHERE {condition}
+    ON DUPLICATE KEY UPDATE version = version + 1
+    """
+RESOURCE_VERSIONS_BUMP_FOR_DATE = define('resource_versions.bump_class_dates_for_date',
+  _BUMP_CLASS_DATES.format(table='class_dates', condition='id = %s'))
+RESOURCE_VERSIONS_BUMP_FOR_STUDENT = define('resource_versions.bump_class_dates_for_student',
+  _BUMP_CLASS_DATES.format(table='class_booking', condition="student_id = %s AND status <> 'cancelled'"))
+#shape: 조회할 버전 이름 수
+RESOURCE_VERSIONS_CURRENT = family('resource_versions.current', lambda count:
+  f"SELECT name, version FROM resource_versions WHERE name IN ({_placeholders(count)})")
+
+#deletion_jobs (control.deletion)
+DELETION_JOB_INSERT = define('deletion_jobs.insert',
+  "INSERT INTO deletion_jobs (kind, target_id, owner_id, status) VALUES (%s, %s, %s, 'pending')")
+DELETION_JOB_BY_ID = define('deletion_jobs.by_id', """
+    SELECT id, kind, target_id, owner_id, status, step, deleted_rows, error, created_at, updated_at
+    FROM deletion_jobs WHERE id = %s
+    """)
+DELETION_JOB_TARGET = define('deletion_jobs.target', "SELECT kind, target_id, owner_id FROM deletion_jobs WHERE id = %s")
+DELETION_JOB_START = define('deletion_jobs.start',
+  "UPDATE deletion_jobs SET status = 'running', error = NULL, updated_at = NOW() WHERE id = %s")
+DELETION_JOB_STEP = define('deletion_jobs.step',
+  "UPDATE deletion_jobs SET step = %s, deleted_rows = %s, updated_at = NOW() WHERE id = %s")
+DELETION_JOB_FAIL = define('deletion_jobs.fail',
+  "UPDATE deletion_jobs SET status = 'failed', error = %s, updated_at = NOW() WHERE id = %s")
+DELETION_JOB_DONE = define('deletion_jobs.done',
+  "UPDATE deletion_jobs SET status = 'done', step = NULL, deleted_rows = %s, updated_at = NOW() WHERE id = %s")
+DELETION_JOBS_UNFINISHED = define('deletion_jobs.unfinished', "SELECT id FROM deletion_jobs WHERE status <> 'done' ORDER BY id")
+#삭제 단계의 청크 (table, 조건, 컬럼은 control.deletion 의 Step 정의에서만 옴)
+#shape: (table, columns, condition, key)
+DELETION_LOCK_CHUNK = family('deletion.lock_chunk', lambda table, columns, condition, key:
+  f"SELECT {columns} FROM {table} WHERE {condition} ORDER BY {key} LIMIT %s FOR UPDATE")
+#shape: (table, key, 청크 행 수)
+DELETION_DELETE_CHUNK = family('deletion.delete_chunk', lambda table, key, count:
+  f"DELETE FROM {table} WHERE {key} IN ({_placeholders(count)})")
+
+#app_sessions (control.session_backend)
+SESSION_LOAD = define('app_sessions.load', "SELECT data FROM app_sessions WHERE sid = %s AND expires_at > %s")
+SESSION_SAVE = define('app_sessions.save', "REPLACE INTO app_sessions (sid, data, expires_at) VALUES (%s, %s, %s)")
+SESSION_PURGE = define('app_sessions.purge', "DELETE FROM app_sessions WHERE expires_at < %s")
+SESSION_DELETE = define('app_sessions.delete', "DELETE FROM app_sessions WHERE sid = %s")
+
+
+if __name__ == '__main__':
+  for name, statement in sorted(STATEMENTS.items()):
+    if isinstance(statement, Family):
+      print(f"{name}  (shape 에 따라 달라지는 문장)")
+    else:
+      print(f"{name}\n  {' '.join(statement.split())}")
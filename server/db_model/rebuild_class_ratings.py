@@ -0,0 +1,40 @@
+from db_model.mysql import conn_mysqldb
+from control.projection import RATING_HISTOGRAM_COLUMNS
+from control.ratings import RATINGS
+from control import resource_versions
+
+#class_reviews 에서 클래스별 리뷰 집계(review_count, rating_sum, rating_1 ~ rating_5)를 다시 계산
+#리뷰 테이블을 한 번 읽어 GROUP BY 로 집계하고, 작업 중 리뷰 작성/삭제가 끼어들지 않도록 같은 트랜잭션에서 잠근다
+#마이그레이션 010 적용 후 기존 데이터 채우기, 집계가 어긋났을 때 복구용
+#server 디렉터리에서 실행: python -m db_model.rebuild_class_ratings
+
+BATCH_SIZE = 500
+
+
+def rebuild():
+  conn, cur = conn_mysqldb(tuples=True)
+  try:
+    conn.begin()
+    histogram = ", ".join(f"SUM(CASE WHEN rating = {rating} THEN 1 ELSE 0 END)" for rating in RATINGS)
+    cur.execute(f"SELECT class_id, COUNT(*), SUM(rating), {histogram} FROM class_reviews GROUP BY class_id FOR UPDATE")
+    totals = cur.fetchall()
+    
+    reset = ", ".join(f"{column} = 0" for column in RATING_HISTOGRAM_COLUMNS)
+    cur.execute(f"UPDATE class SET review_count = 0, rating_sum = 0, {reset}")
+    assign = ", ".join(f"{column} = %s" for column in RATING_HISTOGRAM_COLUMNS)
+    query = f"UPDATE class SET review_count = %s, rating_sum = %s, {assign} WHERE id = %s"
+    for start in range(0, len(totals), BATCH_SIZE):
+      cur.executemany(query, [(*row[1:], row[0]) for row in totals[start:start + BATCH_SIZE]])
+    resource_versions.bump(cur, resource_versions.CLASS_CATALOG)
+    conn.commit()
+    return len(totals)
+  except Exception:
+    conn.rollback()
+    raise
+  finally:
+    cur.close()
+    conn.close()
+
+
+if __name__ == '__main__':
+  print(f"{rebuild()} classes with reviews rebuilt")
@@ -0,0 +1,36 @@
+import os
+from control import runtime
+
+#gunicorn 실행 설정 (Procfile: gunicorn -c gunicorn.conf.py main:app)
+#DB/카카오페이 응답을 기다리는 동안 워커 전체가 멈추지 않도록 기본은 gthread 워커
+#WORKER_MODE=gevent 이면 gevent 워커가 socket/ssl/threading 을 monkey patch 하므로
+#순수 파이썬 드라이버인 pymysql 과 requests(urllib3) 가 그대로 협력적으로 동작한다
+
+worker_class = runtime.worker_mode()
+#워커 프로세스가 같은 값으로 풀 크기를 계산하도록 환경변수로 전달
+workers = int(os.environ.setdefault('WEB_CONCURRENCY', str(runtime.default_worker_count(worker_class))))
+#sync 워커에 threads > 1 을 주면 gunicorn 이 gthread 로 바꾸므로 gthread 일 때만 지정
+threads = runtime.worker_threads() if worker_class == 'gthread' else 1
+worker_connections = runtime.worker_connections()
+
+#워커 수가 DB 커넥션 한도를 넘으면 기동 단계에서 실패
+db_pool_size = runtime.db_pool_size()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+  server.log.info('worker_class=%s workers=%s concurrency=%s db_pool_per_worker=%s',
+                  worker_class, workers, runtime.worker_concurrency(worker_class), db_pool_size)
+
+
+#gevent 패치가 적용되지 않은 상태로 뜨면 DB/HTTP 호출이 워커 전체를 막으므로 경고
+def post_worker_init(worker):
+  if worker_class != 'gevent':
+    return
+  from gevent import monkey
+  if not monkey.is_module_patched('socket'):
+    worker.log.warning('gevent worker started without a patched socket module; blocking I/O will stall the worker')
@@ -1,26 +1,35 @@
 from flask import Flask, redirect, url_for
 from flask_login import LoginManager
 from flask_cors import CORS, cross_origin
-from db_model.mysql import conn_mysqldb
 from control.user_mgmt import User 
+from control.user_cache import get_user_by_id
 from dotenv import load_dotenv
 import os 
 from flask_jwt_extended import JWTManager
 import logging
-from flask_session import Session
-
-logging.basicConfig(filename='app.log', level=logging.DEBUG)
+from control.session_backend import create_session_interface
+from control.logging_setup import configure_logging
+from control.json_encoder import FastJSONProvider
+from db_model.mysql import configure_pool_errors
 
 # .env.local 파일 로드
 load_dotenv('.env.local')
 
 app = Flask(__name__)
+#orjson 기반 JSON 직렬화 (jsonify 와 같은 형식)
+app.json = FastJSONProvider(app)
 CORS(app, resources={r"/*": {"origins": "https://onedayclassbackend-production.up.railway.app"}})
 app.secret_key= os.getenv('SECRET_KEY')
 
-#세션 관련 설정 
-app.config["SESSION_TYPE"] = "filesystem"
-Session(app)
+#JSON 구조화 로그 (LOG_LEVEL 기본 INFO, 큐를 통해 백그라운드 스레드에서 기록)
+configure_logging(app)
+logger = logging.getLogger(__name__)
+
+#DB 커넥션을 DB_CHECKOUT_TIMEOUT 안에 얻지 못한 요청은 503
+configure_pool_errors(app)
+
+#세션 관련 설정 (cookie | memory | sql, 공유 디스크 없이 수평 확장 가능하도록 기본값은 서명된 쿠키)
+app.session_interface = create_session_interface(os.getenv('SESSION_BACKEND', 'cookie'))
 
 
 #jwtManager 초기화 
@@ -37,20 +46,15 @@ login_manager.init_app(app)
 #사용자 로그인 (login_user 함수 호출 시 자동으로 호출)
 @login_manager.user_loader
 def load_user(user_id):
-  #user_id를 기반으로 사용자 정보 가져오기 
-  conn, cur = conn_mysqldb()
+  #user_id를 기반으로 사용자 정보 가져오기 (user 캐시 우선)
   try: 
-    cur.execute("SELECT * FROM user_info WHERE user_id = %s", (user_id,))
-    user_data = cur.fetchone()
+    user_data = get_user_by_id(user_id)
     if user_data:
       return User(user_data['id'], user_data['email'], user_data['name'], user_data['role'], user_data['address'])
     
-  except Exception as e:
-    print(f"Error fetching user: {e}")
+  except Exception:
+    logger.exception("Error fetching user")
     return None 
-  finally:
-    cur.close()
-    conn.close()
     
 @app.route('/api/print')
 @cross_origin()
@@ -66,6 +70,8 @@ from routes.class_booking import class_booking_blueprint
 from routes.user_info import user_info_blueprint
 from routes.instructor import instructor_blueprint
 from routes.review import review_blueprint
+from routes.metrics import metrics_blueprint
+from routes.deletion_jobs import deletion_jobs_blueprint
 #블루프린트 등록 
 app.register_blueprint(login_blueprint)
 app.register_blueprint(signup_blueprint)
@@ -75,6 +81,16 @@ app.register_blueprint(class_booking_blueprint)
 app.register_blueprint(user_info_blueprint)
 app.register_blueprint(instructor_blueprint)
 app.register_blueprint(review_blueprint)
+app.register_blueprint(metrics_blueprint)
+app.register_blueprint(deletion_jobs_blueprint)
+
+#클래스 좌표 인덱스를 시작할 때 구성하고, 이후 재구성은 백그라운드 스레드에서 (요청 스레드에서 전체 조회하지 않음)
+from control.spatial_index import class_locations
+class_locations.start_rebuilder()
+
+#재시도 대기 중이거나 멈춘 결제 승인 작업을 주기적으로 다시 실행 (워커마다 하나)
+from control.payment_approval import start_poller
+start_poller()
 
 if __name__ == '__main__':
   app.run(port=5000)
\ No newline at end of file
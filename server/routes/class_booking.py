@@ -1,99 +1,74 @@
 from flask import Blueprint, jsonify, request
 from db_model.mysql import conn_mysqldb
+from db_model import queries
+from control.projection import BOOKING
+from control.pagination import parse_limit, decode_datetime_cursor, encode_datetime_cursor, split_page
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import traceback
+import logging
 from flask_cors import cross_origin
-from dotenv import load_dotenv
-import os
-import requests
+from control.kakaopay import kakaopay, KakaoPayError, KAKAOPAY_CID
+from control import booking_engine, payment_approval
+from control.resource_versions import CLASS_CATALOG, class_dates_key, conditional_get, with_etag
 
 
 
 class_booking_blueprint = Blueprint('class_booking', __name__)
+logger = logging.getLogger(__name__)
 
-load_dotenv('.env.local')
-KAKAOPAY_ADMIN_KEY = os.getenv('KAKAOPAY_ADMINKEY')
+BOOKING_STATUSES = ('pending', 'confirmed', 'cancelled')
 
 
-#사용자가 특정 예약날짜를 예약했는지 확인하는 함수 
-def check_user_booking(cur, student_id, class_date_id):
-    try:
-        cur.execute('''
-            SELECT status FROM class_booking
-            WHERE student_id = %s AND class_date_id = %s
-            ''', (student_id, class_date_id))
-        booking_result = cur.fetchone()
-        return booking_result['status'] if booking_result else None
-    except Exception as e:
-        print(e)
-        raise e
+#특정 클래스에 대한 사용자의 예약 상태를 {class_date_id: status} 로 한 번에 조회
+def get_user_booking_statuses(cur, student_id, class_id):
+  cur.execute(queries.BOOKING_STATUSES_FOR_CLASS, (student_id, class_id))
+  return {row['class_date_id']: row['status'] for row in cur.fetchall()}
 
-  
 #특정 클래스의 모든 예약날짜 데이터 조회 
 def get_class_dates_info(cur, class_id, student_id=None):
   try:
-    #class_dates 테이블에서 특정 class_id에 대한 모든 class_dates와 해당 예약 수를 가져옴
-    cur.execute('''
-            SELECT cd.id, cd.class_date, cd.capacity, c.class_name as class_name,
-            COUNT(case when cb.status <> 'cancelled' then 1 else null end) as booking_count
-            FROM class_dates cd
-            LEFT JOIN class_booking cb ON cd.id = cb.class_date_id AND cb.status <> 'cancelled'
-            JOIN class c ON cd.class_id = c.id  # class 테이블과 JOIN
-            WHERE cd.class_id = %s
-            GROUP BY cd.id, c.class_name
-            ''', (int(class_id)))
+    #class_dates 의 예약 인원 카운터(booked_count)를 그대로 읽음
+    cur.execute(queries.CLASS_DATES_BY_CLASS, (int(class_id),))
     
     class_dates_result = cur.fetchall()
     
+    user_statuses = get_user_booking_statuses(cur, student_id, class_id) if student_id else {}
+    
     all_class_dates = []
     
     for row in class_dates_result:    
       class_date_id = row['id']
-      class_date = row['class_date']
-      class_capacity = row['capacity']
-      booking_count = row['booking_count']
-      class_name = row['class_name']
-      
-      remaining_seats = class_capacity - booking_count
-      user_has_booked = False
-      if student_id:
-        user_has_booked = check_user_booking(cur, student_id, class_date_id) if student_id else None
       
       class_date_data = {
           'class_id': class_id,
           'class_date_id': class_date_id,
-          'class_date': class_date,
-          'class_capacity': class_capacity,
-          'remaining_seats': remaining_seats,
-          'user_has_booked': user_has_booked,
-          'class_name': class_name,
+          'class_date': row['class_date'],
+          'class_capacity': row['capacity'],
+          'remaining_seats': row['capacity'] - row['booked_count'],
+          'user_has_booked': user_statuses.get(class_date_id) if student_id else False,
+          'class_name': row['class_name'],
       } 
       all_class_dates.append(class_date_data)
     return all_class_dates
   except Exception as e:
-    print(e)
+    logger.exception("get_class_dates_info failed")
     raise
 
 #class_date_id로 class 정보 얻어오기
 def get_class_info_by_date_id(class_date_id):
+  conn, cur = conn_mysqldb()
   try:
-      conn, cur = conn_mysqldb()
-      cur.execute("""
-          SELECT * FROM class_dates WHERE id = %s
-      """, (class_date_id,))
+      cur.execute(queries.CLASS_DATES_BY_ID, (class_date_id,))
       class_date_info = cur.fetchone()
       
       if class_date_info:
           class_id = class_date_info['class_id']
           # class 테이블에서 클래스의 상세 정보를 조회
-          cur.execute("""
-              SELECT * FROM class WHERE id = %s
-          """, (class_id,))
+          cur.execute(queries.CLASS_BY_ID, (class_id,))
           class_info = cur.fetchone()
           return class_info
       return None
   except Exception as e:
-      print(e)
+      logger.exception("get_class_info_by_date_id failed")
       raise
   finally:
       cur.close()
@@ -103,10 +78,7 @@ def get_class_info_by_date_id(class_date_id):
 def create_payment_record(user_id, class_date_id, amount):
   conn, cur = conn_mysqldb()
   try:
-    cur.execute("""
-            INSERT INTO payment (user_id, class_date_id, amount, status)
-            VALUES (%s, %s, %s, 'pending')
-        """, (user_id, class_date_id, amount))
+    cur.execute(queries.PAYMENT_INSERT, (user_id, class_date_id, amount))
     payment_id = cur.lastrowid
     conn.commit()
     return payment_id
@@ -117,42 +89,11 @@ def create_payment_record(user_id, class_date_id, amount):
       cur.close()
       conn.close()
       
-#결제 성공 후 데이터처리 
-def updated_booking_and_payment_status(class_date_id, payment_id):
-  conn, cur = conn_mysqldb()
-  try:
-    # class_booking 테이블 업데이트
-      cur.execute("""
-          UPDATE class_booking
-          SET status = 'confirmed'
-          WHERE class_date_id = %s
-      """, (class_date_id,))
-
-      # payment 테이블 업데이트
-      cur.execute("""
-          UPDATE payment
-          SET status = 'completed'
-          WHERE id = %s
-      """, (payment_id,))
-
-      conn.commit()
-  except Exception as e:
-      conn.rollback()
-      raise e
-  finally:
-      cur.close()
-      conn.close()
-      
 #tid 저장 
 def save_tid(payment_id, tid):
   conn, cur = conn_mysqldb()
   try:
-    conn, cur = conn_mysqldb()
-    cur.execute("""
-        UPDATE payment
-        SET tid = %s
-        WHERE id = %s
-    """, (tid, payment_id))
+    cur.execute(queries.PAYMENT_SAVE_TID, (tid, payment_id))
     conn.commit()
   except Exception as e:
       conn.rollback()
@@ -161,100 +102,64 @@ def save_tid(payment_id, tid):
       cur.close()
       conn.close()
       
-#tid 조회 
-def gett_tid_by_payment_id(payment_id):
-  conn, cur = conn_mysqldb()
-  try:
-    cur.execute("""
-        SELECT tid
-        FROM payment
-        WHERE id = %s
-    """, (payment_id,))
-    result = cur.fetchone()
-    return result['tid'] if result else None
-  except Exception as e:
-      print(e)
-      return None
-  finally:
-      cur.close()
-      conn.close()
-    
-
 #특정 클래스의 모든 예약날짜 가져오기
+#예약/취소/결제/시간대 등록 시 버전이 바뀌며, 바뀌지 않았으면 304 (잔여 좌석 폴링용)
 @class_booking_blueprint.route('/api/class_dates/<class_id>', methods=['GET'])
 def get_class_dates(class_id):
   conn, cur = conn_mysqldb()
   try:
     student_id = request.args.get('student_id')
     
+    etag, unchanged = conditional_get(cur, class_dates_key(class_id), CLASS_CATALOG)
+    if unchanged:
+      return unchanged
+    
     class_dates = get_class_dates_info(cur, class_id, student_id)
-    return jsonify({'status': 'success', 'all_class_dates': class_dates})    
+    return with_etag(jsonify({'status': 'success', 'all_class_dates': class_dates}), etag)
     
   except Exception as e:
-    traceback.print_exc()
+    logger.exception("get_class_dates failed")
     return jsonify({'status': 'error', 'message': str(e)})
   finally:
     cur.close()
     conn.close()
 
   
-#특정 유저가 예약한 예약정보 모두 가져오기
+#특정 유저가 예약한 예약정보 가져오기 (수업 날짜 최신순)
+#선택적 파라미터: before=<class_date,id>, limit=, status=confirmed,pending
+#limit 또는 before 를 넘긴 경우에만 키셋 페이지네이션 (없으면 기존처럼 전체 반환, next 는 null)
 @class_booking_blueprint.route('/api/class/<user_id>/booking', methods=['GET'])
 @jwt_required()
 def get_class(user_id):
-  conn, cur = conn_mysqldb()
+  conn, cur = conn_mysqldb(tuples=True)
   
   try:
-    # 해당 유저의 모든 클래스 예약 정보 조회
-    cur.execute(
-        "SELECT * FROM class_booking WHERE student_id = %s",
-        (user_id,)
-    )
-      
-    bookings = cur.fetchall()
+    paged = 'limit' in request.args or 'before' in request.args
+    limit = parse_limit(request.args.get('limit')) if paged else None
+    cursor = decode_datetime_cursor(request.args.get('before'))
+    statuses = [status for status in request.args.get('status', '').split(',') if status]
+    if any(status not in BOOKING_STATUSES for status in statuses):
+      return jsonify({"status": "error", "message": "Invalid status filter"})
     
-    detailed_bookings = []
-    for booking in bookings:
-      #각 예약에 대한 클래스 정보 조회
-      cur.execute(
-                "SELECT class_name, description FROM class WHERE id = %s",
-                (booking['class_id'],)
-            )
-      class_info = cur.fetchone() 
-      #각 예약에 대한 클래스 날짜 정보 조회 
-      cur.execute(
-                "SELECT class_date FROM class_dates WHERE id = %s",
-                (booking['class_date_id'],)
-            )
-      class_date_info = cur.fetchone()
-      
-      #각 예약에 대한 리뷰 정보 조회 
-      cur.execute(
-        "SELECT * FROM class_reviews WHERE class_date_id = %s AND user_id = %s",
-        (booking['class_date_id'], user_id)
-      )
-      review_info = cur.fetchone()
-      
-      #필요한 정보 합치기 
-      detailed_booking = {
-        'id': booking['id'],
-        'student_id': booking['student_id'],
-        'class_id': booking['class_id'],
-        'class_date_id': booking['class_date_id'],
-        'status': booking['status'],
-        'class_name': class_info['class_name'],
-        'class_description': class_info['description'],
-        'class_date': class_date_info['class_date'],
-        'has_reviewed': bool(review_info),
-      }
-      
-      detailed_bookings.append(detailed_booking)
+    #예약 + 클래스 + 날짜 + 리뷰 여부를 한 번의 쿼리로 조회
+    params = [user_id, *statuses]
+    if cursor:
+      params.extend([cursor[0], cursor[0], cursor[1]])
+    if paged:
+      params.append(limit + 1)
     
-    detailed_bookings.sort(key=lambda x: x['class_date'], reverse=True)
-    return jsonify({"status": "success", "data": detailed_bookings})
+    cur.execute(queries.BOOKINGS_BY_STUDENT(len(statuses), bool(cursor), paged), params)
+    rows, has_more = split_page(cur.fetchall(), limit) if paged else (cur.fetchall(), False)
+    bookings = BOOKING.rows(rows)
+    
+    next_cursor = None
+    if has_more:
+      last = bookings[-1]
+      next_cursor = encode_datetime_cursor(last['class_date'], last['id'])
+    return jsonify({"status": "success", "data": bookings, "next": next_cursor})
   
   except Exception as e:
-    traceback.print_exc()
+    logger.exception("get_class failed")
     return jsonify({"status": "error", "message": str(e)})
   
   finally:
@@ -265,25 +170,13 @@ def get_class(user_id):
 @class_booking_blueprint.route('/api/<class_date_id>/attendees', methods=['GET'])
 def get_attendees_by_class_date_id(class_date_id):
   conn, cur = conn_mysqldb()
-  query = """
-    SELECT
-      class_booking.*,
-      user_info.name,
-      user_info.email,
-      user_info.phone_number
-    FROM
-      class_booking
-    INNER JOIN user_info ON class_booking.student_id = user_info.id
-    WHERE
-      class_booking.class_date_id = %s;
-    """
   try:
-    cur.execute(query, (class_date_id,))
+    cur.execute(queries.BOOKING_ATTENDEES, (class_date_id,))
     attendees = cur.fetchall()
     return jsonify({"status": "success", "data": attendees})
   
   except Exception as e:
-    traceback.print_exc()
+    logger.exception("get_attendees_by_class_date_id failed")
     return jsonify({"status": "error", "message": str(e)})
   
   finally:
@@ -302,37 +195,20 @@ def book_class():
     student_id = get_jwt_identity()
     
     
-    #중복 예약 확인
-    booking_status = check_user_booking(cur, student_id, class_date_id)
-    if booking_status in ['confirmed', 'pending']:
-      return jsonify({'status': 'error', 'message': '이미 예약된 수업입니다.'})
-    
-    #취소된 예약이 있는 경우 상태 업데이트 
-    if booking_status == 'cancelled':
-      update_query = """
-                UPDATE class_booking
-                SET status = 'pending'
-                WHERE student_id = %s AND class_date_id = %s AND status = 'cancelled'
-            """
-      cur.execute(update_query, (student_id, class_date_id))
-    else:
-      #예약 진행 
-      query = """
-          INSERT INTO class_booking (class_id, student_id, class_date_id, status)
-          VALUES (%s, %s, %s, 'pending')
-          """
-      cur.execute(query, (class_id, student_id, class_date_id))
+    #좌석 배정 (정원 초과, 중복 예약 시 BookingError)
+    try:
+      booking_engine.reserve(conn, cur, class_id, student_id, class_date_id)
+    except booking_engine.BookingError as e:
+      return jsonify({'status': 'error', 'message': str(e)})
       
-    #각 class_dates에 대한 예약 개수 업데이트 
+    #트랜잭션 종료 후 갱신된 예약날짜 정보 조회 
     updated_class_dates_info = get_class_dates_info(cur, class_id, student_id)
     
-    conn.commit()
-    
     return jsonify({'status': 'success', 'data': updated_class_dates_info})
   
   except Exception as e:
     conn.rollback() #오류 발생 시 변경 사항 롤백
-    traceback.print_exc()
+    logger.exception("book_class failed")
     return jsonify({'status': 'error', 'message': str(e)})
   
   finally:
@@ -344,26 +220,21 @@ def book_class():
 @jwt_required()
 @cross_origin()
 def cancel_booking():
+  conn, cur = conn_mysqldb()
   try:
-    conn, cur = conn_mysqldb()
     student_id = get_jwt_identity()
     data = request.get_json()
     class_date_id = data['classDateId']
     class_id = data['classId']
         
-    query = """
-    UPDATE class_booking 
-    SET status = 'cancelled' 
-    WHERE class_date_id = %s AND student_id = %s AND status IN ('pending', 'confirmed')
-    """
-    
-    cur.execute(query, (class_date_id, student_id,))
-    if cur.rowcount == 0:
-      return jsonify({"status": "error", "message": "Booking not found or already cancelled"})
+    #예약 취소 후 좌석 반납 
+    try:
+      booking_engine.cancel(conn, cur, student_id, class_date_id)
+    except booking_engine.BookingError as e:
+      return jsonify({"status": "error", "message": str(e)})
     
-     #각 class_dates에 대한 예약 개수 업데이트 
+    #트랜잭션 종료 후 갱신된 예약날짜 정보 조회 
     updated_class_dates_info = get_class_dates_info(cur, class_id, student_id)
-    conn.commit()
     return jsonify({"status": "success", "data": updated_class_dates_info})
   
   except Exception as e:
@@ -394,13 +265,8 @@ def payment(class_date_id):
     return jsonify({'status': 'error', 'message': str(e)})
   
   #카카오페이 결제 준비 요청
-  headers = {
-        "Authorization": f"KakaoAK {KAKAOPAY_ADMIN_KEY}",
-        "Content-type": "application/x-www-form-urlencoded;charset=utf-8"
-    }
-  
   params = {
-      "cid": "TC0ONETIME",  # 테스트용 CID
+      "cid": KAKAOPAY_CID,  # 테스트용 CID
       "partner_order_id": payment_id,  # 가맹점 주문번호
       "partner_user_id": user_id,  # 가맹점 회원 ID
       "item_name": item_name,  # 상품명
@@ -412,26 +278,27 @@ def payment(class_date_id):
       "fail_url": f"http://localhost:3000/payment/{class_date_id}"  # 결제 실패 시 리다이렉트 URL
   }
   
-  response = requests.post("https://kapi.kakao.com/v1/payment/ready", headers=headers, data=params)
-  response_data = response.json()
-  
-  if response.status_code == 200:
-    tid = response_data.get("tid")
-    try:
-      save_tid(payment_id, tid)
-    except Exception as e:
-       return jsonify({'status': 'error', 'message': str(e)})
-    
-    responseData = {
-      "next_redirect_pc_url": response_data.get("next_redirect_pc_url"),
-      "paymentId": payment_id,
-    }
-    return jsonify({"status": "success", "data": responseData})
-  else:
-    traceback.print_exc()
+  try:
+    response_data = kakaopay.ready(params)
+  except KakaoPayError:
+    logger.exception("payment failed")
     return jsonify({"status": "error", "message": "Failed to prepare payment"})
+  
+  tid = response_data.get("tid")
+  try:
+    save_tid(payment_id, tid)
+  except Exception as e:
+     return jsonify({'status': 'error', 'message': str(e)})
+  
+  responseData = {
+    "next_redirect_pc_url": response_data.get("next_redirect_pc_url"),
+    "paymentId": payment_id,
+  }
+  return jsonify({"status": "success", "data": responseData})
 
 #클래스 결제 성공 
+#승인 작업만 기록하고 바로 응답 (같은 paymentId 로 다시 요청해도 작업은 하나)
+#승인 결과는 GET /api/payment/<paymentId>/status 로 조회
 @class_booking_blueprint.route('/api/<class_date_id>/payment/success', methods=['POST'])
 @jwt_required()
 @cross_origin()
@@ -440,35 +307,47 @@ def payment_success(class_date_id):
   pg_token = data.get('pg_token')
   payment_id = data.get('paymentId')
   user_id = get_jwt_identity()
-  tid = gett_tid_by_payment_id(payment_id)
   
-  if not tid or not pg_token or not payment_id:
+  if not pg_token or not payment_id:
     return  jsonify({"status": "error", "message": "Required payment information is missing or invalid"})
 
-  headers = {
-        "Authorization": f"KakaoAK {KAKAOPAY_ADMIN_KEY}",
-        "Content-type": "application/x-www-form-urlencoded;charset=utf-8"
-    }
-  data = {
-        "cid": "TC0ONETIME",  # 테스트용 CID
-        "tid": tid,          # 거래 ID
-        "partner_order_id": payment_id,  # 가맹점 주문번호
-        "partner_user_id": user_id,  # 가맹점 회원 ID
-        "pg_token": pg_token # pg_token
-    }
-  response = requests.post("https://kapi.kakao.com/v1/payment/approve", headers=headers, data=data)
-  payment_info = response.json()
-  if response.status_code == 200:
-    updated_booking_and_payment_status(class_date_id, payment_id)
-    return jsonify({"status": "success"})
-  
-  else:
-    traceback.print_exc()
-    return ({"status": "error", "message": "Payment failed"})
-  
+  conn, cur = conn_mysqldb()
+  try:
+    job = payment_approval.enqueue(cur, payment_id, user_id, class_date_id, pg_token)
+  except payment_approval.ApprovalError as e:
+    return jsonify({"status": "error", "message": str(e)})
+  except Exception as e:
+    logger.exception("payment_success failed")
+    return jsonify({"status": "error", "message": str(e)})
+  finally:
+    cur.close()
+    conn.close()
   
+  if job['status'] == 'pending':
+    payment_approval.submit(job['payment_id'])
+  return jsonify({"status": "success", "data": {"paymentId": job['payment_id'], "state": job['status']}})
 
+#결제 승인 상태 조회 (결제한 사용자만)
+#state: pending | running | done | failed
+@class_booking_blueprint.route('/api/payment/<payment_id>/status', methods=['GET'])
+@jwt_required()
+@cross_origin()
+def payment_status(payment_id):
+  conn, cur = conn_mysqldb()
+  try:
+    job = payment_approval.get_job(cur, payment_id)
+    if job is None or str(job['user_id']) != str(get_jwt_identity()):
+      return jsonify({"status": "error", "message": "Payment not found"})
     
-      
-      
-    
\ No newline at end of file
+    return jsonify({"status": "success", "data": {
+      "paymentId": job['payment_id'],
+      "state": job['status'],
+      "attempts": job['attempts'],
+      "error": job['error'],
+      "updatedAt": job['updated_at'],
+    }})
+  except Exception as e:
+    return jsonify({"status": "error", "message": str(e)})
+  finally:
+    cur.close()
+    conn.close()
@@ -1,59 +1,74 @@
 from flask import Blueprint, jsonify, request
 from db_model.mysql import conn_mysqldb
+from db_model import queries
 from flask_cors import cross_origin
 import json
-import traceback
+import logging
+from control.pagination import parse_limit
+from control.region import normalize_city, district_condition
+from control.spatial_index import class_locations
+from control.projection import CLASS_SUMMARY, CLASS_ADDRESS
+from control import ratings
+from control.streaming import wants_stream, id_list_response
+from control.class_cache import class_detail_cache, class_additional_cache, cache_entry, cached_response, cache_stats
+from control.resource_versions import CLASS_CATALOG, conditional_get, with_etag
 
 
 class_info_blueprint = Blueprint('class_info', __name__)
+logger = logging.getLogger(__name__)
+
+NEARBY_DEFAULT_LIMIT = 100
+NEARBY_MAX_LIMIT = 500
 
 def get_class_data_by_id(class_id):
     conn, cur = conn_mysqldb()
     try:
-        cur.execute(
-            'SELECT class_name, description, location, cost, target_student, content, curriculum, latitude, longitude FROM class WHERE id = %s', (int(class_id),)
-        )
+        cur.execute(queries.CLASS_DETAIL, (int(class_id),))
         return cur.fetchone()
     finally:
         cur.close()
         conn.close()
 
 #get_class_addresses API 
+#선택적 파라미터: limit=, after=<class_id> (키셋 페이지), stream=1 (전체 목록 스트리밍)
 @class_info_blueprint.route('/api/class_addresses', methods=["GET"])
 def get_class_addresses():
+  stream = wants_stream(request.args)
+  #db 연결 
+  conn, cur = conn_mysqldb(unbuffered=stream, tuples=True)
+  streaming = False
   try:
-    #db 연결 
-    conn, cur = conn_mysqldb()
+    #클래스가 바뀌지 않았으면 304
+    etag, unchanged = conditional_get(cur, CLASS_CATALOG)
+    if unchanged:
+      return unchanged
     
     #class 테이블에서 주소(location), id 컬럼 값 조회
-    cur.execute('SELECT id, location FROM class')
-    #class 테이블에서 class_id 값 조회 
-    
-    addresses = []
-    for row in cur.fetchall():
-      address = {
-        'class_id': row['id'],
-        'location': row['location']
-      }
-      addresses.append(address)
-      
-    return jsonify({'status': 'success', 'data':addresses})
+    response, streaming = id_list_response(conn, cur, CLASS_ADDRESS, 'class', [], [])
+    return with_etag(response, etag)
   except Exception as e:
     return jsonify({'status': 'error', 'message': str(e)})
   
   finally:
-    cur.close()
-    conn.close()
-  
+    #스트리밍 응답은 전송이 끝난 뒤 커넥션을 반납
+    if not streaming:
+      cur.close()
+      conn.close()
+
 #추가적인 수업 정보 API
 @class_info_blueprint.route('/api/class_additional_data/<class_id>', methods=['GET'])
 def get_class_additional_data(class_id):
+  conn, cur = None, None
   try:
+    cached = class_additional_cache.get(int(class_id))
+    if cached is not None:
+      return cached_response(cached)
+    
     #db연결 
     conn, cur = conn_mysqldb()
     
     #class_id를 사용하여 클래스의 추가 정보 조회 
-    cur.execute('SELECT id, class_name, cost, description FROM class WHERE id = %s', (int(class_id)))
+    cur.execute(queries.CLASS_ADDITIONAL, (int(class_id),))
     classData = cur.fetchone()
     
     if classData:
@@ -63,7 +78,9 @@ def get_class_additional_data(class_id):
         'class_description': classData['description'],
         'cost': classData['cost'],
       }
-      return jsonify({'status': 'success','data': class_additional_data})
+      cached = cache_entry(class_additional_data, {'status': 'success','data': class_additional_data})
+      class_additional_cache.set(int(class_id), cached)
+      return cached_response(cached)
     else:
       return jsonify({'status': 'error','message': 'Class not found'})
     
@@ -71,13 +88,20 @@ def get_class_additional_data(class_id):
     return jsonify({'status': 'error','message': str(e)})
   
   finally:
-    cur.close()
-    conn.close()
+    if cur:
+      cur.close()
+    if conn:
+      conn.close()
   
   
 #class_detail page에 필요한 데이터 조회 API 
+#curriculum, target_student 는 캐시에 디코딩된 상태로 저장
 @class_info_blueprint.route('/api/get_class_detail/<class_id>', methods=["GET"])
 def get_class_detail(class_id):
+    cached = class_detail_cache.get(int(class_id))
+    if cached is not None:
+      return cached_response(cached)
+    
     classData = get_class_data_by_id(class_id)
     
     if classData:
@@ -90,113 +114,98 @@ def get_class_detail(class_id):
         'content': classData['content'],
         'curriculums': json.loads(classData['curriculum']),
         'latitude': classData['latitude'],
-        'longitude': classData['longitude']
+        'longitude': classData['longitude'],
+        **ratings.summary(classData)
       }
-      return jsonify({'status': 'success', 'data': class_additional_data})
+      cached = cache_entry(class_additional_data, {'status': 'success', 'data': class_additional_data})
+      class_detail_cache.set(int(class_id), cached)
+      return cached_response(cached)
     else:
       return jsonify({'status': 'error', 'message': 'Class not found'})
 
+#클래스 상세 캐시 적중률 조회 
+@class_info_blueprint.route('/api/class_cache/stats', methods=['GET'])
+def get_class_cache_stats():
+  return jsonify({'status': 'success', 'data': cache_stats()})
 
     
 #class_list에 필요한 모든 class 조회 
+#선택적 파라미터: city, district, limit=, after=<class_id> (키셋 페이지), stream=1 (전체 목록 스트리밍)
 @class_info_blueprint.route('/api/class_list', methods=['GET'])
 @cross_origin()
 def get_class_list():
   city = request.args.get('city')
   district = request.args.get('district')
   
-  conn, cur = conn_mysqldb()
+  stream = wants_stream(request.args)
+  conn, cur = conn_mysqldb(unbuffered=stream, tuples=True)
+  streaming = False
   
-  base_query = 'SELECT class_name, description, location, cost, id FROM class'
   conditions = []
   query_parameters = []
   
+  #등록/수정 시 location 에서 분리해 둔 city, district 컬럼으로 조회 (인덱스 사용)
   if city:
-    conditions.append("location LIKE %s")
-    query_parameters.append(f"%{city}%")
+    conditions.append("city = %s")
+    query_parameters.append(normalize_city(city))
   if district:
-    conditions.append("location LIKE %s")
-    query_parameters.append(f"%{district}%")
-    
-  if conditions:
-    base_query += " WHERE " + " AND ".join(conditions)
-    
+    condition, params = district_condition(district)
+    conditions.append(condition)
+    query_parameters.extend(params)
     
   try:
-    cur.execute(base_query, tuple(query_parameters))
-    classes = cur.fetchall()
+    #클래스가 바뀌지 않았으면 304 (필터는 쿼리스트링으로 ETag 에 포함)
+    etag, unchanged = conditional_get(cur, CLASS_CATALOG)
+    if unchanged:
+      return unchanged
     
     #class_name을 className으로 변환 후 응답 
-    modified_classes = []
-    for class_data in classes:
-      modified_data = {
-        "classId": class_data["id"],
-        "className": class_data["class_name"],
-        "description": class_data["description"],
-        "location": class_data["location"],
-        "cost": class_data["cost"]
-      }
-      modified_classes.append(modified_data)
-    
-    return jsonify({'status': 'success', 'data': modified_classes})
+    response, streaming = id_list_response(conn, cur, CLASS_SUMMARY, 'class', conditions, query_parameters)
+    return with_etag(response, etag)
   
   except Exception as e:
     return jsonify({'status': 'error', 'message': str(e)})
     
   finally:
-    cur.close()
-    conn.close()
+    if not streaming:
+      cur.close()
+      conn.close()
     
-# 주변 class 조회 
+# 주변 class 조회 (메모리 격자 인덱스 사용, 가까운 순 정렬)
+# 사각 범위: minLat, maxLat, minLng, maxLng (기준점은 범위의 중심)
+# 중심 + 반경: lat, lng, radius(m)
+# 선택적 파라미터: limit
 @class_info_blueprint.route('/api/nearby_class_list', methods=['GET'])
 @cross_origin()
 def get_nearby_class_list():
-  minLat = request.args.get('minLat')
-  maxLat = request.args.get('maxLat')
-  minLng = request.args.get('minLng')
-  maxLng = request.args.get('maxLng')
-  
-  conn, cur = conn_mysqldb()
-  
-  # 위도와 경도 값을 바탕으로 DB에서 조회
-  query = """
-  SELECT class_name, description, location, cost, id 
-  FROM class
-  WHERE latitude BETWEEN %s AND %s AND longitude BETWEEN %s AND %s
-  """
-  
   try:
-    cur.execute(query, (minLat, maxLat, minLng, maxLng))
-    classes = cur.fetchall()
-    
-     # class_name을 className으로 변환 후 응답 
-    modified_classes = []
-    for class_data in classes:
-        modified_data = {
-            "classId": class_data["id"],
-            "className": class_data["class_name"],
-            "description": class_data["description"],
-            "location": class_data["location"],
-            "cost": class_data["cost"]
-        }
-        modified_classes.append(modified_data)
-    
-    return jsonify({'status': 'success', 'data': modified_classes})
+    limit = parse_limit(request.args.get('limit'), default=NEARBY_DEFAULT_LIMIT, maximum=NEARBY_MAX_LIMIT)
+    
+    if request.args.get('radius') is not None:
+      lat = float(request.args['lat'])
+      lng = float(request.args['lng'])
+      radius = float(request.args['radius'])
+      classes = class_locations.within_radius(lat, lng, radius, limit)
+    else:
+      minLat = float(request.args['minLat'])
+      maxLat = float(request.args['maxLat'])
+      minLng = float(request.args['minLng'])
+      maxLng = float(request.args['maxLng'])
+      center = ((minLat + maxLat) / 2, (minLng + maxLng) / 2)
+      classes = class_locations.within_bbox(minLat, maxLat, minLng, maxLng, center, limit)
+    
+    return jsonify({'status': 'success', 'data': classes})
   
   except Exception as e:
       return jsonify({'status': 'error', 'message': str(e)})
     
-  finally:
-    cur.close()
-    conn.close()
-    
 #class_date_id 로 예약날짜 조회 
 @class_info_blueprint.route('/api/<class_date_id>/dates', methods=['GET'])
 @cross_origin()
 def get_class_date_by_class_date_id(class_date_id):
   conn, cur = conn_mysqldb()
   try:
-    cur.execute("SELECT class_date FROM class_dates WHERE id = %s", (class_date_id,))
+    cur.execute(queries.CLASS_DATE_BY_ID, (class_date_id,))
     class_date = cur.fetchone()
     
     #조회된 데이터가 없을 경우 
@@ -206,7 +215,7 @@ def get_class_date_by_class_date_id(class_date_id):
     return jsonify({"status": "success", "data": class_date})
   
   except Exception as e:
-    traceback.print_exc()
+    logger.exception("get_class_date_by_class_date_id failed")
     return jsonify({"status": "error", "message": str(e)})
   
   finally:
@@ -219,7 +228,7 @@ def get_class_date_by_class_date_id(class_date_id):
 def get_class_id_by_class_date_id(class_date_id):
   conn, cur = conn_mysqldb()
   try:
-    cur.execute("SELECT class_id FROM class_dates WHERE id = %s", (class_date_id,))
+    cur.execute(queries.CLASS_DATE_CLASS_ID, (class_date_id,))
     class_id = cur.fetchone()
     
     #조회된 데이터가 없을 경우 
@@ -229,7 +238,7 @@ def get_class_id_by_class_date_id(class_date_id):
     return jsonify({"status": "success", "data": class_id})
   
   except Exception as e:
-    traceback.print_exc()
+    logger.exception("get_class_id_by_class_date_id failed")
     return jsonify({"status": "error", "message": str(e)})
   
   finally:
@@ -1,9 +1,13 @@
 from flask import request, Blueprint, jsonify
 from flask_cors import cross_origin
-from db_model.mysql import conn_mysqldb
-from datetime import datetime 
+from db_model.mysql import conn_mysqldb, is_duplicate_key
+from db_model import queries
 import json
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from control.class_events import class_saved
+from control import resource_versions
+from control.region import split_region
+from control.schedule import ScheduleError, requested_dates, format_datetime, parse_datetime, parse_capacity
 
 register_class_blueprint = Blueprint('register_class', __name__)
 
@@ -41,11 +45,11 @@ def classRegistration():
       error_msg = "Please fill in all required fields."
       return jsonify({'status': 'error', 'message': error_msg})
     
-    #db 연결 
-    conn, cur = conn_mysqldb()
     #데이터베이스 저장 
-    cur.execute("INSERT INTO class (class_name, description, location, instructor_id, cost, latitude, longitude, target_student, curriculum, content) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", (class_name, description, location, instructor_id, cost, latitude, longitude, json.dumps(target_student), json.dumps(curriculum), content))
+    city, district = split_region(location)
+    cur.execute(queries.CLASS_INSERT, (class_name, description, location, instructor_id, cost, latitude, longitude, json.dumps(target_student), json.dumps(curriculum), content, city, district))
     conn.commit()
+    class_saved(cur.lastrowid, cur)
     
     return jsonify({'status': 'success'})
   
@@ -62,14 +66,7 @@ def classRegistration():
 @cross_origin()
 @jwt_required() #토큰이 필요한 경우에만 요청을 처리
 def add_class_date(class_id):
-  data = request.get_json()
-  class_date_str = data['classDateTime']
-  capacity = data['capacity']
-  
-  #날짜와 시간 문자열을 datetime 객체로 변환 
-  class_date = datetime.strptime(class_date_str, "%Y-%m-%dT%H:%M")
-  #00초로 설정 (안할 시 오류남)
-  class_date = class_date.replace(second=0)
+  data = request.get_json() or {}
   
   #토큰에서 사용자 정보 조회 (식별자로 저장된 user_id값을 추출 )
   user_id = get_jwt_identity()
@@ -79,23 +76,98 @@ def add_class_date(class_id):
   if user_role != 'instructor':
     return jsonify({'status': 'error', 'message': 'Unauthorized access'})
   
-  conn, cur = conn_mysqldb()
+  #날짜와 시간 문자열을 datetime 객체로 변환 (00초), 정원은 1 이상의 정수
+  try:
+    class_date = parse_datetime(data['classDateTime'])
+    capacity = parse_capacity(data['capacity'])
+  except (KeyError, ScheduleError) as e:
+    return jsonify({'status': 'error', 'message': str(e) if isinstance(e, ScheduleError) else 'Invalid data'})
   
-  #중복 등록 방지 
-  cur.execute(
-    "SELECT * FROM class_dates WHERE class_id = %s AND class_date = %s", (class_id, class_date)
-  )
-  if cur.fetchone()is not None:
-    return jsonify({'status': 'error', 'message': 'The class time already exists'})
+  conn, cur = conn_mysqldb()
   
   try:
-    cur.execute(
-       "INSERT INTO class_dates (class_id, class_date, capacity) VALUES (%s, %s, %s)",(class_id, class_date, capacity)
-    )
+    conn.begin()
+    #본인 클래스인지 확인하면서 클래스 행을 잠금 (일괄 등록 API 와 같은 순서)
+    cur.execute(queries.CLASS_LOCK_OWNED, (class_id, user_id))
+    if cur.fetchone() is None:
+      conn.rollback()
+      return jsonify({'status': 'error', 'message': 'No class found or you do not have permission.'})
+    
+    #중복 등록 방지 ((class_id, class_date) 유니크 제약 위반만 "이미 있음", 그 외 오류는 그대로)
+    try:
+      cur.execute(queries.CLASS_DATES_INSERT, (class_id, class_date, capacity))
+    except Exception as e:
+      if is_duplicate_key(e, queries.CLASS_DATES_KEY):
+        conn.rollback()
+        return jsonify({'status': 'error', 'message': 'The class time already exists'})
+      raise
+    resource_versions.bump(cur, resource_versions.class_dates_key(class_id))
     conn.commit()
     
     return jsonify({'status': 'success'})
   except Exception as e:
+    conn.rollback()
+    return jsonify({'status': 'error', 'message': str(e)})
+  finally:
+    cur.close()
+    conn.close()
+
+
+#시간대 일괄 등록 API (날짜 목록 또는 매주 반복 규칙)
+#이미 등록된 시간대는 건너뛰고, 새 시간대는 한 번의 다중 행 INSERT 로 저장 
+#응답: {'created': [...], 'skipped': [...]} ("%Y-%m-%dT%H:%M" 형식)
+@register_class_blueprint.route('/api/add_class_times/<class_id>', methods=['POST'])
+@cross_origin()
+@jwt_required() #토큰이 필요한 경우에만 요청을 처리
+def add_class_dates(class_id):
+  data = request.get_json() or {}
+  
+  user_id = get_jwt_identity()
+  user_role = get_jwt().get('role')
+  
+  #role이 강사가 아니면 접근을 막음 
+  if user_role != 'instructor':
+    return jsonify({'status': 'error', 'message': 'Unauthorized access'})
+  
+  try:
+    capacity = parse_capacity(data['capacity'])
+    dates = requested_dates(data)
+  except (KeyError, TypeError, ValueError) as e:
+    return jsonify({'status': 'error', 'message': str(e) if isinstance(e, ScheduleError) else 'Invalid data'})
+  
+  conn, cur = conn_mysqldb(tuples=True)
+  try:
+    conn.begin()
+    #본인 클래스인지 확인하면서 클래스 행을 잠가 같은 클래스의 일괄 등록이 겹치지 않게 함 
+    cur.execute(queries.CLASS_LOCK_OWNED, (class_id, user_id))
+    if cur.fetchone() is None:
+      conn.rollback()
+      return jsonify({'status': 'error', 'message': 'No class found or you do not have permission.'})
+    
+    #이미 등록된 시간대 (행마다 조회하지 않고 한 번에)
+    cur.execute(queries.CLASS_DATES_EXISTING(len(dates)), [class_id, *dates])
+    existing = {format_datetime(row[0]) for row in cur.fetchall()}
+    new_dates = [date for date in dates if format_datetime(date) not in existing]
+    
+    if new_dates:
+      #pymysql 의 executemany 는 INSERT ... VALUES 를 다중 행 문장 하나로 묶어서 실행
+      try:
+        cur.executemany(queries.CLASS_DATES_INSERT, [(class_id, date, capacity) for date in new_dates])
+      except Exception as e:
+        #그 사이 같은 시간대가 들어온 경우 (유니크 제약 위반만, 그 외 오류는 그대로)
+        if is_duplicate_key(e, queries.CLASS_DATES_KEY):
+          conn.rollback()
+          return jsonify({'status': 'error', 'message': 'Class times changed while registering, please retry'})
+        raise
+      resource_versions.bump(cur, resource_versions.class_dates_key(class_id))
+    conn.commit()
+    
+    return jsonify({'status': 'success', 'data': {
+      'created': [format_datetime(date) for date in new_dates],
+      'skipped': sorted(existing),
+    }})
+  except Exception as e:
+    conn.rollback()
     return jsonify({'status': 'error', 'message': str(e)})
   finally:
     cur.close()
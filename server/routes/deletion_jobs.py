@@ -0,0 +1,36 @@
+from flask import Blueprint, jsonify
+from flask_cors import cross_origin
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from db_model.mysql import conn_mysqldb
+from control import deletion
+
+deletion_jobs_blueprint = Blueprint('deletion_jobs', __name__)
+
+#백그라운드 삭제 작업 상태 조회 (삭제를 요청한 사용자만)
+#state: pending | running | done | failed
+@deletion_jobs_blueprint.route('/api/deletion_jobs/<job_id>', methods=['GET'])
+@cross_origin()
+@jwt_required()
+def get_deletion_job(job_id):
+  conn, cur = conn_mysqldb()
+  try:
+    job = deletion.get_job(cur, job_id)
+    if job is None or str(job['owner_id']) != str(get_jwt_identity()):
+      return jsonify({'status': 'error', 'message': 'Deletion job not found'})
+    
+    return jsonify({'status': 'success', 'data': {
+      'jobId': job['id'],
+      'kind': job['kind'],
+      'targetId': job['target_id'],
+      'state': job['status'],
+      'step': job['step'],
+      'deletedRows': job['deleted_rows'],
+      'error': job['error'],
+      'createdAt': job['created_at'],
+      'updatedAt': job['updated_at'],
+    }})
+  except Exception as e:
+    return jsonify({'status': 'error', 'message': str(e)})
+  finally:
+    cur.close()
+    conn.close()
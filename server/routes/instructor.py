@@ -1,71 +1,62 @@
 from flask import Blueprint, jsonify, request
 from db_model.mysql import conn_mysqldb
+from db_model import queries
 from flask_cors import cross_origin
 import json
+from control.class_events import class_saved
+from control import deletion
+from control.region import split_region
+from control.projection import CLASS_SUMMARY
+from control.streaming import wants_stream, id_list_response
 
 instructor_blueprint = Blueprint('instructor', __name__)
 
 #강사의 id로 등록된 class를 불러오는 API
+#선택적 파라미터: limit=, after=<class_id> (키셋 페이지), stream=1 (전체 목록 스트리밍)
 @instructor_blueprint.route('/api/get_classes_by_instructor', methods=["GET"])
 @cross_origin()
 def get_classes_by_instructor():
   instructor_id = request.args.get('id')
   
+  conn, cur = conn_mysqldb(unbuffered=wants_stream(request.args), tuples=True)
+  streaming = False
   try:
-    conn, cur = conn_mysqldb()
-    cur.execute(
-       "SELECT * FROM class WHERE instructor_id = %s", (int(instructor_id),)
-    )
-    classes = cur.fetchall()
-    
     #프로퍼티 명 변환 후 응답 
-    modified_classes = []
-    for class_data in classes:
-      modified_data = {
-        "classId": class_data["id"],
-        "className": class_data["class_name"],
-        "description": class_data["description"],
-        "location": class_data["location"],
-        "cost": class_data["cost"]
-      }
-      modified_classes.append(modified_data)
-    
     #Class가 없을 경우에도 에러 메시지 대신 빈 리스트를 반환 
-    return jsonify ({'status': 'success', 'data': modified_classes})
+    response, streaming = id_list_response(
+      conn, cur, CLASS_SUMMARY, 'class', ["instructor_id = %s"], [int(instructor_id)])
+    return response
   except Exception as e:
     return jsonify({'status': 'error',  'message': str(e)})
   
   finally:
-    cur.close()
-    conn.close()
+    if not streaming:
+      cur.close()
+      conn.close()
     
-#클래스 삭제 
+#클래스 삭제 (예약날짜, 예약, 결제, 리뷰, 북마크까지 청크 단위로 삭제)
+#선택적 파라미터: background=1 (백그라운드 작업으로 삭제하고 jobId 를 바로 응답)
 @instructor_blueprint.route('/api/class', methods=['DELETE'])
 def delete_class_by_instructor():
   instructor_id = request.args.get('instructor_id')
   class_id = request.args.get('class_id')
   
+  conn, cur = conn_mysqldb(tuples=True)
+  
   try:
-    conn, cur = conn_mysqldb()
-    
-    #1. class_dates 테이블에서 해당 class_id와 관련된 데이터 전부 삭제 
-    
-    cur.execute(
-            "DELETE FROM class_dates WHERE class_id = %s", (int(class_id))
-        )
+    cur.execute(queries.CLASS_OWNED, (int(class_id), int(instructor_id)))
+    if cur.fetchone() is None:
+      return jsonify({'status': 'error', 'message': 'No class found or you do not have permission to delete.'})
     
-    #2. class 테이블에서 해당 class 삭제
-    cur.execute(
-            "DELETE FROM class WHERE id = %s AND instructor_id = %s", (int(class_id), int(instructor_id))
-        )
+    if request.args.get('background') == '1':
+      job_id = deletion.create_job(cur, 'class', class_id, instructor_id)
+      deletion.submit(job_id)
+      return jsonify({'status': 'success', 'data': {'jobId': job_id, 'state': 'pending'}})
     
-    if cur.rowcount == 0:
-      return jsonify({'status': 'error', 'message': 'No class found or you do not have permission to delete.'})
-    conn.commit()
+    deletion.delete_class(conn, cur, class_id, instructor_id)
     return jsonify({'status': 'success'})
   
   except Exception as e:
-    conn.rollback() #오류 발생 시 롤백
     return jsonify({'status': 'error', 'message': str(e)})
   
   finally:
@@ -99,15 +90,23 @@ def update_class_by_instructor():
   if "target_student" in data:
       data["target_student"] = json.dumps(data["target_student"])
   
-  #업데이트 할 부분 sql 쿼리 생성 
-  columns_to_update = ', '.join(f"{key} = %s" for key in data.keys())
-  sql_query = f"UPDATE class SET {columns_to_update} WHERE id = %s AND instructor_id = %s"
+  #주소가 바뀌면 지역 컬럼도 함께 갱신 
+  if "location" in data:
+    data["city"], data["district"] = split_region(data["location"])
+  
+  #수정 가능한 컬럼만 허용 (queries.CLASS_EDITABLE_COLUMNS)
+  try:
+    sql_query = queries.CLASS_UPDATE(tuple(data.keys()))
+  except ValueError as e:
+    return jsonify({'status': 'error', 'message': str(e)})
   values = list(data.values()) + [class_id, instructor_id]
   
+  conn, cur = conn_mysqldb()
+  
   try:
-    conn, cur = conn_mysqldb()
     cur.execute(sql_query, values)
     conn.commit()
+    class_saved(class_id, cur)
     return jsonify({'status': 'success'})
   
   except Exception as e:
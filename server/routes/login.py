@@ -1,16 +1,31 @@
 from flask import Flask, request, jsonify, Blueprint, session
 from flask_cors import CORS, cross_origin
 from flask_login import login_manager, login_user, login_required, current_user, logout_user, UserMixin
-from werkzeug.security import check_password_hash
+from control.user_cache import load_user_by_email
+from control import user_cache, login_throttle, password_hashing
+from control.password_hashing import HashingBusy
 from db_model.mysql import conn_mysqldb
+from db_model import queries
 from control.user_mgmt import User
 from flask_jwt_extended import create_access_token
 import logging
 from datetime import timedelta
 
 login_blueprint = Blueprint('login', __name__)
+logger = logging.getLogger(__name__)
     
 
+#로그인 성공 시 현재 파라미터로 다시 만든 해시 저장 (그 사이 비밀번호가 바뀌었으면 덮어쓰지 않음)
+def upgrade_password_hash(user_data, new_hash):
+  conn, cur = conn_mysqldb()
+  try:
+    cur.execute(queries.USER_UPGRADE_PASSWORD, (new_hash, user_data['id'], user_data['password']))
+    if cur.rowcount:
+      user_cache.update(user_data['id'], {'password': new_hash})
+  finally:
+    cur.close()
+    conn.close()
+
 #로그인 API
 @login_blueprint.route('/api/login', methods=['POST'])
 @cross_origin()
@@ -19,20 +34,28 @@ def login():
   email = data['email']
   password = data['password']
   
+  #실패가 누적된 계정/IP 는 해시를 계산하기 전에 거절
+  if login_throttle.is_blocked(email):
+    return jsonify({'status': 'error', 'message': 'Too many failed attempts. Try again later.'}), 429
+  
   try:
-    conn, cur = conn_mysqldb()
-    cur.execute("SELECT * FROM user_info WHERE email = %s", (email,))
-    user_data = cur.fetchone()
+    #비밀번호 해시는 캐시가 아닌 DB 에서 읽음
+    user_data = load_user_by_email(email)
     
     if user_data:
-      if check_password_hash(user_data['password'], password):
+      #해시 프로세스 풀에서 검증 (저장된 해시가 예전 파라미터면 새 해시도 함께 받음)
+      valid, new_hash = password_hashing.verify(user_data['password'], password)
+      if valid:
         #로그인 성공   
+        login_throttle.record_success(email)
+        if new_hash:
+          upgrade_password_hash(user_data, new_hash)
+        
         user = User(user_data['id'], user_data['email'], user_data['name'], user_data['role'], user_data['address']) 
         login_user(user)
         
         #jwt 토큰 생성 (식별자로 user_id 값을 저장)
         token = create_access_token(identity=current_user.get_id(), additional_claims={'role': current_user.get_role()}, expires_delta=timedelta(days=30))
-        print(current_user) 
 
         return jsonify({'status': 'success', 'data': {
           'id': current_user.get_id(),
@@ -44,17 +67,19 @@ def login():
         }})
       else:
         #비밀번호가 올바르지 않은 경우
+        login_throttle.record_failure(email)
         return jsonify({'status':'error', 'message': 'Invalid password'})
     else:
       #존재하지 않는 사용자인 경우
+      login_throttle.record_failure(email)
       return jsonify({'status':'error','message': 'User does not exist'})
     
+  except HashingBusy:
+    #해시 대기열이 가득 찬 경우 기다리지 않고 바로 거절
+    return jsonify({'status': 'error', 'message': 'Server is busy. Try again later.'}), 503, {'Retry-After': '1'}
   except Exception as e:
-    logging.error(e, exc_info=True)
+    logger.exception("login failed")
     return jsonify({'status': 'error','message': repr(e)})
-  finally:
-    cur.close()
-    conn.close()
   
 #로그아웃 API 
 @login_blueprint.route('/api/logout')
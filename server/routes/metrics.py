@@ -0,0 +1,9 @@
+from flask import Blueprint, Response
+from db_model import metrics
+
+metrics_blueprint = Blueprint('metrics', __name__)
+
+#Prometheus 수집용 지표 API 
+@metrics_blueprint.route('/metrics', methods=['GET'])
+def get_metrics():
+  return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
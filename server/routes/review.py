@@ -1,29 +1,35 @@
 from flask import Blueprint, jsonify, request
 from db_model.mysql import conn_mysqldb
+from db_model import queries
+from control.pagination import parse_limit, decode_datetime_cursor, encode_datetime_cursor, split_page
 from flask_cors import CORS, cross_origin
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import traceback
+import logging
+from control.streaming import wants_stream, stream_rows
+from control.resource_versions import REVIEWS, CLASS_CATALOG, bump, conditional_get, with_etag
+from control import ratings
+from control.class_events import class_rated
 
 review_blueprint = Blueprint('review', __name__)
+logger = logging.getLogger(__name__)
   
 
 #예약상태 확인
 def check_if_user_has_confirmed_booking(cur, class_booking_id):
-  cur.execute("SELECT status FROM class_booking WHERE id = %s", (class_booking_id,))
+  cur.execute(queries.BOOKING_STATUS, (class_booking_id,))
   booking_status = cur.fetchone()['status']
   return booking_status == 'confirmed'
 
 #이미 작성된 리뷰가 존재하는지 확인 
 def check_if_review_exists(cur, class_booking_id):
-  cur.execute("SELECT COUNT(*) FROM class_reviews WHERE booking_id = %s", (class_booking_id,))
+  cur.execute(queries.REVIEW_COUNT_FOR_BOOKING, (class_booking_id,))
   review_count = cur.fetchone()['COUNT(*)']
   return review_count > 0
 
-#데이터베이스의 user_id와 실제 요청자가 일치하는지 확인
-def check_user_review(cur, review_id, user_id):
-  cur.execute("SELECT COUNT(*) FROM class_reviews WHERE id = %s AND user_id = %s",  (review_id, user_id))  
-  review_count = cur.fetchone()['COUNT(*)']
-  return review_count > 0
+#데이터베이스의 user_id와 실제 요청자가 일치하는지 확인 (삭제할 리뷰의 class_id, rating 반환, 없으면 None)
+def find_user_review(cur, review_id, user_id):
+  cur.execute(queries.REVIEW_LOCK_OWN, (review_id, user_id))  
+  return cur.fetchone()
 
 
 #리뷰작성 API
@@ -44,6 +50,12 @@ def createReview():
     error_msg = "Please fill in all required fields."
     return jsonify({'status': 'error', 'message': error_msg})
   
+  #평점은 1 ~ 5 (클래스별 평점 분포에 반영)
+  try:
+    rating = ratings.parse_rating(rating)
+  except (TypeError, ValueError):
+    return jsonify({'status': 'error', 'message': 'Invalid rating'})
+  
   
   conn, cur = conn_mysqldb()
   try:
@@ -54,78 +66,77 @@ def createReview():
     if check_if_review_exists(cur, booking_id):
       return jsonify({'status': 'error', 'message': '이미 리뷰가 작성된 수업입니다.'})
     
-    cur.execute("""
-          INSERT INTO class_reviews (class_id, user_id, class_date_id, rating, comment, booking_id)
-          VALUES (%s, %s, %s, %s, %s, %s)
-          """, (class_id, user_id, class_date_id, rating, comment, booking_id))
+    #리뷰와 클래스 리뷰 집계를 한 트랜잭션에서 저장
+    conn.begin()
+    cur.execute(queries.REVIEW_INSERT, (class_id, user_id, class_date_id, rating, comment, booking_id))
+    ratings.added(cur, class_id, rating)
+    bump(cur, REVIEWS, CLASS_CATALOG)
     conn.commit()
+    class_rated(class_id, cur)
     return jsonify({'status': 'success', 'message': '리뷰가 등록되었습니다.'})
     
   except Exception as e:
     conn.rollback()
-    traceback.print_exc()
+    logger.exception("createReview failed")
     return jsonify({'status': 'error', 'message': str(e)})
   finally:
     cur.close()
     conn.close()
 
-#리뷰 조회 API
+#리뷰 조회 API (작성일 최신순, 키셋 페이지네이션)
+#선택적 파라미터: classId, userId, before=<created_at,id>, limit= (최대 MAX_PAGE_SIZE)
+#stream=1 이면 페이지 없이 조건에 맞는 전체 리뷰를 같은 순서로 스트리밍
+#리뷰/클래스(이름)가 바뀌지 않았으면 304
 @review_blueprint.route('/api/reviews', methods=['GET']) 
 @cross_origin()
 def get_reviews():
   class_id = request.args.get('classId', None) #선택적 파라미터
   user_id = request.args.get('userId', None) #선택적 파라미터
   
-  base_query = "SELECT * FROM class_reviews"
-  params = ()
-  if class_id is not None and user_id is not None:
-    query = base_query +  " WHERE class_id = %s AND user_id = %s"
-    params = (class_id, user_id)
-  
-  elif class_id is not None:
-    query = base_query + " WHERE class_id = %s"
-    params = (class_id,)
-  elif user_id is not None:
-      query = base_query + " WHERE user_id = %s"
-      params = (user_id,)
-  else: 
-    query = base_query
-  
-  conn, cur = conn_mysqldb()
+  stream = wants_stream(request.args)
+  conn, cur = conn_mysqldb(unbuffered=stream)
+  streaming = False
   try:
-    cur.execute(query, params)
-    reviews = cur.fetchall()
+    limit = parse_limit(request.args.get('limit'))
+    cursor = decode_datetime_cursor(request.args.get('before'))
     
-    detailed_reviews = []
-    for review in reviews:
-      #각 review 에 대한 클래스 정보 조회 
-      cur.execute(
-                "SELECT class_name, description FROM class WHERE id = %s",
-                (review['class_id'],)
-            )
-      class_info = cur.fetchone() 
-      #각 review 에 대한 클래스 날짜 정보 조회 
-      cur.execute(
-                "SELECT class_date FROM class_dates WHERE id = %s",
-                (review['class_date_id'],)
-            )
-      class_date_info = cur.fetchone()
-      
-      #필요한 정보 합치기 
-      detailed_review = {
-        **review,
-        'class_name': class_info['class_name'],
-        'class_date': class_date_info['class_date']
-      }
-      detailed_reviews.append(detailed_review)
-      detailed_reviews.sort(key=lambda x: x['created_at'], reverse=True)
-    return jsonify({'status': 'success', 'data': detailed_reviews})
+    etag, unchanged = conditional_get(cur, REVIEWS, CLASS_CATALOG)
+    if unchanged:
+      return unchanged
+    
+    #리뷰 + 클래스 이름 + 수업 날짜를 한 번의 쿼리로 조회
+    params = []
+    if class_id is not None:
+      params.append(class_id)
+    if user_id is not None:
+      params.append(user_id)
+    if cursor:
+      params.extend([cursor[0], cursor[0], cursor[1]])
+    filters = (class_id is not None, user_id is not None, bool(cursor))
+    
+    if stream:
+      cur.execute(queries.REVIEWS_LIST(*filters, False), params)
+      response = stream_rows(conn, cur, list)
+      streaming = True
+      return with_etag(response, etag)
+    
+    params.append(limit + 1)
+    cur.execute(queries.REVIEWS_LIST(*filters, True), params)
+    reviews, has_more = split_page(cur.fetchall(), limit)
+    
+    next_cursor = None
+    if has_more:
+      last = reviews[-1]
+      next_cursor = encode_datetime_cursor(last['created_at'], last['id'])
+    return with_etag(jsonify({'status': 'success', 'data': reviews, 'next': next_cursor}), etag)
   except Exception as e:
-    traceback.print_exc()
+    logger.exception("get_reviews failed")
     return jsonify({'status': 'error', 'message': str(e)})
   finally:
-    cur.close()
-    conn.close()
+    #스트리밍 응답은 전송이 끝난 뒤 커넥션을 반납
+    if not streaming:
+      cur.close()
+      conn.close()
     
 #리뷰 삭제 API 
 @review_blueprint.route('/api/reviews/<review_id>', methods=['DELETE']) 
@@ -136,11 +147,17 @@ def delete_reviews(review_id):
   conn, cur = conn_mysqldb()
   
   try:
-    if check_user_review(cur, review_id, user_id) == 0:
+    conn.begin()
+    review = find_user_review(cur, review_id, user_id)
+    if review is None:
+      conn.rollback()
       return jsonify({'status': 'error', 'message': "해당 리뷰를 삭제할 권한이 없습니다."})
     
-    cur.execute("DELETE FROM class_reviews WHERE id = %s", (review_id,))
+    cur.execute(queries.REVIEW_DELETE, (review_id,))
+    ratings.removed(cur, [(review['class_id'], review['rating'])])
+    bump(cur, REVIEWS, CLASS_CATALOG)
     conn.commit()
+    class_rated(review['class_id'], cur)
     
     
     return jsonify({'status': 'success'})
@@ -165,10 +182,8 @@ def create_comment_by_instructor(review_id):
     return jsonify({'status': 'error', 'message': 'No comment provided'})
   
   try:
-    cur.execute(
-            "UPDATE class_reviews SET instructor_comment = %s WHERE id = %s",
-            (instructor_comment, review_id)
-        )
+    cur.execute(queries.REVIEW_SET_INSTRUCTOR_COMMENT, (instructor_comment, review_id))
+    bump(cur, REVIEWS)
     conn.commit()
     return jsonify({'status': 'success'})
   
@@ -186,10 +201,8 @@ def create_comment_by_instructor(review_id):
 def delete_comment_by_instructor(review_id):
   conn, cur = conn_mysqldb()
   try:
-    cur.execute(
-            "UPDATE class_reviews SET instructor_comment = NULL WHERE id = %s",
-            (review_id,)
-        )
+    cur.execute(queries.REVIEW_CLEAR_INSTRUCTOR_COMMENT, (review_id,))
+    bump(cur, REVIEWS)
     conn.commit()
     return jsonify({'status': 'success'})
   
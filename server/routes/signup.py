@@ -1,17 +1,36 @@
 from flask import Flask, request, jsonify, Blueprint
 from flask_cors import CORS, cross_origin
-from werkzeug.security import generate_password_hash
-from db_model.mysql import conn_mysqldb
-import traceback
+from control import password_hashing
+from control.password_hashing import HashingBusy
+from control.email_filter import registered_emails
+from db_model.mysql import conn_mysqldb, is_duplicate_key
+from db_model import queries
+import logging
 
 
 signup_blueprint = Blueprint('signup', __name__)
+logger = logging.getLogger(__name__)
+
+DUPLICATE_EMAIL_MESSAGE = "해당 이메일은 이미 존재합니다. 다른 이메일을 입력해주세요."
+
+#이메일로 가입된 사용자가 있는지 확인 (블룸 필터가 "없음" 이면 DB 조회 생략)
+def email_exists(email):
+  if not registered_emails.might_contain(email):
+    return False
+  conn, cur = conn_mysqldb()
+  try:
+    cur.execute(queries.USER_EMAIL_EXISTS, (email,))
+    return cur.fetchone() is not None
+  finally:
+    cur.close()
+    conn.close()
 
 #회원가입 API 
+#중복 확인 -> 비밀번호 해시 -> INSERT 한 번 (email 유니크 인덱스로 동시 가입도 하나만 성공, 나머지는 1062)
 @signup_blueprint.route('/api/signup', methods=['POST'])
 @cross_origin()
 def signup():
-  conn, cur = conn_mysqldb()
+  conn, cur = None, None
   
   try:
     data = request.get_json()
@@ -24,35 +43,41 @@ def signup():
     address_detail = data['address_detail']
     role = data['role']
     
-    #비밀번호 해시화 
-    hashed_password = generate_password_hash(password)
-    
-    
     #입력한 값 중에 빈 값이 있는지 확인 
     if not all([name, email, password, phone_number, address, zonecode, role]):
       error_msg = "Please fill in all required fields."
       return jsonify({'status': 'error', "message": error_msg})
     
+    #email 중복 체크 (해시를 계산하기 전에)
+    if email_exists(email):
+      return jsonify({'status': 'error', 'message': DUPLICATE_EMAIL_MESSAGE})
     
-    #email 중복 체크 
-    cur.execute("SELECT * FROM user_info WHERE email=%s", (email,))
-    user = cur.fetchone()
+    #비밀번호 해시화 (해시 프로세스 풀에서 계산, DB 커넥션은 잡지 않음)
+    hashed_password = password_hashing.generate(password)
     
-    #입력한 email이 이미 존재한다면 
-    if user:
-      error_msg = "해당 이메일은 이미 존재합니다. 다른 이메일을 입력해주세요."
-      return jsonify({'status': 'error', 'message': error_msg})
-    else:
-      cur.execute("INSERT INTO user_info (email, password, name, phone_number, address, zonecode, address_detail, role) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", (email, hashed_password, name, phone_number, address, zonecode, address_detail, role))
-      conn.commit()
-      
-      return jsonify({'status': 'success'})
+    conn, cur = conn_mysqldb()
+    try:
+      cur.execute(queries.USER_INSERT, (email, hashed_password, name, phone_number, address, zonecode, address_detail, role))
+    except Exception as e:
+      #그 사이 같은 이메일로 가입된 경우 (email 유니크 인덱스 위반)
+      if is_duplicate_key(e, queries.USER_EMAIL_KEY):
+        conn.rollback()
+        registered_emails.add(email)
+        return jsonify({'status': 'error', 'message': DUPLICATE_EMAIL_MESSAGE})
+      raise
+    conn.commit()
+    registered_emails.add(email)
     
+    return jsonify({'status': 'success'})
+    
+  except HashingBusy:
+    return jsonify({'status': 'error', 'message': 'Server is busy. Try again later.'}), 503, {'Retry-After': '1'}
   except Exception as e:
-    traceback.print_exc()
+    logger.exception("signup failed")
     return jsonify({'status': 'error', 'message': str(e)})
   
   finally:
-    cur.close()
-    conn.close()
-  
\ No newline at end of file
+    if cur:
+      cur.close()
+    if conn:
+      conn.close()
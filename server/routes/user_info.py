@@ -1,21 +1,24 @@
 from flask import Blueprint, jsonify, request
-from db_model.mysql import conn_mysqldb
+from db_model.mysql import conn_mysqldb, is_duplicate_key
+from db_model import queries
 from flask_jwt_extended import jwt_required
 from flask_cors import cross_origin
-from werkzeug.security import check_password_hash, generate_password_hash
-import traceback
+import logging
+from control.cache import TTLCache
+from control import deletion
+from control import user_cache, login_throttle, password_hashing
+from control.email_filter import registered_emails
+from control.password_hashing import HashingBusy
 
 user_info_blueprint = Blueprint('user_info', __name__)
+logger = logging.getLogger(__name__)
 
 #user 정보 얻어오기 API 
 @user_info_blueprint.route('/api/users/<user_id>', methods=['GET'])
 @jwt_required()
 def get_user_info(user_id):
   try:
-    conn, cur = conn_mysqldb()
-    
-    cur.execute('SELECT * FROM user_info WHERE id = %s', (int(user_id)))
-    userData = cur.fetchone()
+    userData = user_cache.get_user_by_id(user_id)
     
     if userData:
       return jsonify({'status': 'success', 'data': userData})
@@ -25,10 +28,6 @@ def get_user_info(user_id):
     
   except Exception as e:
     return jsonify({'status': 'error', 'message': str(e)})
-  
-  finally:
-    cur.close()
-    conn.close()
     
 #회원정보수정 API
 @user_info_blueprint.route('/api/users/<user_id>', methods=['PATCH'])
@@ -41,15 +40,18 @@ def edit_user_info(user_id):
     return jsonify({'status': 'error', 'message': 'Invaild data'})
   
   try:
-    set_clause = ', '.join(f"{key} = %s" for key in data.keys())
+    #수정 가능한 컬럼만 허용 (queries.USER_EDITABLE_COLUMNS)
     values = list(data.values())
-    
-    cur.execute(f"UPDATE user_info SET {set_clause} WHERE id = %s", values + [user_id])
+    cur.execute(queries.USER_UPDATE(tuple(data.keys())), values + [user_id])
     conn.commit()
+    if 'email' in data:
+      registered_emails.add(data['email'])
     
-    #업데이트 된 데이터 가져오기 
-    cur.execute("SELECT * FROM user_info WHERE id = %s", [user_id])
-    updated_user_info = cur.fetchone()
+    #user 캐시에 반영 (캐시에 없을 때만 다시 조회)
+    updated_user_info = user_cache.update(user_id, data)
+    if updated_user_info is None:
+      user_cache.invalidate(user_id)
+      updated_user_info = user_cache.get_user_by_id(user_id, cur)
     return jsonify({'status': 'success', 'data': updated_user_info})
   
   except Exception as e:
@@ -65,7 +67,8 @@ def edit_user_info(user_id):
 @jwt_required()
 @cross_origin()
 def change_password(user_id):
-    conn, cur = conn_mysqldb()
+    #해시를 계산하는 동안 DB 커넥션을 잡고 있지 않도록 저장할 때만 연결
+    conn, cur = None, None
     data = request.get_json()
     current_password = data['currentPassword']
     new_password = data['newPassword']
@@ -73,66 +76,82 @@ def change_password(user_id):
           return jsonify({'status': 'error', 'message': 'Password fields are required.'})
     
     try:
-      #현재 비밀번호 검증 
-      cur.execute('SELECT password FROM user_info WHERE id = %s', (int(user_id)))
-      user_record = cur.fetchone()
+      #현재 비밀번호 실패가 누적된 계정/IP 는 해시를 계산하기 전에 거절
+      if login_throttle.is_blocked(f'user:{user_id}'):
+        return jsonify({'status': 'error', 'message': 'Too many failed attempts. Try again later.'}), 429
+      
+      #현재 비밀번호 검증 (해시는 DB 에서 읽고 해시 프로세스 풀에서 계산)
+      user_record = user_cache.load_user_by_id(user_id)
       if user_record:
         stored_password_hash = user_record['password']
-        if not check_password_hash(stored_password_hash, current_password):
+        valid, _ = password_hashing.verify(stored_password_hash, current_password)
+        if not valid:
+          login_throttle.record_failure(f'user:{user_id}')
           return jsonify({'status': 'error', 'message': '현재 비밀번호가 틀립니다.'})
+        login_throttle.record_success(f'user:{user_id}')
         
-        if check_password_hash(stored_password_hash, new_password):
+        #현재 비밀번호가 확인되었으므로 해시를 다시 계산하지 않고 평문끼리 비교
+        if new_password == current_password:
           return jsonify({'status': 'error', 'message': '기존의 비밀번호와 동일합니다.'})
         
         #새 비밀번호 해시 생성 
-        new_password_hash = generate_password_hash(new_password)
+        new_password_hash = password_hashing.generate(new_password)
         
-        cur.execute('UPDATE user_info SET password = %s WHERE id = %s', (new_password_hash, user_id))
+        conn, cur = conn_mysqldb()
+        cur.execute(queries.USER_SET_PASSWORD, (new_password_hash, user_id))
         conn.commit()
+        user_cache.update(user_id, {'password': new_password_hash})
         
         return jsonify({'status': 'success'})
       
       else:
         return jsonify({'status': 'error', 'message': 'User not found.'})
       
+    except HashingBusy:
+      return jsonify({'status': 'error', 'message': 'Server is busy. Try again later.'}), 503, {'Retry-After': '1'}
     except Exception as e:
-      traceback_details = traceback.format_exc()
-      print(traceback_details)
-      conn.rollback() #오류 발생 시 롤백
+      logger.exception("change_password failed")
+      if conn:
+        conn.rollback() #오류 발생 시 롤백
       return jsonify({'status': 'error', 'message': str(e)})
     finally:
-      cur.close()
-      conn.close()
+      if cur:
+        cur.close()
+      if conn:
+        conn.close()
 
-#특정 user의 북마크 리스트 얻어오기      
-def get_bookmarkList(user_id):
-  try:
-    conn, cur = conn_mysqldb()
-    
-    cur.execute("SELECT * FROM user_bookmarks WHERE user_id = %s", (user_id,))
-    bookmarks = cur.fetchall()
-  
-    detailed_bookmarks=[]
-    for bookmark in bookmarks:
-      #각 북마크의 class_id로 class 테이블에서 추가 정보 조회 
-      cur.execute("SELECT class_name, description FROM class WHERE id = %s", (bookmark['class_id'],))
-      class_info = cur.fetchone()
-      
-      detailed_bookmark = {
-        **bookmark,
-        'class_name': class_info['class_name'],
-        'class_description': class_info['description'],
-      }
-      
-      detailed_bookmarks.append(detailed_bookmark)
-    return detailed_bookmarks
-  
-  except Exception as e:
-    raise 
+#user 별 북마크한 class_id 집합 캐시: user_id -> (bookmark_version, 집합)
+#워커마다 따로 존재하므로 사용할 때마다 user_info.bookmark_version(기본 키 조회 한 번)과 비교해 다른 워커의 변경도 바로 반영
+bookmark_cache = TTLCache(maxsize=10000, ttl=60)
+
+#특정 user의 북마크 리스트 얻어오기 (클래스 정보까지 한 번에 조회)
+def get_bookmarkList(cur, user_id):
+  cur.execute(queries.BOOKMARKS_BY_USER, (user_id,))
+  return cur.fetchall()
+
+#특정 user의 북마크 목록 버전 
+def get_bookmark_version(cur, user_id):
+  cur.execute(queries.USER_BOOKMARK_VERSION, (user_id,))
+  row = cur.fetchone()
+  return row['bookmark_version'] if row else 0
+
+#북마크 목록 버전 증가 후 새 버전 반환 
+def bump_bookmark_version(cur, user_id):
+  cur.execute(queries.USER_BUMP_BOOKMARK_VERSION, (user_id,))
+  return get_bookmark_version(cur, user_id)
+
+#특정 user가 북마크한 class_id 집합 (버전이 같으면 캐시 사용)
+#버전을 먼저 읽으므로 그 사이 변경이 있어도 캐시에는 더 오래된 버전이 붙어 다음 조회에서 다시 읽힌다
+def get_bookmark_set(cur, user_id):
+  version = get_bookmark_version(cur, user_id)
+  cached = bookmark_cache.get(int(user_id))
+  if cached is not None and cached[0] == version:
+    return cached[1]
   
-  finally:
-    cur.close()
-    conn.close()
+  cur.execute(queries.BOOKMARK_CLASS_IDS, (user_id,))
+  bookmarks = frozenset(row['class_id'] for row in cur.fetchall())
+  bookmark_cache.set(int(user_id), (version, bookmarks))
+  return bookmarks
   
 
 #특정 user의 북마크 조회하기 
@@ -144,21 +163,18 @@ def get_bookmarks(user_id):
   
   conn, cur = None, None 
   try: 
-    #특정 클래스에 대한 북마크 정보 조회
+    conn, cur = conn_mysqldb()
+    #특정 클래스에 대한 북마크 정보 조회 (캐시된 북마크 집합에서 확인)
     if class_id:
-      conn, cur = conn_mysqldb()
-      cur.execute("SELECT * FROM user_bookmarks WHERE user_id = %s AND class_id = %s", (user_id, class_id))
-      if cur.fetchone():
-        bookmarkStatus = True 
-      else:
-        bookmarkStatus = False
+      bookmarkStatus = int(class_id) in get_bookmark_set(cur, user_id)
       return jsonify({"status": "success", "data": bookmarkStatus})
     
     #유저의 모든 북마크 정보 조회 
     else:
-      bookmarks = get_bookmarkList(user_id)
+      bookmarks = get_bookmarkList(cur, user_id)
+      version = get_bookmark_version(cur, user_id)
       
-      return jsonify({"status": "success", "data": bookmarks})
+      return jsonify({"status": "success", "data": bookmarks, "version": version})
   except Exception as e:
     return jsonify({"status": "error", "message": str(e)})
   
@@ -169,80 +185,93 @@ def get_bookmarks(user_id):
       conn.close()
     
   
-#북마크 추가하기 
+#북마크 추가하기 (추가된 북마크와 목록 버전만 응답)
 @user_info_blueprint.route('/api/user/<user_id>/bookmarks', methods=['POST'])
 @cross_origin()
 @jwt_required()
 def add_bookmarks(user_id):
-  data = request.get_json()
-  class_id = data.get('classId')
+  data = request.get_json() or {}
+  try:
+    class_id = int(data['classId'])
+  except (KeyError, TypeError, ValueError):
+    return jsonify({'status': 'error', 'message': 'Invalid classId'})
+  
   conn, cur = conn_mysqldb()
   try:
-    cur.execute("INSERT INTO user_bookmarks (user_id, class_id) VALUES (%s, %s)", (user_id, class_id))
+    conn.begin()
+    try:
+      cur.execute(queries.BOOKMARK_INSERT, (user_id, class_id))
+    except Exception as e:
+      #이미 북마크된 경우 (유니크 제약 위반만, 그 외 오류는 그대로)
+      if not is_duplicate_key(e, queries.BOOKMARK_KEY):
+        raise
+      added = False
+    else:
+      if cur.rowcount == 0:
+        conn.rollback()
+        return jsonify({'status': 'error', 'message': 'Class not found'})
+      added = True
+    version = bump_bookmark_version(cur, user_id) if added else get_bookmark_version(cur, user_id)
     conn.commit()
-    updated_bookmarks = get_bookmarkList(cur, user_id)
-    return jsonify({'status': 'success', 'data': updated_bookmarks})
+    bookmark_cache.delete(int(user_id))
+    
+    cur.execute(queries.BOOKMARK_ONE, (user_id, class_id))
+    bookmark = cur.fetchone()
+    return jsonify({'status': 'success', 'data': {'action': 'added', 'bookmark': bookmark, 'version': version}})
   
   except Exception as e:
+    conn.rollback()
     return jsonify({"status": "error", "message": str(e)})
   
   finally:
     cur.close()
     conn.close()
   
-#북마크 삭제하기 
+#북마크 삭제하기 (삭제된 class_id 와 목록 버전만 응답)
 @user_info_blueprint.route('/api/user/<user_id>/bookmarks/<class_id>', methods=['DELETE'])
 @cross_origin()
 @jwt_required()
 def remove_bookmarks(user_id, class_id):
   conn, cur = conn_mysqldb()
   try:
-    cur.execute("DELETE FROM user_bookmarks WHERE user_id = %s AND class_id = %s", (user_id, class_id))
+    conn.begin()
+    cur.execute(queries.BOOKMARK_DELETE, (user_id, class_id))
+    if cur.rowcount > 0:
+      version = bump_bookmark_version(cur, user_id)
+    else:
+      version = get_bookmark_version(cur, user_id)
     conn.commit()
-    updated_bookmarks = get_bookmarkList(cur, user_id)
+    bookmark_cache.delete(int(user_id))
     
-    return jsonify({'status': 'success', 'data': updated_bookmarks})
+    return jsonify({'status': 'success', 'data': {'action': 'removed', 'class_id': int(class_id), 'version': version}})
   
   except Exception as e:
+    conn.rollback()
     return jsonify({"status": "error", "message": str(e)})
 
   finally:
     cur.close()
     conn.close()
       
-#계정삭제
+#계정삭제 (수강생/강사로 남긴 데이터를 모두 청크 단위로 삭제)
+#선택적 파라미터: background=1 (백그라운드 작업으로 삭제하고 jobId 를 바로 응답, GET /api/deletion_jobs/<jobId> 로 상태 조회)
 @user_info_blueprint.route('/api/users/<user_id>', methods=['DELETE'])
 @jwt_required()
 @cross_origin()
 def delete_user(user_id):
-  conn, cur = conn_mysqldb()
+  conn, cur = conn_mysqldb(tuples=True)
   
   try:
-  # 사용자가 강사로 등록한 클래스 찾기
-    cur.execute("SELECT id FROM class WHERE instructor_id = %s", (user_id,))
-    classes = cur.fetchall()
-
-    # 강사로 등록된 클래스와 연결된 class_dates 삭제
-    for class_item in classes:
-        cur.execute("DELETE FROM class_dates WHERE class_id = %s", (class_item['id'],))
-
-    # 강사로 등록된 클래스 삭제
-    cur.execute("DELETE FROM class WHERE instructor_id = %s", (user_id,))
-
-    # 사용자와 관련된 나머지 데이터 삭제
-    cur.execute("DELETE FROM class_reviews WHERE user_id = %s", (user_id,))
-    cur.execute("DELETE FROM class_booking WHERE student_id = %s", (user_id,))
-    cur.execute("DELETE FROM user_bookmarks WHERE user_id = %s", (user_id,))
-    cur.execute("DELETE FROM payment WHERE user_id = %s", (user_id,))
-
-    # 최종적으로 사용자 데이터 삭제
-    cur.execute("DELETE FROM user_info WHERE id = %s", (user_id,))
-
-    conn.commit()
+    if request.args.get('background') == '1':
+      job_id = deletion.create_job(cur, 'user', user_id, user_id)
+      deletion.submit(job_id, after=lambda: bookmark_cache.delete(int(user_id)))
+      return jsonify({"status": "success", "data": {"jobId": job_id, "state": "pending"}})
+    
+    deletion.delete_user(conn, cur, user_id)
+    bookmark_cache.delete(int(user_id))
     return jsonify({"status": "success"})
 
   except Exception as e:
-      conn.rollback()
       return jsonify({"status": "error", "message": str(e)})
   finally:
       cur.close()